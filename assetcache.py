@@ -0,0 +1,116 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program provides a cache of the images used by the game.
+Each image file is read and decoded once, and every sprite of the image shares the decoded data,
+even after the game restarts. The cache has a memory cap, the least recently used images are evicted.
+Relative paths such as 'image/heart.png' are resolved against the directory of this program,
+so the game can be started from any directory.
+"""
+import copy
+import os
+from collections import OrderedDict
+
+MAX_CACHE_BYTES = 16 * 1024 * 1024     # Memory cap of the decoded images (in bytes)
+BYTES_PER_PIXEL = 3                    # Decoded images are RGB
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+HEART_IMAGE = 'image/heart.png'                   # Image of a remaining life
+HEART_REMOVED_IMAGE = 'image/heart_removed.png'   # Image of a lost life
+
+
+def load_gimage(path):
+    """
+    Read and decode the image file as a GImage, campy is imported only when an image is needed.
+    :param path: (str) The absolute path of the image file
+    :return: (GImage) The decoded image.
+    """
+    from campy.graphics.gimage import GImage
+    return GImage(path)
+
+
+class AssetCache:
+    """
+    This class keeps the decoded images, and creates sprites sharing them.
+    """
+    def __init__(self, max_bytes=MAX_CACHE_BYTES, loader=load_gimage, asset_dir=ASSET_DIR):
+        """
+        :param max_bytes: (int) Memory cap of the decoded images (in bytes)
+        :param loader: The function reading and decoding an image file, by its absolute path.
+        :param asset_dir: (str) The directory the relative paths are resolved against.
+        """
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self.asset_dir = asset_dir
+        # The decoded images by their absolute paths, the most recently used one is the last.
+        self.__images = OrderedDict()
+        self.__sizes = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, path):
+        """
+        Get the absolute path of the image.
+        :param path: (str) The path of the image, a relative path is resolved against asset_dir.
+        :return: (str) The absolute path.
+        """
+        if os.path.isabs(path):
+            return path
+        return os.path.join(self.asset_dir, path)
+
+    def preload(self, *paths):
+        """
+        Read and decode the images now, so they are not loaded in the game loop.
+        :param paths: (str) The paths of the images
+        """
+        for path in paths:
+            self.__get_template(path)
+
+    def get_image(self, path):
+        """
+        Create a sprite of the image, the image is loaded on first use.
+        :param path: (str) The path of the image
+        :return: (GImage) A new sprite, which can be added in the window, sharing the decoded image.
+        """
+        # A shallow copy shares the decoded data, but has its own position in the window.
+        return copy.copy(self.__get_template(path))
+
+    def clear(self):
+        """
+        Forget all the decoded images.
+        """
+        self.__images.clear()
+        self.__sizes.clear()
+        self.bytes = 0
+
+    def __get_template(self, path):
+        """
+        Get the decoded image, which is never added in any window.
+        :param path: (str) The path of the image
+        :return: (GImage) The decoded image.
+        """
+        path = self.resolve(path)
+        image = self.__images.get(path)
+        if image is not None:
+            self.hits += 1
+            self.__images.move_to_end(path)
+            return image
+
+        self.misses += 1
+        image = self.loader(path)
+        size = int(image.width * image.height * BYTES_PER_PIXEL)
+        self.__images[path] = image
+        self.__sizes[path] = size
+        self.bytes += size
+        # Evict the least recently used images, but always keep the new one.
+        while self.bytes > self.max_bytes and len(self.__images) > 1:
+            old_path, _ = self.__images.popitem(last=False)
+            self.bytes -= self.__sizes.pop(old_path)
+        return image
+
+
+# The cache shared by all the games in the process.
+assets = AssetCache()
@@ -0,0 +1,107 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program runs the fixed-timestep game loop of gameloop.py as a task of an asyncio event loop.
+The ticks and the drawings are a coroutine, and the events of the window are pumped by another coroutine,
+so other tasks, like telemetry or remote input, run in the same thread between the frames without any lock.
+The other tasks must not block: a task running longer than a tick delays the next frame.
+How late each frame wakes up is recorded, so the jitter caused by the other tasks can be checked.
+"""
+import asyncio
+from gameloop import GameLoop
+from dirtyrender import get_tk_master
+
+PUMP_RATE = 250     # Pumps of the events of the window per second
+MIN_PUMP = 0.0001   # Time spent pumping the events (in seconds) when the window does not use the Tk backend
+
+
+class AsyncGameLoop(GameLoop):
+    """
+    This class runs the ticks and the drawings of a game in an asyncio event loop.
+    """
+    def __init__(self, tick, render, pump=None, pump_rate=PUMP_RATE, **kwargs):
+        """
+        :param tick: The function advancing the game by one tick, it returns the state of BreakoutEngine.tick.
+        :param render: The function drawing the current state of the game.
+        :param pump: The function handling the queued events of the window without waiting, None to not pump.
+        :param pump_rate: (int) Pumps of the events per second
+        :param kwargs: The other parameters of GameLoop, idle is not used.
+        """
+        super().__init__(tick, render, **kwargs)
+        self.pump = pump
+        self.pump_rate = pump_rate
+
+        # How late the frames woke up in the last run (in seconds)
+        self.max_lateness = 0
+        self.total_lateness = 0
+        self.waits = 0
+
+    async def run_async(self, *coroutines):
+        """
+        Run the game until it is over, the events of the window are pumped by another task.
+        :param coroutines: Other coroutines to run alongside the game, they are cancelled when the game is over.
+        :return: (int) The last state returned by tick, GAME_LOST or GAME_WON.
+        """
+        self.max_lateness = 0
+        self.total_lateness = 0
+        self.waits = 0
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+        if self.pump is not None:
+            tasks.append(asyncio.ensure_future(self.pump_events()))
+        frames = self.frames()
+        try:
+            while True:
+                await self.__wait(next(frames))
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Let the cancelled tasks clean up, their errors are not the result of the game.
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def pump_events(self):
+        """
+        Pump the events of the window at the pump rate, until the task is cancelled.
+        """
+        interval = 1 / self.pump_rate
+        while True:
+            self.pump()
+            await asyncio.sleep(interval)
+
+    def get_mean_lateness(self):
+        """
+        The mean time the frames woke up after they should have in the last run.
+        :return: (float) The lateness (in seconds).
+        """
+        return self.total_lateness / self.waits if self.waits else 0
+
+    async def __wait(self, seconds):
+        """
+        Wait for the next step of the game, the other tasks run meanwhile.
+        :param seconds: The time to wait (in seconds)
+        """
+        deadline = self.clock() + seconds
+        await asyncio.sleep(seconds)
+        lateness = max(self.clock() - deadline, 0)
+        self.waits += 1
+        self.total_lateness += lateness
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
+
+
+def get_window_pump(window):
+    """
+    Get the function handling the queued events of a campy window without waiting.
+    :param window: (GWindow) The window of the game
+    :return: The function pumping the events.
+    """
+    master = get_tk_master(window)
+    if master is not None:
+        # Tk handles every queued event, and returns at once when there is none.
+        return master.update
+    from campy.gui.events.timer import pause
+    return lambda: pause(MIN_PUMP * 1000)
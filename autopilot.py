@@ -0,0 +1,232 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program provides an autopilot paddle for unattended games.
+The autopilot calculates in closed form where the ball will cross the top of the paddle,
+and moves the paddle there, instead of simulating the ball frame by frame.
+
+Between the walls, the ball moves by |dx| a frame and turns back after it passes a wall, as tick does,
+so its x position is always x0 + j * |dx| for some j, and j goes back and forth between two turning points,
+like a triangle wave. With the swept collision the ball turns back exactly at the walls,
+so its path is folded at the walls. A ball going up is expected to turn back at the top of the window,
+but tick bounces a ball on a side wall before the top, so the few frames the ball is at the top are followed
+one by one, and the ball is found to turn a frame later, or to slide along the top, exactly as tick moves it.
+The bricks and the block paddle are not predicted: when they change the velocity of the ball,
+the crossing is calculated again. The crossing is calculated only when the velocity changes,
+at a wall, a brick or a paddle, and a frame costs a comparison otherwise.
+
+The benchmark plays the same seeded games with the autopilot and with a frame-by-frame lookahead:
+    python autopilot.py --games 20
+"""
+import math
+import time
+
+GAMES = 20                      # Games played by each pilot in the benchmark
+MAX_LOOKAHEAD_FRAMES = 10000    # The lookahead gives up after this number of frames, a ball can be stuck at the top
+
+
+class Autopilot:
+    """
+    A policy for rollout.py and BreakoutGraphics, which keeps the paddle where the ball will cross it.
+    In the multi-ball version it follows the first ball.
+    """
+    def __init__(self):
+        self.__velocity = None
+        self.__target = None
+        self.predictions = 0    # Number of crossings calculated
+
+    def __call__(self, engine):
+        """
+        :param engine: (BreakoutEngine) The game to play.
+        :return: (float) The x position of the mouse.
+        """
+        velocity = (engine.dx, engine.dy)
+        if velocity != self.__velocity:
+            self.__velocity = velocity
+            self.__target = predict_crossing(engine)
+            self.predictions += 1
+        return self.__target
+
+    def reset(self):
+        """
+        Forget the crossing, e.g. after a snapshot is restored, it is calculated again in the next frame.
+        """
+        self.__velocity = None
+
+
+def predict_crossing(engine):
+    """
+    Calculate where the ball will cross the top of the paddle, if it touches nothing but the walls.
+    :param engine: (BreakoutEngine) The game to play.
+    :return: (float) The x position of the center of the ball when it reaches the paddle.
+    """
+    ball = engine.ball
+    dx = engine.dx
+    dy = engine.dy
+    half_width = ball.width / 2
+    span = engine.width - ball.width   # The range of the left side of the ball between the walls
+    if dy == 0 or dx == 0 or span <= 0:
+        return ball.x + half_width
+    # The distance the bottom of the ball travels down to the top of the paddle.
+    drop = engine.paddle.y - (ball.y + ball.height)
+
+    if engine.swept:
+        t = drop / dy if dy > 0 else ball.y / -dy + (engine.paddle.y - ball.height) / -dy
+        return _fold(ball.x + dx * max(t, 0), span) + half_width
+
+    # The frames until the ball reaches the paddle.
+    bottom = engine.paddle.y - ball.height
+    if dy < 0:
+        # The first frame the ball reaches the top.
+        frame = max(1, math.ceil(ball.y / -dy))
+        y = ball.y + frame * dy
+    elif ball.y + dy <= 0:
+        # The ball is still at the top in the next frame, it turns back up there.
+        frame = 1
+        y = ball.y + dy
+    else:
+        frame = 0
+        y = ball.y
+    if frame:
+        frame, y, dy = _leave_top(ball.x, dx, span, frame, y, dy)
+    if frame < MAX_LOOKAHEAD_FRAMES and y < bottom:
+        frame += max(1, math.ceil((bottom - y) / dy))
+    return _move_x(ball.x, dx, span, frame) + half_width
+
+
+def lookahead_crossing(engine):
+    """
+    Find where the ball will cross the top of the paddle by moving it frame by frame, as tick does without objects.
+    :param engine: (BreakoutEngine) The game to play.
+    :return: (float) The x position of the center of the ball when it reaches the paddle.
+    """
+    ball = engine.ball
+    dx = engine.dx
+    dy = engine.dy
+    x = ball.x
+    y = ball.y
+    if dy == 0 or dx == 0 or engine.width <= ball.width:
+        return x + ball.width / 2
+    bottom = engine.paddle.y - ball.height
+    for _ in range(MAX_LOOKAHEAD_FRAMES):
+        x += dx
+        y += dy
+        if y >= bottom:
+            break
+        if x <= 0 or x + ball.width >= engine.width:
+            dx = -dx
+        elif y <= 0:
+            dy = -dy
+    return x + ball.width / 2
+
+
+def _move_x(x, dx, span, frames):
+    """
+    Move the ball in x for a number of frames, it turns back after it passes a wall, as tick does.
+    :param x: The left side of the ball
+    :param dx: The x velocity of the ball, not 0
+    :param span: The range of the left side of the ball between the walls
+    :param frames: (int) Number of frames
+    :return: The left side of the ball after the frames.
+    """
+    # Mirror the window when the ball moves left, so it always starts moving right.
+    speed = abs(dx)
+    start = x if dx > 0 else span - x
+    right_turn = max(1, math.ceil((span - start) / speed))
+    if frames <= right_turn:
+        steps = frames
+    else:
+        # After the first turn, the ball goes back and forth between the same two lattice points.
+        width = max(1, math.ceil((start + right_turn * speed) / speed))
+        phase = (frames - right_turn) % (2 * width)
+        steps = right_turn - phase if phase <= width else right_turn - 2 * width + phase
+    x = start + steps * speed
+    return span - x if dx < 0 else x
+
+
+def _leave_top(x, dx, span, frame, y, dy):
+    """
+    Follow the ball frame by frame while it is at the top of the window, as tick does:
+    a ball at a side wall bounces on the wall instead of the top, and a ball still at the top after it turns
+    turns again, so it can slide along the top until a side wall lets it go.
+    :param x: The left side of the ball now
+    :param dx: The x velocity of the ball, not 0
+    :param span: The range of the left side of the ball between the walls
+    :param frame: (int) The first frame the ball is at the top
+    :param y: The top side of the ball in that frame, 0 or less
+    :param dy: The y velocity of the ball before that frame
+    :return: (tuple) The first frame the ball leaves the top going down, the top side and the y velocity of the ball
+             then. The frame is MAX_LOOKAHEAD_FRAMES if the ball is stuck at the top until then.
+    """
+    while frame < MAX_LOOKAHEAD_FRAMES:
+        if not _is_on_side(_move_x(x, dx, span, frame), span):
+            dy = -dy
+        frame += 1
+        y += dy
+        if y > 0:
+            break
+    return frame, y, dy
+
+
+def _is_on_side(x, span):
+    """
+    :param x: The left side of the ball
+    :param span: The range of the left side of the ball between the walls
+    :return: (Bool) True if the ball is on the left or right side of the window, as is_ball_on_x_side checks.
+    """
+    return x <= 0 or x >= span
+
+
+def _fold(x, span):
+    """
+    :param x: The position of the ball on its unfolded path
+    :param span: The range of the position between the walls
+    :return: The position of the ball after it is reflected by the walls.
+    """
+    x %= 2 * span
+    return x if x <= span else 2 * span - x
+
+
+def main():
+    """
+    Play the same seeded games with the autopilot and the frame-by-frame lookahead,
+    and compare the time a frame takes to choose the paddle position.
+    """
+    # argparse is imported here too, so the game does not load it with the autopilot.
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the autopilot against a frame-by-frame lookahead.')
+    parser.add_argument('--games', type=int, default=GAMES, help='games played by each pilot')
+    parser.add_argument('--swept', action='store_true', help='use the swept collision')
+    args = parser.parse_args()
+    # The games are played by rollout.py, it is imported here so the game does not load it with the autopilot.
+    from rollout import play_game
+
+    pilots = {'autopilot': Autopilot, 'lookahead': lambda: lookahead_crossing}
+    for name, create_pilot in pilots.items():
+        pilot = create_pilot()
+        ns = 0
+        calls = 0
+
+        def timed_pilot(engine):
+            nonlocal ns, calls
+            start = time.perf_counter_ns()
+            x = pilot(engine)
+            ns += time.perf_counter_ns() - start
+            calls += 1
+            return x
+
+        lives_used = 0
+        won = 0
+        for seed in range(args.games):
+            result = play_game(seed, policy=timed_pilot, swept=args.swept)
+            lives_used += result['lives_used']
+            won += result['won']
+        print('%-10s %6.2f us per frame  %d frames  %d/%d games won  %d lives lost' % (
+            name, ns / calls / 1000, calls, won, args.games, lives_used))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program measures the performance of the rules of breakout headlessly,
+for the basic and the extension versions, with boards from 10x10 to 200x200 bricks and faster balls.
+For each case it reports the frames per second, the latency of handle_ball_hit_obj,
+the time to set up the game with its bricks, and the peak memory.
+The results are written as JSON, and can be compared with the results of another commit.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from breakoutengine import BreakoutEngine, INITIAL_Y_SPEED, GAME_LOST, GAME_WON
+from breakoutengine_extension import BreakoutEngineExtension
+from rollout import follow_ball
+
+BOARD_SIZES = (10, 25, 50, 100, 200)    # Rows and columns of the benchmarked boards
+SPEED_BOOSTS = (0, 5)                   # Speed added to the ball, 5 is the speed-up of the last red brick
+FRAMES = 2000                           # Frames played in each case
+SEED = 0
+VARIANTS = {'basic': BreakoutEngine, 'extension': BreakoutEngineExtension}
+
+
+def percentile(values, p):
+    """
+    :param values: (list) The sorted values
+    :param p: The percentile, from 0 to 100
+    :return: The value at the percentile, 0 if there is no value.
+    """
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def create_engine(engine_class, size):
+    """
+    :param engine_class: The class of the engine
+    :param size: (int) Rows and columns of the board
+    :return: (BreakoutEngine) A new seeded game.
+    """
+    return engine_class(rng=random.Random(SEED), brick_rows=size, brick_cols=size)
+
+
+def play(engine, frames, speed_boost):
+    """
+    Play the game with the follow_ball policy, the ball is served as soon as it waits for a click.
+    :param engine: (BreakoutEngine) The game to play
+    :param frames: (int) Maximum number of frames to play
+    :param speed_boost: The speed added to the ball when it is served
+    :return: (int) The number of played frames, fewer than frames if the game is over.
+    """
+    for frame in range(frames):
+        if not engine.is_ball_moving:
+            engine.handle_click()
+            engine.dx += speed_boost if engine.dx > 0 else -speed_boost
+            engine.dy = INITIAL_Y_SPEED + speed_boost
+        engine.move_paddle(follow_ball(engine))
+        state = engine.tick()
+        engine.removed_bricks.clear()
+        if state == GAME_LOST or state == GAME_WON:
+            return frame + 1
+    return frames
+
+
+def run_case(engine_class, size, speed_boost, frames=FRAMES):
+    """
+    Measure a case, each measurement plays the same seeded game from the start.
+    :param engine_class: The class of the engine
+    :param size: (int) Rows and columns of the board
+    :param speed_boost: The speed added to the ball
+    :param frames: (int) Frames played in the case
+    :return: (dict) The results of the case.
+    """
+    # Setup time, the bricks are created by the constructor, and laid out as the window draws them.
+    start = time.perf_counter_ns()
+    engine = create_engine(engine_class, size)
+    engine.get_brick_layout()
+    setup_ns = time.perf_counter_ns() - start
+
+    # Frame throughput, without any measurement in the loop.
+    start = time.perf_counter_ns()
+    played = play(engine, frames, speed_boost)
+    play_ns = time.perf_counter_ns() - start
+
+    # Latency of the collision queries, timed call by call.
+    engine = create_engine(engine_class, size)
+    latencies = []
+    handle_ball_hit_obj = engine.handle_ball_hit_obj
+
+    def timed_handle_ball_hit_obj():
+        begin = time.perf_counter_ns()
+        handle_ball_hit_obj()
+        latencies.append(time.perf_counter_ns() - begin)
+
+    engine.handle_ball_hit_obj = timed_handle_ball_hit_obj
+    play(engine, frames, speed_boost)
+    latencies.sort()
+
+    # Peak memory of the setup and the game, tracemalloc slows everything down so it is measured alone.
+    tracemalloc.start()
+    play(create_engine(engine_class, size), frames, speed_boost)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'bricks': size * size,
+        'rows': size,
+        'cols': size,
+        'speed_boost': speed_boost,
+        'frames': played,
+        'fps': played * 1e9 / play_ns if play_ns else 0,
+        'hit_latency_ns': {
+            'mean': sum(latencies) / len(latencies) if latencies else 0,
+            'p50': percentile(latencies, 50),
+            'p99': percentile(latencies, 99),
+        },
+        'setup_ms': setup_ns / 1e6,
+        'peak_memory_kb': peak / 1024,
+    }
+
+
+def run_benchmark(sizes=BOARD_SIZES, speed_boosts=SPEED_BOOSTS, frames=FRAMES, variants=VARIANTS):
+    """
+    Measure every case.
+    :param sizes: Rows and columns of the benchmarked boards
+    :param speed_boosts: Speeds added to the ball
+    :param frames: (int) Frames played in each case
+    :param variants: (dict) The classes of the engines, by the names of the versions.
+    :return: (dict) The results, with the information of the machine.
+    """
+    results = []
+    for name, engine_class in variants.items():
+        for size in sizes:
+            for speed_boost in speed_boosts:
+                result = run_case(engine_class, size, speed_boost, frames)
+                result['variant'] = name
+                results.append(result)
+    return {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'frames': frames,
+        'results': results,
+    }
+
+
+def compare(baseline, report):
+    """
+    Print the change of each case against the baseline.
+    :param baseline: (dict) The results of run_benchmark of another commit
+    :param report: (dict) The results of run_benchmark
+    """
+    old_results = {(r['variant'], r['rows'], r['cols'], r['speed_boost']): r for r in baseline['results']}
+    for r in report['results']:
+        old = old_results.get((r['variant'], r['rows'], r['cols'], r['speed_boost']))
+        if old is None or not old['fps']:
+            continue
+        print('%-9s %3dx%-3d +%d  fps %6.2fx  hit p50 %6.2fx  setup %6.2fx  memory %6.2fx' % (
+            r['variant'], r['rows'], r['cols'], r['speed_boost'], r['fps'] / old['fps'],
+            _ratio(r['hit_latency_ns']['p50'], old['hit_latency_ns']['p50']),
+            _ratio(r['setup_ms'], old['setup_ms']), _ratio(r['peak_memory_kb'], old['peak_memory_kb'])))
+
+
+def _ratio(new, old):
+    """
+    :return: (float) new / old, 0 if old is 0.
+    """
+    return new / old if old else 0
+
+
+def main():
+    """
+    Run the benchmark, print a line per case, and write the results as JSON.
+    """
+    parser = argparse.ArgumentParser(description='Measure the performance of the rules of breakout.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=BOARD_SIZES, help='rows and columns of the boards')
+    parser.add_argument('--speed-boosts', type=int, nargs='+', default=SPEED_BOOSTS, help='speeds added to the ball')
+    parser.add_argument('--frames', type=int, default=FRAMES, help='frames played in each case')
+    parser.add_argument('--variant', choices=sorted(VARIANTS), default=None, help='only one version of the game')
+    parser.add_argument('--output', default=None, help='JSON file of the results')
+    parser.add_argument('--baseline', default=None, help='JSON file of the results of another commit to compare')
+    args = parser.parse_args()
+
+    variants = VARIANTS if args.variant is None else {args.variant: VARIANTS[args.variant]}
+    report = run_benchmark(args.sizes, args.speed_boosts, args.frames, variants)
+    for r in report['results']:
+        print('%-9s %3dx%-3d +%d  %9.0f fps  hit p50 %6d ns  p99 %6d ns  setup %8.2f ms  peak %9.1f KB' % (
+            r['variant'], r['rows'], r['cols'], r['speed_boost'], r['fps'], r['hit_latency_ns']['p50'],
+            r['hit_latency_ns']['p99'], r['setup_ms'], r['peak_memory_kb']))
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
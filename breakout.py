@@ -5,43 +5,97 @@ Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
 and Jerry Liao.
 """
 
-from campy.gui.events.timer import pause
+import time
 from breakoutgraphics import BreakoutGraphics
+from gameloop import GameLoop
 
-FRAME_RATE = 10         # 100 frames per second
+TICK_RATE = 100         # 100 ticks of the game per second
+RENDER_RATE = 60        # At most 60 drawings per second
+FAST_FORWARD = False    # True to run the game as fast as possible
+INPUT_LOG_FILE = None   # The file to save the seed and the inputs of the game, None to not save them
+EVENT_FILE = None       # The file to append the events of the game, JSON lines if it ends with .jsonl
+PROFILE = False         # True to time the phases of the frames, and print the summary at exit
+TRACE_FILE = None       # The file to save the timed phases as a Chrome trace, None to not save them
 NUM_LIVES = 3			# Number of attempts
+LEVEL = None            # The index of the level in the levels directory, None for the uniform bricks
+STARTUP_BUDGET = 0.1    # Seconds from the start to the first frame, a slower startup is reported
+ASYNC_LOOP = False      # True to run the game as an asyncio task, so other tasks can share the event loop
+SPECTATOR_PORT = None   # The port streaming the game to spectators, None to not stream it, it uses ASYNC_LOOP
+AUTOPILOT = False       # True to let the autopilot play, for unattended demos
 
 
 def main():
     """
     This main function control the animation of the game.
     """
-    # Create an instance of graphics
-    graphics = BreakoutGraphics()
-    # Number of attempts
-    lives = NUM_LIVES
-
-    # The animation loop
-    while True:
-        graphics.ball.move(graphics.get_dx(), graphics.get_dy())
-        graphics.handle_ball_hit_obj()
-
-        if graphics.is_ball_leaves_window():
-            graphics.init_ball()
-            # If the ball leaves the bottom of the window, then decrease one attempt.
-            lives -= 1
-            # If attempts are equal to 0, then game over.
-            if lives == 0:
-                break
-        elif graphics.is_game_win():
-            graphics.init_ball()
-            break
-        elif graphics.is_ball_on_x_side():
-            graphics.change_x_direction()
-        elif graphics.is_ball_on_y_side():
-            graphics.change_y_direction()
-
-        pause(FRAME_RATE)
+    start = time.perf_counter()
+    # The optional parts are imported only when they are turned on, so they do not slow down the startup.
+    level = None
+    if LEVEL is not None:
+        from levels import LevelPack
+        level = LevelPack().get_level(LEVEL)
+    event_sink = None
+    if EVENT_FILE is not None:
+        from gameevents import open_sink
+        event_sink = open_sink(EVENT_FILE)
+    autopilot = None
+    if AUTOPILOT:
+        from autopilot import Autopilot
+        autopilot = Autopilot()
+    # Create an instance of graphics, the first frame is drawn when it is created.
+    graphics = BreakoutGraphics(lives=NUM_LIVES, level=level, autopilot=autopilot, event_sink=event_sink)
+    startup = time.perf_counter() - start
+    if startup > STARTUP_BUDGET:
+        print(f'Startup took {startup * 1000:.0f} ms, over the budget of {STARTUP_BUDGET * 1000:.0f} ms.')
+
+    # campy is loaded by the window, so the timer is imported after it.
+    from campy.gui.events.timer import pause
+    tick = graphics.step
+    render = graphics.update
+    idle = lambda seconds: pause(seconds * 1000)
+    # The phases are wrapped only when they are profiled.
+    profiler = None
+    if PROFILE:
+        from profiler import PhaseProfiler
+        profiler = PhaseProfiler(trace=TRACE_FILE is not None)
+        tick, render, idle = profiler.instrument_game(graphics, idle)
+    # The spectators get the state after every tick, the server runs alongside the game in the event loop.
+    coroutines = []
+    if SPECTATOR_PORT is not None:
+        from spectator import SpectatorServer
+        spectator = SpectatorServer(graphics.engine)
+        tick = spectator.publishing(tick)
+        coroutines.append(spectator.serve(port=SPECTATOR_PORT))
+    is_async = ASYNC_LOOP or bool(coroutines)
+
+    # The animation loop, the game is ticked at a fixed rate and drawn at its own rate.
+    if is_async:
+        import asyncio
+        from asyncloop import AsyncGameLoop, get_window_pump
+        loop = AsyncGameLoop(tick, render, pump=get_window_pump(graphics.window), tick_rate=TICK_RATE,
+                             render_rate=RENDER_RATE, fast_forward=FAST_FORWARD)
+    else:
+        loop = GameLoop(tick, render, tick_rate=TICK_RATE, render_rate=RENDER_RATE, fast_forward=FAST_FORWARD,
+                        idle=idle)
+    try:
+        if is_async:
+            asyncio.run(loop.run_async(*coroutines))
+        else:
+            loop.run()
+    finally:
+        # The log is saved even if the game crashes, so the game can be replayed by inputlog.replay.
+        if INPUT_LOG_FILE is not None:
+            graphics.input_log.save(INPUT_LOG_FILE)
+        if event_sink is not None:
+            event_sink.close()
+        if profiler is not None:
+            print(profiler.summary())
+            if TRACE_FILE is not None:
+                profiler.save_trace(TRACE_FILE)
+    print(f'Ticks per second: {loop.get_tick_rate():.1f}, drawings per second: {loop.get_render_rate():.1f}')
+    if is_async:
+        print(f'Frames woke up {loop.get_mean_lateness() * 1000:.2f} ms late on average, '
+              f'{loop.max_lateness * 1000:.2f} ms at most.')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,212 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program steps many independent games of breakout in lockstep with NumPy.
+It follows the rules of breakoutengine.py, but every state is an array over the games,
+so one call of step advances all the games by one frame.
+A finished game is reset automatically, and a lost ball is served again at once,
+as if the user clicked the window immediately.
+"""
+import numpy as np
+from breakoutengine import BRICK_SPACING, BRICK_WIDTH, BRICK_HEIGHT, BRICK_ROWS, BRICK_COLS, BRICK_OFFSET, \
+    BALL_RADIUS, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_OFFSET, INITIAL_Y_SPEED, MAX_X_SPEED, NUM_LIVES
+
+
+class BreakoutBatch:
+    """
+    This class handle the rules of breakout for a batch of games with array operations.
+    """
+    min_x_speed = 1
+
+    def __init__(self, num_games, seed=None, ball_radius=BALL_RADIUS, paddle_width=PADDLE_WIDTH,
+                 paddle_height=PADDLE_HEIGHT, paddle_offset=PADDLE_OFFSET, brick_rows=BRICK_ROWS,
+                 brick_cols=BRICK_COLS, brick_width=BRICK_WIDTH, brick_height=BRICK_HEIGHT,
+                 brick_offset=BRICK_OFFSET, brick_spacing=BRICK_SPACING, lives=NUM_LIVES):
+        """
+        Initialize the state of all the games, and serve the balls.
+
+        :param num_games: Number of games stepped together
+        :param seed: The seed of the random generator serving the balls
+        :param ball_radius: Radius of the ball (in pixels)
+        :param paddle_width: Width of the paddle (in pixels)
+        :param paddle_height: Height of the paddle (in pixels)
+        :param paddle_offset: Vertical offset of the paddle from the window bottom (in pixels)
+        :param brick_rows: Number of rows of bricks
+        :param brick_cols: Number of columns of bricks
+        :param brick_width: Width of a brick (in pixels)
+        :param brick_height: Height of a brick (in pixels)
+        :param brick_offset: Vertical offset of the topmost brick from the window top (in pixels)
+        :param brick_spacing: Space between bricks (in pixels). This space is used for horizontal and vertical spacing
+        :param lives: Number of attempts of each game
+        """
+        self.num_games = num_games
+        self.rng = np.random.default_rng(seed)
+        self.initial_lives = lives
+
+        # The size of the window, the same as BreakoutEngine.
+        self.width = brick_cols * (brick_width + brick_spacing) - brick_spacing
+        self.height = brick_offset + 3 * (brick_rows * (brick_height + brick_spacing) - brick_spacing)
+
+        self.ball_size = ball_radius * 2
+        self.paddle_width = paddle_width
+        self.paddle_height = paddle_height
+        self.paddle_y = self.height - (paddle_height + paddle_offset)
+
+        self.brick_rows = brick_rows
+        self.brick_cols = brick_cols
+        self.brick_width = brick_width
+        self.brick_height = brick_height
+        self.brick_offset = brick_offset
+        self.pitch_x = brick_width + brick_spacing
+        self.pitch_y = brick_height + brick_spacing
+
+        # The state of the games, one entry per game.
+        self.ball_x = np.zeros(num_games)
+        self.ball_y = np.zeros(num_games)
+        self.dx = np.zeros(num_games)
+        self.dy = np.zeros(num_games)
+        self.paddle_x = np.full(num_games, (self.width - paddle_width) / 2)
+        self.lives = np.zeros(num_games, dtype=np.int32)
+        self.remove_bricks_count = np.zeros(num_games, dtype=np.int32)
+        self.bricks = np.ones((num_games, brick_rows, brick_cols), dtype=bool)
+        # A flat view of the bricks, so the brick of each game can be removed with one fancy index.
+        self.__bricks_flat = self.bricks.reshape(-1)
+        self.__game_offsets = np.arange(num_games) * (brick_rows * brick_cols)
+        self.__games = np.arange(num_games)
+
+        self.reset()
+
+    def reset(self, mask=None):
+        """
+        Reset the games, to put all bricks back, restore the lives and serve the ball.
+        :param mask: (ndarray) Boolean array of the games to reset, all the games if it is None.
+        """
+        if mask is None:
+            mask = np.ones(self.num_games, dtype=bool)
+        if not mask.any():
+            return
+        self.bricks[mask] = True
+        self.lives[mask] = self.initial_lives
+        self.remove_bricks_count[mask] = 0
+        self.paddle_x[mask] = (self.width - self.paddle_width) / 2
+        self.serve(mask)
+
+    def serve(self, mask):
+        """
+        Put the balls at the center of the window, and set the random velocity as BreakoutEngine.handle_click.
+        :param mask: (ndarray) Boolean array of the games to serve the ball.
+        """
+        count = int(mask.sum())
+        self.ball_x[mask] = (self.width - self.ball_size) / 2
+        self.ball_y[mask] = (self.height - self.ball_size) / 2
+        dx = self.rng.integers(self.min_x_speed, MAX_X_SPEED + 1, size=count)
+        self.dx[mask] = np.where(self.rng.random(count) > 0.5, -dx, dx)
+        self.dy[mask] = INITIAL_Y_SPEED
+
+    def move_paddle(self, x):
+        """
+        Let the paddles move horizontally with the mouse positions, ensuring they do not move out of the window.
+        :param x: (ndarray) The x position of the mouse of each game
+        """
+        np.clip(x - self.paddle_width / 2, 0, self.width - self.paddle_width, out=self.paddle_x)
+
+    def step(self, paddle_x=None):
+        """
+        Advance all the games by one frame, it follows BreakoutEngine.tick.
+        :param paddle_x: (ndarray) The x position of the mouse of each game, None to keep the paddles.
+        :return: (tuple) The number of bricks removed by each game in this frame,
+                 and the boolean array of the games which were over and have been reset.
+        """
+        if paddle_x is not None:
+            self.move_paddle(paddle_x)
+        self.ball_x += self.dx
+        self.ball_y += self.dy
+        removed = self.handle_ball_hit_obj()
+
+        leaves = self.is_ball_leaves_window()
+        win = ~leaves & self.is_game_win()
+        rest = ~(leaves | win)
+        x_side = rest & self.is_ball_on_x_side()
+        y_side = rest & ~x_side & self.is_ball_on_y_side()
+        np.negative(self.dx, out=self.dx, where=x_side)
+        np.negative(self.dy, out=self.dy, where=y_side)
+
+        # If the ball leaves the bottom of the window, then decrease one attempt.
+        self.lives -= leaves
+        lost = leaves & (self.lives == 0)
+        dones = lost | win
+        self.serve(leaves & ~lost)
+        self.reset(dones)
+        return removed, dones
+
+    def handle_ball_hit_obj(self):
+        """
+        Check the objects touched by the four corners of the balls,
+        and handle the first touched object of each game as BreakoutEngine.handle_ball_hit_obj.
+        :return: (ndarray) The number of bricks removed by each game.
+        """
+        size = self.ball_size
+        # The corners of the balls, in the order of the original canvas queries, in shape (4, num_games).
+        xs = np.stack((self.ball_x, self.ball_x, self.ball_x + size, self.ball_x + size))
+        ys = np.stack((self.ball_y, self.ball_y + size, self.ball_y, self.ball_y + size))
+
+        on_paddle = ((self.paddle_x <= xs) & (xs <= self.paddle_x + self.paddle_width)
+                     & (self.paddle_y <= ys) & (ys <= self.paddle_y + self.paddle_height))
+
+        # The cell of each corner in the brick grid, as BrickGrid.get_index_at.
+        grid_y = ys - self.brick_offset
+        col = np.minimum(np.floor_divide(xs, self.pitch_x), self.brick_cols - 1).astype(np.int64)
+        row = np.minimum(np.floor_divide(grid_y, self.pitch_y), self.brick_rows - 1).astype(np.int64)
+        inside = ((xs >= 0) & (grid_y >= 0)
+                  & (xs - col * self.pitch_x <= self.brick_width) & (grid_y - row * self.pitch_y <= self.brick_height))
+        flat = self.__game_offsets + np.clip(row, 0, None) * self.brick_cols + np.clip(col, 0, None)
+        on_brick = inside & self.__bricks_flat[flat]
+
+        # Only the first corner touching an object is handled.
+        touched = on_paddle | on_brick
+        first = touched.argmax(axis=0)
+        games = self.__games
+        hit_paddle = on_paddle[first, games]
+        hit_brick = touched[first, games] & ~hit_paddle
+
+        # The ball bounces back from the paddle, or from its side if the ball hides the side of the paddle.
+        from_paddle = hit_paddle & (self.dy > 0)
+        on_side = ((self.ball_x + size <= self.paddle_x) | (self.ball_x >= self.paddle_x + self.paddle_width))
+        np.negative(self.dx, out=self.dx, where=from_paddle & on_side)
+        np.negative(self.dy, out=self.dy, where=(from_paddle & ~on_side) | hit_brick)
+
+        # Remove the touched bricks.
+        self.__bricks_flat[flat[first, games][hit_brick]] = False
+        self.remove_bricks_count += hit_brick
+        return hit_brick.astype(np.int32)
+
+    def is_ball_leaves_window(self):
+        """
+        Check if the balls leave the bottom of the window.
+        :return: (ndarray) Boolean array, True if the ball of the game leaves the bottom of the window.
+        """
+        return self.ball_y >= self.height
+
+    def is_game_win(self):
+        """
+        Check if the games are won, the winning condition is that all the bricks are removed.
+        :return: (ndarray) Boolean array, True if the game is won.
+        """
+        return self.remove_bricks_count == self.brick_rows * self.brick_cols
+
+    def is_ball_on_x_side(self):
+        """
+        Check if the balls are on the right or left side of the window.
+        :return: (ndarray) Boolean array, True if the ball of the game is on the right or left side of the window.
+        """
+        return (self.ball_x <= 0) | (self.ball_x + self.ball_size >= self.width)
+
+    def is_ball_on_y_side(self):
+        """
+        Check if the balls are on the top of the window.
+        :return: (ndarray) Boolean array, True if the ball of the game is on the top of the window.
+        """
+        return self.ball_y <= 0
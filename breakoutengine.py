@@ -0,0 +1,695 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program keeps the rules of breakoutgraphics.py in plain data.
+The engine does not create any window, so a game can be simulated headlessly,
+and BreakoutGraphics only follows the state of the engine to draw the game.
+
+The state of a game can be captured by BreakoutEngine.snapshot as a binary blob, and restored by restore,
+to fork a game for a search or to save a game. The blob is little endian:
+    magic (4 bytes) b'BKSS', version (uint8), variant (uint8), rows (uint16), cols (uint16),
+    the ball position and velocity, the paddle position and size (float64), the removed bricks count (uint32),
+    the lives (uint16), the ball is moving (bool), the state of the Mersenne Twister of the random generator
+    (625 uint32, bool and float64 for the next gaussian), the types and the hit points of the cells (a byte each),
+    followed by the state added by the variant of the engine.
+
+A game can also be copied in memory by BreakoutEngine.fork, which is cheaper than a snapshot for a search:
+the copy shares the bricks with the game until one of them changes a brick, see BrickGrid.fork.
+"""
+import random
+import struct
+from brickgrid import BrickGrid, NORMAL
+from collision import sweep_circle_rect
+
+BRICK_SPACING = 5      # Space between bricks (in pixels). This space is used for horizontal and vertical spacing
+BRICK_WIDTH = 40       # Width of a brick (in pixels)
+BRICK_HEIGHT = 15      # Height of a brick (in pixels)
+BRICK_ROWS = 10        # Number of rows of bricks
+BRICK_COLS = 10        # Number of columns of bricks
+BRICK_OFFSET = 50      # Vertical offset of the topmost brick from the window top (in pixels)
+BALL_RADIUS = 10       # Radius of the ball (in pixels)
+PADDLE_WIDTH = 75      # Width of the paddle (in pixels)
+PADDLE_HEIGHT = 15     # Height of the paddle (in pixels)
+PADDLE_OFFSET = 50     # Vertical offset of the paddle from the window bottom (in pixels)
+INITIAL_Y_SPEED = 7    # Initial vertical speed for the ball
+MAX_X_SPEED = 5        # Maximum initial horizontal speed for the ball
+NUM_LIVES = 3          # Number of attempts
+MAX_SWEEP_HITS = 8     # Maximum hits of the ball handled in a frame by the swept collision
+
+SNAPSHOT_MAGIC = b'BKSS'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<4sBBHH')
+ENGINE_STATE = struct.Struct('<8dIH?')
+RNG_STATE = struct.Struct('<625I?d')
+
+# The states returned by BreakoutEngine.tick
+PLAYING = 0            # The game goes on
+LIFE_LOST = 1          # The ball leaves the bottom of the window, and there are still lives left
+GAME_LOST = 2          # The ball leaves the bottom of the window, and there is no life left
+GAME_WON = 3           # All the bricks are removed
+
+
+class Rect:
+    """
+    A rectangle in plain data, which is used for the ball, the paddles and the bricks.
+    """
+    __slots__ = ('x', 'y', 'width', 'height')
+
+    def __init__(self, width, height, x=0, y=0):
+        """
+        :param width: Width of the rectangle (in pixels)
+        :param height: Height of the rectangle (in pixels)
+        :param x: The x position of the upper left corner
+        :param y: The y position of the upper left corner
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def move(self, dx, dy):
+        """
+        Move the rectangle by the given offset.
+        :param dx: Horizontal offset (in pixels)
+        :param dy: Vertical offset (in pixels)
+        """
+        self.x += dx
+        self.y += dy
+
+    def contains(self, x, y):
+        """
+        Check if the point is inside the rectangle, the boundary is included as GRect does.
+        :param x: The x position of the point
+        :param y: The y position of the point
+        :return: (Bool) True if the point is inside the rectangle, False is not.
+        """
+        return self.x <= x <= self.x + self.width and self.y <= y <= self.y + self.height
+
+    def copy(self):
+        """
+        :return: (Rect) A new rectangle of the same size at the same position.
+        """
+        return Rect(self.width, self.height, self.x, self.y)
+
+
+class Brick(Rect):
+    """
+    A brick in plain data, it remembers its cell in the brick grid.
+    The grid keeps only the type of each brick, a Brick is created when the brick is needed, e.g. when it is hit.
+    """
+    __slots__ = ('row', 'col', 'type', 'color')
+
+    def __init__(self, width, height, x, y, row, col, brick_type, color):
+        """
+        :param width: Width of the brick (in pixels)
+        :param height: Height of the brick (in pixels)
+        :param x: The x position of the brick
+        :param y: The y position of the brick
+        :param row: The row of the brick in the grid
+        :param col: The column of the brick in the grid
+        :param brick_type: (int) The type of the brick, see brickgrid.py
+        :param color: The color of the brick
+        """
+        super().__init__(width, height, x, y)
+        self.row = row
+        self.col = col
+        self.type = brick_type
+        self.color = color
+
+
+class ForkedRandom:
+    """
+    The random generator of a fork, it starts from the state of the random generator of the game.
+    Copying the state of a random generator takes longer than a tick, and most forks of a search never draw
+    a number, so the generator is created when the fork draws its first number.
+    """
+    __slots__ = ('__state', '__rng')
+
+    def __init__(self, state):
+        """
+        :param state: The state of the random generator, returned by random.Random.getstate
+        """
+        self.__state = state
+        self.__rng = None
+
+    def getstate(self):
+        """
+        :return: The state of the random generator, as random.Random.getstate.
+        """
+        return self.__state if self.__rng is None else self.__rng.getstate()
+
+    def __getattr__(self, name):
+        """
+        Get the other methods of random.Random, e.g. randint, from the random generator.
+        :param name: (str) The name of the method
+        """
+        if self.__rng is None:
+            # The seed is replaced by the state, so the generator is not seeded.
+            rng = random.Random.__new__(random.Random)
+            rng.setstate(self.__state)
+            self.__rng = rng
+        return getattr(self.__rng, name)
+
+
+class BreakoutEngine:
+    """
+    This class handle the rules of breakout without any graphics.
+    """
+    color_arr = ['#f28179', '#f2f279', '#99f279', '#79d6f2', '#b697f0']
+    min_x_speed = 1
+    snapshot_variant = 0    # The variant of the engine in the snapshots, a snapshot is restored by the same variant
+
+    def __init__(self, ball_radius=BALL_RADIUS, paddle_width=PADDLE_WIDTH, paddle_height=PADDLE_HEIGHT,
+                 paddle_offset=PADDLE_OFFSET, brick_rows=BRICK_ROWS, brick_cols=BRICK_COLS, brick_width=BRICK_WIDTH,
+                 brick_height=BRICK_HEIGHT, brick_offset=BRICK_OFFSET, brick_spacing=BRICK_SPACING, lives=NUM_LIVES,
+                 rng=None, swept=False, level=None):
+        """
+        Initialize the game state, a paddle, a ball at the center of the window, and bricks.
+
+        All parameters can also be specified, but will default to reasonable values.
+
+        :param ball_radius: Radius of the ball (in pixels)
+        :param paddle_width: Width of the paddle (in pixels)
+        :param paddle_height: Height of the paddle (in pixels)
+        :param paddle_offset: Vertical offset of the paddle from the window bottom (in pixels)
+        :param brick_rows: Number of rows of bricks
+        :param brick_cols: Number of columns of bricks
+        :param brick_width: Width of a brick (in pixels)
+        :param brick_height: Height of a brick (in pixels)
+        :param brick_offset: Vertical offset of the topmost brick from the window top (in pixels)
+        :param brick_spacing: Space between bricks (in pixels). This space is used for horizontal and vertical spacing
+        :param lives: Number of attempts
+        :param rng: (random.Random) The random generator of the game, the random module if it is None.
+        :param swept: (Bool) True to find the exact time of impact along the path of the ball,
+                      instead of checking the corners of the ball once per frame.
+        :param level: (Level) The bricks of the level in levels.py, brick_rows and brick_cols are given by the level.
+                      The uniform bricks of color_arr if it is None.
+        """
+        self.level = level
+        if level is not None:
+            brick_rows = level.rows
+            brick_cols = level.cols
+        self.swept = swept
+        self.rng = random if rng is None else rng
+        self.is_ball_moving = False
+        self.remove_bricks_count = 0
+        self.paddle_hits = 0        # Number of bounces of the ball on the paddle, it is not kept by snapshot
+        self.lives = lives
+        self.initial_lives = lives  # The lives at the start of the game, e.g. the number of hearts drawn
+
+        # The size of the window, with some extra space
+        self.width = brick_cols * (brick_width + brick_spacing) - brick_spacing
+        self.height = brick_offset + 3 * (brick_rows * (brick_height + brick_spacing) - brick_spacing)
+
+        # Create a paddle
+        self.paddle = None
+        self.paddle_offset = paddle_offset
+        self.create_paddle(paddle_width, paddle_height)
+
+        # Center a ball in the window
+        self.ball = self._create_ball(ball_radius)
+        # The balls in the game, there is only one ball in the basic version.
+        self.balls = [self.ball]
+        self.dx = 0
+        self.dy = 0
+        self.init_ball()
+
+        # Create bricks
+        self.brick_width = brick_width
+        self.brick_height = brick_height
+        self.brick_offset = brick_offset
+        self.brick_spacing = brick_spacing
+        self.brick_rows = brick_rows
+        self.brick_cols = brick_cols
+        # The bricks are kept by a uniform grid, a byte per brick.
+        self.brick_grid = BrickGrid(brick_rows, brick_cols, brick_width, brick_height, brick_offset, brick_spacing)
+        # The bricks removed since the renderer last followed the engine.
+        self.removed_bricks = []
+        self._create_bricks()
+
+    def init_ball(self):
+        """
+        Initialize the movement state, position, and velocity of the ball.
+        """
+        self.is_ball_moving = False
+        self.ball.x = (self.width - self.ball.width) / 2
+        self.ball.y = (self.height - self.ball.height) / 2
+        self.dx = 0
+        self.dy = 0
+
+    def create_paddle(self, paddle_width, paddle_height):
+        """
+        Create a paddle at the center of the window.
+        :param paddle_width: Width of the paddle (in pixels)
+        :param paddle_height: Height of the paddle (in pixels)
+        """
+        paddle_x = (self.width - paddle_width) / 2
+        paddle_y = self.height - (paddle_height + self.paddle_offset)
+        self.paddle = Rect(paddle_width, paddle_height, paddle_x, paddle_y)
+
+    def get_dx(self):
+        """
+        The getter of the dx attribute
+        :return: x velocity
+        """
+        return self.dx
+
+    def get_dy(self):
+        """
+        The getter of the dy attribute
+        :return: y velocity
+        """
+        return self.dy
+
+    def tick(self, dt=1):
+        """
+        Advance the game by one frame, it follows the animation loop of breakout.main.
+        :param dt: The length of the frame, in the frames of breakout.main.
+                   A long frame is accurate only with the swept collision.
+        :return: (int) One of PLAYING, LIFE_LOST, GAME_LOST and GAME_WON.
+        """
+        if self.swept:
+            self._move_objects(dt)
+            # The walls are handled along the path of the ball.
+            self.sweep_ball(dt)
+        else:
+            self.ball.move(self.dx * dt, self.dy * dt)
+            self._move_objects(dt)
+            self.handle_ball_hit_obj()
+
+        if self.is_ball_leaves_window():
+            self.init_ball()
+            # If the ball leaves the bottom of the window, then decrease one attempt.
+            self.lives -= 1
+            # If attempts are equal to 0, then game over.
+            if self.lives == 0:
+                return GAME_LOST
+            return LIFE_LOST
+        elif self.is_game_win():
+            self.init_ball()
+            return GAME_WON
+        elif self.swept:
+            pass
+        elif self.is_ball_on_x_side():
+            self.change_x_direction()
+        elif self.is_ball_on_y_side():
+            self.change_y_direction()
+        return PLAYING
+
+    def sweep_ball(self, dt=1):
+        """
+        Move the ball along its path, and bounce it from the walls and the objects at the exact time of impact.
+        Several hits can be handled in a frame, at most MAX_SWEEP_HITS.
+        :param dt: The length of the frame, in the frames of breakout.main.
+        """
+        ball = self.ball
+        radius = ball.width / 2
+        remaining = dt
+        for _ in range(MAX_SWEEP_HITS):
+            vx = self.dx
+            vy = self.dy
+            if remaining <= 0 or (vx == 0 and vy == 0):
+                return
+            cx = ball.x + radius
+            cy = ball.y + radius
+
+            # Find the first wall or object on the path.
+            hit_t = remaining
+            hit_obj = None
+            hit_nx = hit_ny = 0
+            walls = []
+            if vx < 0:
+                walls.append(((radius - cx) / vx, 1, 0))
+            elif vx > 0:
+                walls.append(((self.width - radius - cx) / vx, -1, 0))
+            if vy < 0:
+                walls.append(((radius - cy) / vy, 0, 1))
+            for t, nx, ny in walls:
+                # A ball already beyond the wall bounces at once.
+                t = max(t, 0)
+                if t < hit_t or (t == hit_t and hit_obj is None):
+                    hit_t, hit_nx, hit_ny = t, nx, ny
+                    # The engine itself stands for the walls.
+                    hit_obj = self
+
+            end_x = ball.x + vx * remaining
+            end_y = ball.y + vy * remaining
+            left = min(ball.x, end_x)
+            top = min(ball.y, end_y)
+            candidates = self._get_paddles() + [self.get_brick(index) for index in self.brick_grid.get_indices_in(
+                left, top, max(ball.x, end_x) + ball.width - left, max(ball.y, end_y) + ball.height - top)]
+            for obj in candidates:
+                hit = sweep_circle_rect(cx, cy, radius, vx, vy, obj.x, obj.y, obj.width, obj.height, hit_t)
+                if hit is not None and (hit[0] < hit_t or hit_obj is None):
+                    hit_t, hit_nx, hit_ny = hit
+                    hit_obj = obj
+
+            ball.move(vx * hit_t, vy * hit_t)
+            remaining -= hit_t
+            if hit_obj is None:
+                return
+            if hit_obj is not self:
+                self._handle_ball_sweep_hit(hit_obj)
+            # Bounce on the axis of the touched surface.
+            if abs(hit_nx) > abs(hit_ny):
+                if self.dx * hit_nx < 0:
+                    self.change_x_direction()
+            elif self.dy * hit_ny < 0:
+                self.change_y_direction()
+
+    def get_object_at(self, x, y):
+        """
+        Get the topmost object containing the point, as GWindow.get_object_at does.
+        :param x: The x position of the point
+        :param y: The y position of the point
+        :return: (Rect) The paddle or a brick, None if there is no object at the point.
+        """
+        # The paddle moves, so it is checked by itself instead of being indexed by the grid.
+        if self.paddle.contains(x, y):
+            return self.paddle
+        index = self.brick_grid.get_index_at(x, y)
+        return None if index is None else self.get_brick(index)
+
+    def get_brick(self, index):
+        """
+        Get the brick of the cell.
+        :param index: (int) The index of the cell in the brick grid, row * brick_cols + col
+        :return: (Brick) The brick, None if the cell is empty.
+        """
+        grid = self.brick_grid
+        brick_type = grid.get_type(index)
+        if not brick_type:
+            return None
+        row, col = divmod(index, self.brick_cols)
+        return Brick(self.brick_width, self.brick_height, grid.get_x(index), grid.get_y(index), row, col,
+                     brick_type, self._brick_color(row, col, brick_type))
+
+    def get_bricks(self):
+        """
+        Get the remaining bricks.
+        :return: (generator) The bricks in row-major order.
+        """
+        types = self.brick_grid.types
+        for index in range(len(types)):
+            if types[index]:
+                yield self.get_brick(index)
+
+    def get_brick_layout(self):
+        """
+        Get the position and the color of every remaining brick, without creating the bricks.
+        The x positions are computed once per column and the y positions once per row.
+        :return: (list) An (index, x, y, color) tuple per brick, in row-major order.
+        """
+        grid = self.brick_grid
+        types = grid.types
+        cols = self.brick_cols
+        xs = [grid.get_x(col) for col in range(cols)]
+        layout = []
+        for row in range(self.brick_rows):
+            start = row * cols
+            y = grid.get_y(start)
+            for col in range(cols):
+                brick_type = types[start + col]
+                if brick_type:
+                    layout.append((start + col, xs[col], y, self._brick_color(row, col, brick_type)))
+        return layout
+
+    def snapshot(self):
+        """
+        Capture the state of the game, it can be restored by an engine of the same variant and the same bricks.
+        :return: (bytes) The state as a binary blob.
+        """
+        parts = [SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.snapshot_variant,
+                                      self.brick_rows, self.brick_cols)]
+        self._pack_state(parts)
+        return b''.join(parts)
+
+    def restore(self, data):
+        """
+        Restore the state captured by snapshot, the bricks removed before are forgotten.
+        :param data: (bytes) The blob returned by snapshot
+        """
+        magic, version, variant, rows, cols = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError('Not a snapshot of breakout, or an unsupported version.')
+        if variant != self.snapshot_variant or rows != self.brick_rows or cols != self.brick_cols:
+            raise ValueError('The snapshot is of another variant of the engine, or of other bricks.')
+        self._unpack_state(memoryview(data), SNAPSHOT_HEADER.size)
+        self.removed_bricks.clear()
+
+    def fork(self):
+        """
+        Copy the game in memory, e.g. to simulate a future of the game without changing it.
+        The copy shares the bricks with this game until one of them changes a brick,
+        the other state is copied, and the bricks removed before are not.
+        :return: (BreakoutEngine) The copy, of the same variant.
+        """
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        self._fork_state(clone)
+        return clone
+
+    def handle_ball_hit_obj(self):
+        """
+        This method is called every single loop, it will check if the ball touched the object,
+        and call method: _handle_ball_hit to Handle the ball hit the object.
+        """
+        ball = self.ball
+        # The four corners of the ball, in the order of the original canvas queries.
+        corners = ((ball.x, ball.y), (ball.x, ball.y + ball.height),
+                   (ball.x + ball.width, ball.y), (ball.x + ball.width, ball.y + ball.height))
+        for index, (x, y) in enumerate(corners):
+            obj = self.get_object_at(x, y)
+            if obj is not None:
+                self._handle_ball_hit(index, obj)
+                break
+
+    def hit_brick(self, brick):
+        """
+        Decrease the hit points of the brick touched by the ball, the brick is broken when no hit point is left.
+        :param brick: (Brick) The brick touched by the ball.
+        """
+        if self.brick_grid.hit(brick.row * self.brick_cols + brick.col) == 0:
+            self._hit_brick(brick)
+
+    def remove_brick(self, brick):
+        """
+        Remove the brick from the game.
+        :param brick: (Brick) The brick to remove.
+        """
+        self.brick_grid.remove(brick.row * self.brick_cols + brick.col)
+        self.removed_bricks.append(brick)
+        self.remove_bricks_count += 1
+
+    def is_ball_leaves_window(self):
+        """
+        Check if the ball leaves the bottom of the window.
+        :return: (Bool) True if the ball leaves the bottom of the window, False is not.
+        """
+        return self.ball.y >= self.height
+
+    def is_game_win(self):
+        """
+        Check if the user win the game.
+        The winning condition is that when the user remove all the bricks.
+        :return: (Bool) True if the user win the game, False is not.
+        """
+        return self.brick_grid.count == 0
+
+    def is_ball_on_x_side(self):
+        """
+        Check if the ball on the right or left side of the window.
+        :return: (Bool) True if the ball on the right or left side of the window, False is not.
+        """
+        return self.ball.x <= 0 or self.ball.x + self.ball.width >= self.width
+
+    def is_ball_on_y_side(self):
+        """
+        Check if the ball on the top of the window.
+        :return: (Bool) True if the ball on the top of the window, False is not.
+        """
+        return self.ball.y <= 0
+
+    def change_x_direction(self):
+        """
+        Change the x direction of the ball.
+        """
+        self.dx = -self.dx
+
+    def change_y_direction(self):
+        """
+        Change the y direction of the ball.
+        """
+        self.dy = -self.dy
+
+    def handle_click(self):
+        """
+        Handle the mouse click.
+        if the ball is not moving, the method will be executed.
+        This method set the random velocity within the reasonable range of the ball.
+        """
+        if not self.is_ball_moving:
+            self.is_ball_moving = True
+            self.dy = INITIAL_Y_SPEED
+            self.dx = self.rng.randint(self.min_x_speed, MAX_X_SPEED)
+            if self.rng.random() > 0.5:
+                self.dx = -self.dx
+
+    def move_paddle(self, x):
+        """
+        Let the paddle move horizontally with the mouse position, ensuring it does not move out of the window.
+        :param x: The x position of the mouse
+        """
+        self.paddle.x = x - self.paddle.width/2
+
+        # If mouse out of the window.
+        if self.paddle.x <= 0:
+            self.paddle.x = 0
+        elif self.paddle.x + self.paddle.width >= self.width:
+            self.paddle.x = self.width-self.paddle.width
+
+    def _create_ball(self, ball_radius):
+        """
+        Create the ball.
+        :param ball_radius: Radius of the ball (in pixels)
+        :return: (Rect) The ball.
+        """
+        return Rect(ball_radius*2, ball_radius*2)
+
+    def _move_objects(self, dt=1):
+        """
+        Move the objects which move by themselves in a frame, except the ball.
+        There is no such object in the basic version.
+        :param dt: The length of the frame, in the frames of breakout.main.
+        """
+
+    def _get_paddles(self):
+        """
+        Get the paddles the ball can hit, they are not indexed by the brick grid.
+        :return: (list) The paddles.
+        """
+        return [self.paddle]
+
+    def _handle_ball_hit(self, index, obj):
+        """
+        Handle the ball hit the object.
+        if the ball hit the brick, the brick will be disappeared, and the ball will bounce back.
+        if the ball hit the paddle, the ball will bounce back.
+        :param index: (int) The index of the corner of the ball which touched the object.
+        :param obj: (Rect) Can not be None. The object touched by the ball.
+        """
+        if obj is self.paddle:
+            if self.dy > 0:
+                self._hit_paddle(obj)
+                # The ball hides the left or right side of paddle.
+                if self.ball.x + self.ball.width <= self.paddle.x or self.ball.x >= self.paddle.x + self.paddle.width:
+                    self.change_x_direction()
+                else:
+                    self.change_y_direction()
+        else:
+            self.hit_brick(obj)
+            self.change_y_direction()
+
+    def _handle_ball_sweep_hit(self, obj):
+        """
+        Handle the ball hit the object found by the swept collision, the bounce is handled by sweep_ball.
+        :param obj: (Rect) The object touched by the ball.
+        """
+        if obj in self._get_paddles():
+            self._hit_paddle(obj)
+        else:
+            self.hit_brick(obj)
+
+    def _hit_paddle(self, paddle):
+        """
+        Count the bounce of the ball on the paddle, for the statistics of the game.
+        :param paddle: (Rect) The paddle touched by the ball.
+        """
+        self.paddle_hits += 1
+
+    def _hit_brick(self, brick):
+        """
+        Handle the ball hit the brick, the brick will be disappeared.
+        :param brick: (Brick) The brick touched by the ball.
+        """
+        self.remove_brick(brick)
+
+    def _brick_color(self, row, col, brick_type=NORMAL):
+        """
+        Get the color of the brick.
+        :param row: The row of the brick
+        :param col: The column of the brick
+        :param brick_type: (int) The type of the brick
+        :return: (str) The color of the brick.
+        """
+        if self.level is not None:
+            return self.level.get_color(row * self.brick_cols + col)
+        # Each two rows of bricks use the same color.
+        return self.color_arr[int(row / 2) % len(self.color_arr)]
+
+    def _pack_state(self, parts):
+        """
+        Append the state of the game to a snapshot, a variant of the engine appends its own state after it.
+        :param parts: (list) The parts of the snapshot
+        """
+        ball = self.ball
+        paddle = self.paddle
+        parts.append(ENGINE_STATE.pack(ball.x, ball.y, self.dx, self.dy, paddle.x, paddle.y, paddle.width,
+                                       paddle.height, self.remove_bricks_count, self.lives, self.is_ball_moving))
+        _, internal_state, gauss_next = self.rng.getstate()
+        parts.append(RNG_STATE.pack(*internal_state, gauss_next is not None, gauss_next or 0.0))
+        parts.append(self.brick_grid.types)
+        parts.append(self.brick_grid.hit_points)
+
+    def _fork_state(self, clone):
+        """
+        Give the copy made by fork its own ball, paddle, bricks and random generator,
+        a variant of the engine copies its own state after it.
+        :param clone: (BreakoutEngine) The copy, it still shares every attribute with this game.
+        """
+        clone.ball = self.ball.copy()
+        clone.balls = [clone.ball]
+        clone.paddle = self.paddle.copy()
+        clone.brick_grid = self.brick_grid.fork()
+        clone.removed_bricks = []
+        # The copy draws the same numbers as this game would, without drawing them from this game.
+        clone.rng = ForkedRandom(self.rng.getstate())
+
+    def _unpack_state(self, data, offset):
+        """
+        Read the state of the game from a snapshot, in the order of _pack_state.
+        :param data: (memoryview) The snapshot
+        :param offset: (int) The position of the state
+        :return: (int) The position after the state.
+        """
+        ball = self.ball
+        (ball.x, ball.y, self.dx, self.dy, paddle_x, paddle_y, paddle_width, paddle_height,
+         self.remove_bricks_count, self.lives, self.is_ball_moving) = ENGINE_STATE.unpack_from(data, offset)
+        offset += ENGINE_STATE.size
+        paddle = self.paddle
+        if paddle.width != paddle_width or paddle.height != paddle_height:
+            # A paddle of another size is a new paddle, as create_paddle does.
+            self.paddle = Rect(paddle_width, paddle_height, paddle_x, paddle_y)
+        else:
+            paddle.x = paddle_x
+            paddle.y = paddle_y
+
+        rng_state = RNG_STATE.unpack_from(data, offset)
+        offset += RNG_STATE.size
+        self.rng.setstate((3, rng_state[:625], rng_state[626] if rng_state[625] else None))
+
+        cells = len(self.brick_grid)
+        self.brick_grid.load(data[offset:offset + cells], data[offset + cells:offset + 2 * cells])
+        return offset + 2 * cells
+
+    def _create_bricks(self):
+        """
+        Put the bricks of the level in the grid, or fill every cell with a normal brick if there is no level.
+        """
+        if self.level is not None:
+            self.brick_grid.load(self.level.types, self.level.hit_points)
+        else:
+            self.brick_grid.fill(NORMAL)
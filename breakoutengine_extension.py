@@ -0,0 +1,266 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program keeps the rules of breakoutgraphics_extension.py in plain data.
+In addition to the rules of breakoutengine.py, it handles the score, the red bricks,
+the special events and the block paddle.
+"""
+import struct
+from breakoutengine import BreakoutEngine, Rect, PADDLE_WIDTH, PADDLE_HEIGHT
+from brickgrid import NORMAL, RED
+
+BLOCK_PADDLE_MAX_DX = 8  # Maximum horizontal speed of the block paddle
+NUM_RED_BRICKS = 3       # Number of red bricks
+RED_BRICK_COLOR = 'red'
+
+# The state added to a snapshot: the score, the remaining red bricks, the position, size and speed of
+# the block paddle, and if it is in the game.
+EXTENSION_STATE = struct.Struct('<IB5d?')
+
+
+class BreakoutEngineExtension(BreakoutEngine):
+    """
+    This class handle the rules of the extension version of breakout without any graphics.
+    """
+    color_arr = ['#222222', '#444444', '#666666', '#999999', '#bbbbbb']
+    min_x_speed = 2
+    snapshot_variant = 1
+
+    def __init__(self, paddle_width=PADDLE_WIDTH, paddle_height=PADDLE_HEIGHT, **kwargs):
+        """
+        Initialize the game state, in addition to BreakoutEngine, there are the score,
+        the red bricks and the block paddle.
+
+        :param paddle_width: Width of the paddle (in pixels)
+        :param paddle_height: Height of the paddle (in pixels)
+        :param kwargs: The other parameters of BreakoutEngine
+        """
+        self.score = 0
+        self.num_red_bricks = 0     # Number of remaining red bricks
+        super().__init__(paddle_width=paddle_width, paddle_height=paddle_height, **kwargs)
+
+        # Create block paddle, it joins the game when the third brick is removed.
+        self.block_paddle = Rect(paddle_width, paddle_height)
+        self.block_paddle_dx = 0
+        self.is_block_paddle_active = False
+        self.block_paddle_hits = 0  # Number of bounces of the ball on the block paddle
+
+    def get_object_at(self, x, y):
+        """
+        Get the topmost object containing the point, as GWindow.get_object_at does.
+        :param x: The x position of the point
+        :param y: The y position of the point
+        :return: (Rect) The paddle, the block paddle or a brick, None if there is no object at the point.
+        """
+        if self.is_block_paddle_active and self.block_paddle.contains(x, y):
+            return self.block_paddle
+        return super().get_object_at(x, y)
+
+    def is_block_paddle_need_turn_around(self):
+        """
+        Check if the block paddle is on the right or left side of the window.
+        :return: (Bool) True is the block paddle need to turn around, False is not.
+        """
+        return self.block_paddle.x <= 0 or self.block_paddle.x + self.block_paddle.width >= self.width
+
+    def change_block_paddle_dy(self):
+        """
+        Change the horizontal speed of the block paddle.
+        """
+        self.block_paddle_dx = -self.block_paddle_dx
+
+    def get_block_paddle_dx(self):
+        """
+        The getter of the block_paddle_dx attribute.
+        :return: The horizontal speed of the block paddle.
+        """
+        return self.block_paddle_dx
+
+    def is_red_brick(self, brick):
+        """
+        Check the brick is red brick.
+        :param brick: (Brick) The brick to check.
+        :return: (Bool) True if the brick is red brick, False is not.
+        """
+        return brick.type == RED
+
+    def _move_objects(self, dt=1):
+        """
+        Move the block paddle in a frame.
+        :param dt: The length of the frame, in the frames of breakout_extension.main.
+        """
+        # The block paddle does not move before it is set, and turning it would only change the sign of 0.0.
+        if self.block_paddle_dx and self.is_block_paddle_need_turn_around():
+            self.change_block_paddle_dy()
+        self.block_paddle.move(self.block_paddle_dx * dt, 0)
+
+    def _get_paddles(self):
+        """
+        Get the paddles the ball can hit, the block paddle is included after it joins the game.
+        :return: (list) The paddles.
+        """
+        if self.is_block_paddle_active:
+            return [self.paddle, self.block_paddle]
+        return [self.paddle]
+
+    def _handle_ball_hit(self, index, obj):
+        """
+        Handle the ball hit the object.
+
+        if the ball hit the paddle, the ball will bounce back.
+
+        if the ball hit the normal brick, the score will be added 1,
+        the brick will be disappeared, and the ball will bounce back.
+
+        if the ball hit the red brick, the score will be added 5, and a special event will occur.
+
+        :param index: (int) The index of the corner of the ball which touched the object.
+        :param obj: (Rect) Can not be None. The object touched by the ball.
+        """
+        if obj is self.paddle:
+            if self.dy > 0:
+                self._hit_paddle(obj)
+                self.change_y_direction()
+        elif obj is self.block_paddle:
+            # The ball hit the bottom of the block paddle.
+            if index == 0 or index == 2:
+                if self.dy < 0:
+                    self._hit_paddle(obj)
+                    self.change_y_direction()
+            # The ball hit the top of the block paddle.
+            if index == 1 or index == 3:
+                if self.dy > 0:
+                    self._hit_paddle(obj)
+                    self.change_y_direction()
+        else:
+            self.hit_brick(obj)
+            self.change_y_direction()
+
+    def _hit_paddle(self, paddle):
+        """
+        Count the bounce of the ball on the paddle or the block paddle.
+        :param paddle: (Rect) The paddle touched by the ball.
+        """
+        if paddle is self.block_paddle:
+            self.block_paddle_hits += 1
+        else:
+            super()._hit_paddle(paddle)
+
+    def _hit_brick(self, brick):
+        """
+        Handle the ball hit the brick.
+        The score will be added 1 for the normal brick, or added 5 for the red brick with a special event,
+        and the brick will be disappeared.
+        :param brick: (Brick) The brick touched by the ball.
+        """
+        if self.is_red_brick(brick):
+            self.score += 5
+            self._process_special_event(brick)
+        else:
+            self.score += 1
+        self.remove_brick(brick)
+        # If the count of removed bricks is multiples of 3,
+        # then reset the position and horizontal speed of the block paddle.
+        if self.remove_bricks_count > 0 and self.remove_bricks_count % 3 == 0:
+            self._set_block_paddle()
+
+    def _process_special_event(self, brick):
+        """
+        Processes the special event.
+        The paddle becomes longer or shorter, or the velocity of the ball becomes faster.
+        :param brick: (Brick) One of the red bricks.
+        """
+        self.num_red_bricks -= 1
+
+        idx = self.num_red_bricks
+        if idx == 2:
+            # The paddle becomes longer.
+            self.create_paddle(self.paddle.width+50, self.paddle.height)
+        elif idx == 1:
+            # The paddle becomes shorter.
+            self.create_paddle(self.paddle.width-80, self.paddle.height)
+        elif idx == 0:
+            # The velocity of the ball becomes faster.
+            if self.dx < 0:
+                self.dx -= 5
+            else:
+                self.dx += 5
+            self.dy -= 5
+
+    def _set_block_paddle(self):
+        """
+        Set the position and horizontal speed of the block paddle.
+        """
+        self.block_paddle_dx = self.rng.randint(1, BLOCK_PADDLE_MAX_DX)
+        y = self.rng.randint(int(self.height/2), int(self.paddle.y) - 10)
+        x = self.rng.randint(0, int(self.width - self.block_paddle.width))
+        self.block_paddle.x = x
+        self.block_paddle.y = y
+        if self.remove_bricks_count == 3:
+            self.is_block_paddle_active = True
+
+    def _pack_state(self, parts):
+        """
+        Append the state of the game to a snapshot, with the score and the block paddle.
+        :param parts: (list) The parts of the snapshot
+        """
+        super()._pack_state(parts)
+        block_paddle = self.block_paddle
+        parts.append(EXTENSION_STATE.pack(self.score, self.num_red_bricks, block_paddle.x, block_paddle.y,
+                                          block_paddle.width, block_paddle.height, self.block_paddle_dx,
+                                          self.is_block_paddle_active))
+
+    def _fork_state(self, clone):
+        """
+        Give the copy made by fork its own state, with the block paddle.
+        :param clone: (BreakoutEngineExtension) The copy
+        """
+        super()._fork_state(clone)
+        clone.block_paddle = self.block_paddle.copy()
+
+    def _unpack_state(self, data, offset):
+        """
+        Read the state of the game from a snapshot, in the order of _pack_state.
+        :param data: (memoryview) The snapshot
+        :param offset: (int) The position of the state
+        :return: (int) The position after the state.
+        """
+        offset = super()._unpack_state(data, offset)
+        block_paddle = self.block_paddle
+        (self.score, self.num_red_bricks, block_paddle.x, block_paddle.y, block_paddle.width, block_paddle.height,
+         self.block_paddle_dx, self.is_block_paddle_active) = EXTENSION_STATE.unpack_from(data, offset)
+        return offset + EXTENSION_STATE.size
+
+    def _create_bricks(self):
+        """
+        Create bricks row by row, three of them at random positions are red bricks.
+        A level places its own red bricks.
+        """
+        if self.level is not None:
+            super()._create_bricks()
+            self.num_red_bricks = self.brick_grid.types.count(RED)
+            return
+
+        # Get random cells of red bricks, the sample has no duplicate cells, so no cell is drawn again.
+        cells = self.brick_rows * self.brick_cols
+        red_cells = self.rng.sample(range(cells), min(NUM_RED_BRICKS, cells))
+
+        super()._create_bricks()
+        for index in red_cells:
+            self.brick_grid.add(index, RED)
+        self.num_red_bricks = len(red_cells)
+
+    def _brick_color(self, row, col, brick_type=NORMAL):
+        """
+        Get the color of the brick, the red bricks are red unless the level gives their color.
+        :param row: The row of the brick
+        :param col: The column of the brick
+        :param brick_type: (int) The type of the brick
+        :return: (str) The color of the brick.
+        """
+        if brick_type == RED and self.level is None:
+            return RED_BRICK_COLOR
+        return super()._brick_color(row, col, brick_type)
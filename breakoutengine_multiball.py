@@ -0,0 +1,298 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program keeps the rules of the multi-ball version of breakout in plain data.
+In addition to the rules of breakoutengine_extension.py, every POWER_UP_BRICKS removed bricks,
+each ball splits into two, so there can be hundreds of balls in the window.
+A life is lost only when the last ball leaves the bottom of the window.
+
+The balls are checked against the paddles with a sweep and prune along the x axis:
+the balls are kept sorted by their left side, and only the balls overlapping a paddle in x are checked in y.
+The balls move a little in a frame, so the order barely changes, and sorting it again is almost linear.
+The bricks are a static band indexed by the brick grid, only the balls overlapping the band look up the grid.
+The sweep and prune covers only the discrete collision. With the swept collision, sweep_ball moves each ball
+along its path and checks it against every paddle and the bricks of the grid on the path;
+there are at most two paddles, so a sweep over the paddles costs more than it saves there.
+"""
+import struct
+from operator import attrgetter
+from breakoutengine import Rect, LIFE_LOST, GAME_LOST, GAME_WON, PLAYING
+from breakoutengine_extension import BreakoutEngineExtension
+
+POWER_UP_BRICKS = 10    # Each ball splits into two every time this number of bricks are removed
+MAX_BALLS = 512         # Maximum number of balls in the window
+
+_get_x = attrgetter('x')    # The sort key of the sweep, the left side of a ball or a paddle
+
+# The state added to a snapshot: the number of the other balls, and the position and velocity of each of them.
+BALL_COUNT = struct.Struct('<H')
+BALL_STATE = struct.Struct('<4d')
+
+
+class Ball(Rect):
+    """
+    A ball in plain data, it keeps its own velocity.
+    """
+    __slots__ = ('dx', 'dy')
+
+    def __init__(self, width, height, x=0, y=0, dx=0, dy=0):
+        """
+        :param width: Width of the ball (in pixels)
+        :param height: Height of the ball (in pixels)
+        :param x: The x position of the upper left corner
+        :param y: The y position of the upper left corner
+        :param dx: x velocity
+        :param dy: y velocity
+        """
+        super().__init__(width, height, x, y)
+        self.dx = dx
+        self.dy = dy
+
+    def copy(self):
+        """
+        :return: (Ball) A new ball of the same size at the same position, with the same velocity.
+        """
+        return Ball(self.width, self.height, self.x, self.y, self.dx, self.dy)
+
+
+class BreakoutEngineMultiBall(BreakoutEngineExtension):
+    """
+    This class handle the rules of the multi-ball version of breakout without any graphics.
+    The ball, dx and dy of the engine are the current ball and its velocity,
+    so the rules of the extension version are applied to each ball in turn.
+    """
+    snapshot_variant = 2
+
+    def __init__(self, max_balls=MAX_BALLS, **kwargs):
+        """
+        :param max_balls: (int) Maximum number of balls in the window
+        :param kwargs: The parameters of BreakoutEngineExtension
+        """
+        self.max_balls = max_balls
+        # The balls sorted by their left side, for the sweep and prune.
+        self.__sorted_balls = []
+        # The balls split from the others during a frame, they join the game at the end of the frame.
+        self.__new_balls = []
+        super().__init__(**kwargs)
+        self.__sorted_balls = list(self.balls)
+
+    @property
+    def dx(self):
+        """
+        :return: x velocity of the current ball
+        """
+        return self.ball.dx
+
+    @dx.setter
+    def dx(self, value):
+        self.ball.dx = value
+
+    @property
+    def dy(self):
+        """
+        :return: y velocity of the current ball
+        """
+        return self.ball.dy
+
+    @dy.setter
+    def dy(self, value):
+        self.ball.dy = value
+
+    def init_ball(self):
+        """
+        Keep only the first ball, and put it back at the center of the window.
+        """
+        self.ball = self.balls[0]
+        del self.balls[1:]
+        self.__sorted_balls = list(self.balls)
+        self.__new_balls.clear()
+        super().init_ball()
+
+    def tick(self, dt=1):
+        """
+        Advance the game by one frame, every ball is moved and checked.
+        :param dt: The length of the frame, in the frames of breakout_extension.main.
+        :return: (int) One of PLAYING, LIFE_LOST, GAME_LOST and GAME_WON.
+        """
+        balls = self.balls
+        if self.swept:
+            # Each ball is checked along its path by itself, the sweep and prune is for the discrete collision.
+            self._move_objects(dt)
+            for ball in balls:
+                self.ball = ball
+                self.sweep_ball(dt)
+        else:
+            for ball in balls:
+                ball.move(ball.dx * dt, ball.dy * dt)
+            self._move_objects(dt)
+            self.handle_ball_hit_obj()
+        self.__add_new_balls()
+
+        # Forget the balls leaving the bottom of the window.
+        if any(ball.y >= self.height for ball in balls):
+            remaining = [ball for ball in balls if ball.y < self.height]
+            if remaining:
+                balls[:] = remaining
+                self.__sorted_balls = [ball for ball in self.__sorted_balls if ball.y < self.height]
+        self.ball = balls[0]
+
+        if self.is_ball_leaves_window():
+            # The last ball leaves the window.
+            self.init_ball()
+            self.lives -= 1
+            if self.lives == 0:
+                return GAME_LOST
+            return LIFE_LOST
+        elif self.is_game_win():
+            self.init_ball()
+            return GAME_WON
+        elif not self.swept:
+            for ball in balls:
+                self.ball = ball
+                if self.is_ball_on_x_side():
+                    self.change_x_direction()
+                elif self.is_ball_on_y_side():
+                    self.change_y_direction()
+            self.ball = balls[0]
+        return PLAYING
+
+    def handle_ball_hit_obj(self):
+        """
+        Check every ball against the paddles and the bricks, a ball handles the first object touched by its corners.
+        """
+        balls = self.__sorted_balls
+        balls.sort(key=_get_x)
+        paddles = sorted(self._get_paddles(), key=_get_x)
+        grid = self.brick_grid
+        band_top = grid.brick_offset
+        band_bottom = band_top + grid.rows * grid.pitch_y
+        ball_width = self.ball.width
+        ball_height = self.ball.height
+
+        # Sweep along the x axis, the active paddles overlap the current ball in x.
+        active = []
+        next_paddle = 0
+        for ball in balls:
+            left = ball.x
+            right = left + ball_width
+            while next_paddle < len(paddles) and paddles[next_paddle].x <= right:
+                active.append(paddles[next_paddle])
+                next_paddle += 1
+            if active:
+                active = [p for p in active if p.x + p.width >= left]
+            top = ball.y
+            bottom = top + ball_height
+            candidates = [p for p in active if p.x <= right and p.y <= bottom and p.y + p.height >= top]
+            # The block paddle is drawn above the paddle, so it is checked first, as get_object_at does.
+            if len(candidates) > 1 and candidates[0] is self.paddle:
+                candidates.reverse()
+            in_band = bottom >= band_top and top <= band_bottom
+            if not candidates and not in_band:
+                continue
+
+            corners = ((left, top), (left, bottom), (right, top), (right, bottom))
+            for index, (x, y) in enumerate(corners):
+                obj = None
+                for paddle in candidates:
+                    if paddle.contains(x, y):
+                        obj = paddle
+                        break
+                if obj is None and in_band:
+                    cell = grid.get_index_at(x, y)
+                    if cell is not None:
+                        obj = self.get_brick(cell)
+                if obj is not None:
+                    self.ball = ball
+                    self._handle_ball_hit(index, obj)
+                    break
+        self.ball = self.balls[0]
+
+    def _create_ball(self, ball_radius):
+        """
+        Create the first ball, it keeps its own velocity.
+        :param ball_radius: Radius of the ball (in pixels)
+        :return: (Ball) The ball.
+        """
+        return Ball(ball_radius*2, ball_radius*2)
+
+    def _pack_state(self, parts):
+        """
+        Append the state of the game to a snapshot, the first ball is the ball of the engine, then the other balls.
+        :param parts: (list) The parts of the snapshot
+        """
+        self.ball = self.balls[0]
+        super()._pack_state(parts)
+        parts.append(BALL_COUNT.pack(len(self.balls) - 1))
+        parts.extend(BALL_STATE.pack(ball.x, ball.y, ball.dx, ball.dy) for ball in self.balls[1:])
+
+    def _fork_state(self, clone):
+        """
+        Give the copy made by fork its own state, with every ball, the sweep keeps the same order.
+        :param clone: (BreakoutEngineMultiBall) The copy
+        """
+        self.ball = self.balls[0]
+        super()._fork_state(clone)
+        copies = {id(ball): ball.copy() for ball in self.balls[1:]}
+        copies[id(self.ball)] = clone.ball
+        clone.balls = [copies[id(ball)] for ball in self.balls]
+        clone.__sorted_balls = [copies[id(ball)] for ball in self.__sorted_balls]
+        clone.__new_balls = [ball.copy() for ball in self.__new_balls]
+
+    def _unpack_state(self, data, offset):
+        """
+        Read the state of the game from a snapshot, in the order of _pack_state.
+        :param data: (memoryview) The snapshot
+        :param offset: (int) The position of the state
+        :return: (int) The position after the state.
+        """
+        self.ball = self.balls[0]
+        offset = super()._unpack_state(data, offset)
+        count, = BALL_COUNT.unpack_from(data, offset)
+        offset += BALL_COUNT.size
+        balls = self.balls
+        # The balls of the engine are reused, a ball is created only when the snapshot has more balls.
+        del balls[count + 1:]
+        for i in range(1, count + 1):
+            x, y, dx, dy = BALL_STATE.unpack_from(data, offset)
+            offset += BALL_STATE.size
+            if i < len(balls):
+                ball = balls[i]
+                ball.x = x
+                ball.y = y
+                ball.dx = dx
+                ball.dy = dy
+            else:
+                balls.append(Ball(self.ball.width, self.ball.height, x, y, dx, dy))
+        self.__sorted_balls = list(balls)
+        self.__new_balls.clear()
+        return offset
+
+    def _hit_brick(self, brick):
+        """
+        Handle the ball hit the brick as the extension version does, and split the balls for the power-up.
+        :param brick: (Brick) The brick touched by the ball.
+        """
+        super()._hit_brick(brick)
+        if self.remove_bricks_count % POWER_UP_BRICKS == 0:
+            self.__split_balls()
+
+    def __split_balls(self):
+        """
+        Each moving ball splits into two, the new ball moves in the mirrored x direction.
+        """
+        room = self.max_balls - len(self.balls) - len(self.__new_balls)
+        for ball in self.balls[:max(room, 0)]:
+            self.__new_balls.append(Ball(ball.width, ball.height, ball.x, ball.y, -ball.dx, ball.dy))
+
+    def __add_new_balls(self):
+        """
+        Let the balls split during the frame join the game.
+        """
+        if self.__new_balls:
+            self.balls.extend(self.__new_balls)
+            self.__sorted_balls.extend(self.__new_balls)
+            self.__new_balls.clear()
+
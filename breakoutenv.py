@@ -0,0 +1,151 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program wraps the rules of the extension version of breakout in a reset/step environment.
+The action of a step is the x position of the mouse, it replaces the mouse callbacks of BreakoutGraphics.
+The observation arrays are allocated once, and are updated in place by every step.
+The observation can also have the pixels of the last frames, drawn by rasterizer.py without any window.
+"""
+import random
+import numpy as np
+from breakoutengine import GAME_LOST, GAME_WON
+from breakoutengine_extension import BreakoutEngineExtension
+
+
+class BreakoutEnv:
+    """
+    This class handle a game of breakout as an environment with reset and step.
+    """
+    def __init__(self, auto_click=True, engine_class=BreakoutEngineExtension, pixels=False, gray=True, downsample=1,
+                 stack_frames=1, **kwargs):
+        """
+        :param auto_click: (Bool) True to serve the ball as soon as it waits for a click.
+        :param engine_class: The class of the engine, it must keep the score as BreakoutEngineExtension.
+        :param pixels: (Bool) True to add the pixels of the last frames to the observation.
+        :param gray: (Bool) True to draw the pixels in grayscale, False in RGB.
+        :param downsample: (int) The window is drawn this number of times smaller in each direction.
+        :param stack_frames: (int) Number of frames in the pixels of the observation, the oldest first.
+        :param kwargs: The parameters of the engine
+        """
+        self.auto_click = auto_click
+        self.engine_class = engine_class
+        self.engine_kwargs = kwargs
+        self.engine = None
+        self.rng = random.Random()
+        self.frames = 0
+        self.__score = 0
+
+        # The observation buffers, they are reused between steps.
+        self.ball = np.zeros(4, dtype=np.float32)        # x, y, dx, dy of the ball
+        self.paddle = np.zeros(2, dtype=np.float32)      # x and width of the paddle
+        self.lives = np.zeros(1, dtype=np.int32)
+        self.bricks = np.zeros(0, dtype=np.uint8)        # The brick-alive bitmask, in the order of np.packbits
+        self.observation = {'ball': self.ball, 'paddle': self.paddle, 'bricks': self.bricks, 'lives': self.lives}
+        self.info = {'state': None, 'score': 0, 'frames': 0, 'removed_bricks': 0}
+
+        # The pixels are drawn by a rasterizer, which is created with the first game.
+        self.pixels = pixels
+        self.gray = gray
+        self.downsample = downsample
+        self.stack_frames = stack_frames
+        self.rasterizer = None
+        self.frame_stack = None
+
+    def reset(self, seed=None):
+        """
+        Start a new game.
+        :param seed: The seed of the random generator of the game, a random seed if it is None.
+        :return: (dict) The observation of the new game.
+        """
+        self.rng.seed(seed)
+        self.engine = self.engine_class(rng=self.rng, **self.engine_kwargs)
+        self.frames = 0
+        self.__score = self.engine.score
+
+        # The bitmask is allocated again only if the number of bricks changes.
+        num_bytes = (len(self.engine.brick_grid) + 7) // 8
+        if len(self.bricks) != num_bytes:
+            self.bricks = np.zeros(num_bytes, dtype=np.uint8)
+            self.observation['bricks'] = self.bricks
+        # A level can have empty cells, so the bits are read from the cells of the grid.
+        # The padding bits after the last brick are always 0.
+        self.bricks[:] = np.packbits(np.frombuffer(self.engine.brick_grid.types, dtype=np.uint8) != 0)
+
+        if self.auto_click:
+            self.engine.handle_click()
+        if self.pixels:
+            self.__reset_pixels()
+        self.__update_observation()
+        return self.observation
+
+    def step(self, action):
+        """
+        Advance the game by one frame.
+        :param action: The x position of the mouse, None to keep the paddle where it is.
+        :return: (tuple) observation, reward, done and info.
+                 The reward is the score of the frame, 1 per normal brick and 5 per red brick.
+        """
+        engine = self.engine
+        if action is not None:
+            engine.move_paddle(action)
+        if self.auto_click:
+            engine.handle_click()
+        state = engine.tick()
+        self.frames += 1
+
+        # Clear the bits of the removed bricks.
+        removed_bricks = engine.removed_bricks
+        bricks = self.bricks
+        cols = engine.brick_cols
+        for brick in removed_bricks:
+            index = brick.row * cols + brick.col
+            bricks[index >> 3] &= ~(0x80 >> (index & 7)) & 0xff
+        self.info['removed_bricks'] = len(removed_bricks)
+        removed_bricks.clear()
+
+        reward = engine.score - self.__score
+        self.__score = engine.score
+        if self.pixels:
+            self.rasterizer.draw()
+            self.observation['pixels'] = self.frame_stack.push()
+        self.__update_observation()
+        self.info['state'] = state
+        return self.observation, reward, state == GAME_LOST or state == GAME_WON, self.info
+
+    def click(self):
+        """
+        Click the window, to serve the ball when auto_click is False.
+        """
+        self.engine.handle_click()
+
+    def __reset_pixels(self):
+        """
+        Draw the first frame of a new game, the arrays of the pixels are reused if the window has the same size.
+        """
+        if self.rasterizer is None:
+            # The rasterizer is imported here, so the environment without pixels does not load it.
+            from rasterizer import Rasterizer, FrameStack
+            self.rasterizer = Rasterizer(self.engine, gray=self.gray, downsample=self.downsample)
+            self.frame_stack = FrameStack(self.rasterizer, self.stack_frames)
+        else:
+            self.rasterizer.reset(self.engine)
+        self.observation['pixels'] = self.frame_stack.reset()
+
+    def __update_observation(self):
+        """
+        Write the state of the engine into the observation buffers.
+        """
+        engine = self.engine
+        ball = self.ball
+        ball[0] = engine.ball.x
+        ball[1] = engine.ball.y
+        ball[2] = engine.dx
+        ball[3] = engine.dy
+        self.paddle[0] = engine.paddle.x
+        self.paddle[1] = engine.paddle.width
+        self.lives[0] = engine.lives
+        self.info['score'] = engine.score
+        self.info['frames'] = self.frames
@@ -1,26 +1,17 @@
 """
 stanCode Breakout Project
 Adapted from Eric Roberts's Breakout by
-Sonja Johnson-Yu, Kylie Jue, Nick Bowman, 
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
 and Jerry Liao.
+
+The rules of the game live in breakoutengine.py,
+this program draws the state of the engine in a graphical window.
 """
-from campy.graphics.gwindow import GWindow
-from campy.graphics.gobjects import GOval, GRect, GLabel
-from campy.gui.events.mouse import onmouseclicked, onmousemoved
 import random
-
-BRICK_SPACING = 5      # Space between bricks (in pixels). This space is used for horizontal and vertical spacing
-BRICK_WIDTH = 40       # Width of a brick (in pixels)
-BRICK_HEIGHT = 15      # Height of a brick (in pixels)
-BRICK_ROWS = 10        # Number of rows of bricks
-BRICK_COLS = 10        # Number of columns of bricks
-BRICK_OFFSET = 50      # Vertical offset of the topmost brick from the window top (in pixels)
-BALL_RADIUS = 10       # Radius of the ball (in pixels)
-PADDLE_WIDTH = 75      # Width of the paddle (in pixels)
-PADDLE_HEIGHT = 15     # Height of the paddle (in pixels)
-PADDLE_OFFSET = 50     # Vertical offset of the paddle from the window bottom (in pixels)
-INITIAL_Y_SPEED = 7    # Initial vertical speed for the ball
-MAX_X_SPEED = 5        # Maximum initial horizontal speed for the ball
+from dirtyrender import DirtyRenderer
+from inputlog import InputLog, BASIC, to_mouse_x
+from breakoutengine import BreakoutEngine, BRICK_SPACING, BRICK_WIDTH, BRICK_HEIGHT, BRICK_ROWS, BRICK_COLS, \
+    BRICK_OFFSET, BALL_RADIUS, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_OFFSET, NUM_LIVES
 
 
 class BreakoutGraphics:
@@ -29,7 +20,8 @@ class BreakoutGraphics:
     """
     def __init__(self, ball_radius=BALL_RADIUS, paddle_width=PADDLE_WIDTH, paddle_height=PADDLE_HEIGHT,
                  paddle_offset=PADDLE_OFFSET, brick_rows=BRICK_ROWS, brick_cols=BRICK_COLS, brick_width=BRICK_WIDTH,
-                 brick_height=BRICK_HEIGHT, brick_offset=BRICK_OFFSET, brick_spacing=BRICK_SPACING, title='Breakout'):
+                 brick_height=BRICK_HEIGHT, brick_offset=BRICK_OFFSET, brick_spacing=BRICK_SPACING, title='Breakout',
+                 lives=NUM_LIVES, seed=None, level=None, autopilot=None, event_sink=None):
         """
         Initialize the breakout graphics, to create a graphical window, a paddle,
         a ball at the center of the window, and bricks.
@@ -47,121 +39,175 @@ class BreakoutGraphics:
         :param brick_offset: Vertical offset of the topmost brick from the window top (in pixels)
         :param brick_spacing: Space between bricks (in pixels). This space is used for horizontal and vertical spacing
         :param title: The title of the window
+        :param lives: Number of attempts
+        :param seed: (int) The seed of the random generator of the game, a random seed if it is None.
+        :param level: (Level) The bricks of a level in levels.py, the uniform bricks if it is None.
+        :param autopilot: (Autopilot) The policy moving the paddle and serving the ball instead of the mouse,
+                          None to play with the mouse.
+        :param event_sink: The sink of the events of the game in gameevents.py, None not to send the events.
         """
-        self.__is_ball_moving = False
-        self.__remove_bricks_count = 0
+        # The game owns its random generator, so the seed and the input log reproduce the game.
+        if seed is None:
+            seed = random.randrange(2 ** 63)
+        self.input_log = InputLog(seed, BASIC, level)
+        self.__mouse_x = None
+        self.__is_clicked = False
+        self.autopilot = autopilot
+
+        # The rules and the state of the game
+        self.engine = BreakoutEngine(ball_radius=ball_radius, paddle_width=paddle_width,
+                                     paddle_height=paddle_height, paddle_offset=paddle_offset,
+                                     brick_rows=brick_rows, brick_cols=brick_cols, brick_width=brick_width,
+                                     brick_height=brick_height, brick_offset=brick_offset,
+                                     brick_spacing=brick_spacing, lives=lives,
+                                     rng=random.Random(seed), level=level)
+        # The events of each tick are sent to the sink as the game is played.
+        self.events = None
+        if event_sink is not None:
+            from gameevents import EventEmitter
+            self.events = EventEmitter(event_sink)
+            self.events.begin_game(self.engine, seed)
+
+        # campy is imported when a window is created, so importing this module does not load it.
+        from campy.graphics.gwindow import GWindow
+        from campy.graphics.gobjects import GOval, GRect
+        from campy.gui.events.mouse import onmouseclicked, onmousemoved
 
-        # Create a graphical window, with some extra space
-        window_width = brick_cols * (brick_width + brick_spacing) - brick_spacing
-        window_height = brick_offset + 3 * (brick_rows * (brick_height + brick_spacing) - brick_spacing)
-        self.window = GWindow(width=window_width, height=window_height, title=title)
+        # Create a graphical window, with the size of the engine
+        self.window = GWindow(width=self.engine.width, height=self.engine.height, title=title)
+        # Only the changes of each frame are sent to the canvas.
+        self.renderer = DirtyRenderer(self.window)
 
         # Create a paddle
         grey = '#999999'
-        self.paddle = GRect(paddle_width, paddle_height)
+        self.paddle = GRect(self.engine.paddle.width, self.engine.paddle.height)
         self.paddle.filled = True
         self.paddle.fill_color = grey
         self.paddle.color = grey
-        paddle_x = (self.window.width-self.paddle.width)/2
-        paddle_y = self.window.height-(self.paddle.height+paddle_offset)
-        self.window.add(self.paddle, x=paddle_x, y=paddle_y)
-
-        # Default initial velocity for the ball
-        self.__dx = 0
-        self.__dy = 0
+        self.renderer.add(self.paddle, x=self.engine.paddle.x, y=self.engine.paddle.y)
 
         # Center a filled ball in the graphical window
-        self.ball = GOval(ball_radius*2, ball_radius*2)
-        self.init_ball()
+        self.ball = GOval(self.engine.ball.width, self.engine.ball.height)
         self.ball.filled = True
         self.ball.fill_color = grey
         self.ball.color = grey
-        self.window.add(self.ball)
+        self.renderer.add(self.ball, x=self.engine.ball.x, y=self.engine.ball.y)
 
         # Initialize our mouse listeners
         onmouseclicked(self.__handle_click)
         onmousemoved(self.__handle_paddle)
 
-        # Draw bricks
-        self.__brick_rows = brick_rows
-        self.__brick_cols = brick_cols
-        self.__draw_bricks(brick_width, brick_height, brick_offset, brick_spacing)
+        # Draw bricks, the rectangles are kept by the indices of their cells.
+        self.__bricks = [None] * len(self.engine.brick_grid)
+        self.__draw_bricks()
+        self.renderer.flush()
+
+    def update(self):
+        """
+        Let the objects in the window follow the state of the engine.
+        """
+        self.renderer.move_to(self.ball, self.engine.ball.x, self.engine.ball.y)
+        self.renderer.move_to(self.paddle, self.engine.paddle.x, self.engine.paddle.y)
+
+        # Remove the bricks removed by the engine.
+        removed_bricks = self.engine.removed_bricks
+        for brick in removed_bricks:
+            index = brick.row * self.engine.brick_cols + brick.col
+            self.renderer.remove(self.__bricks[index])
+            self.__bricks[index] = None
+        removed_bricks.clear()
+        self.renderer.flush()
+
+    def step(self):
+        """
+        Apply the mouse inputs since the last tick, or the inputs of the autopilot, record them,
+        and advance the engine by one tick.
+        The window is not drawn, update draws the state.
+        :return: (int) One of PLAYING, LIFE_LOST, GAME_LOST and GAME_WON in breakoutengine.
+        """
+        if self.autopilot is not None:
+            # The autopilot takes the place of the mouse, so its moves are recorded and replayed as mouse moves.
+            self.__mouse_x = to_mouse_x(self.autopilot(self.engine))
+            self.__is_clicked = not self.engine.is_ball_moving
+        self.input_log.record(self.__mouse_x, self.__is_clicked)
+        if self.__mouse_x is not None:
+            self.engine.move_paddle(self.__mouse_x)
+        if self.__is_clicked:
+            self.engine.handle_click()
+        self.__mouse_x = None
+        self.__is_clicked = False
+        state = self.engine.tick()
+        if self.events is not None:
+            self.events.follow(self.engine, len(self.input_log) - 1, state)
+        return state
+
+    def tick(self):
+        """
+        Advance the game by one tick, and draw the new state.
+        :return: (int) One of PLAYING, LIFE_LOST, GAME_LOST and GAME_WON in breakoutengine.
+        """
+        state = self.step()
+        self.update()
+        return state
 
     def init_ball(self):
         """
         Initialize the movement state, position, and velocity of the ball.
         """
-        self.__is_ball_moving = False
-        self.ball.x = (self.window.width - self.ball.width) / 2
-        self.ball.y = (self.window.height - self.ball.height) / 2
-        self.__dx = 0
-        self.__dy = 0
+        self.engine.init_ball()
+        self.update()
+
+    def snapshot(self):
+        """
+        Capture the state of the game, see BreakoutEngine.snapshot.
+        :return: (bytes) The state as a binary blob.
+        """
+        return self.engine.snapshot()
+
+    def restore(self, data):
+        """
+        Restore the state captured by snapshot, and draw it in the window.
+        The inputs are recorded on from the restored state, so the input log no longer replays the whole game.
+        :param data: (bytes) The blob returned by snapshot
+        """
+        self.engine.restore(data)
+        if self.events is not None:
+            self.events.sync(self.engine)
+        self.__mouse_x = None
+        self.__is_clicked = False
+        if self.autopilot is not None:
+            self.autopilot.reset()
+        self.__sync_bricks()
+        self.update()
 
     def get_dx(self):
         """
         The getter of the dx attribute
         :return: x velocity
         """
-        return self.__dx
+        return self.engine.get_dx()
 
     def get_dy(self):
         """
         The getter of the dy attribute
         :return: y velocity
         """
-        return self.__dy
+        return self.engine.get_dy()
 
     def handle_ball_hit_obj(self):
         """
         This method is called every single loop, it will check if the ball touched the object,
-        and call method: __handle_ball_hit to Handle the ball hit the object.
-        """
-        obj_arr = []
-
-        # Get the objects touched by the four corners of the ball.
-        for i in range(2):
-            x = self.ball.x
-            if i == 1:
-                x += self.ball.width
-
-            for j in range(2):
-                y = self.ball.y
-                if j == 1:
-                    y += self.ball.height
-                obj = self.window.get_object_at(x, y)
-                obj_arr.append(obj)
-
-        # Handle the ball hit the object.
-        for obj in obj_arr:
-            if obj is not None:
-                self.__handle_ball_hit(obj)
-                break
-
-    def __handle_ball_hit(self, obj):
-        """
-        Handle the ball hit the object.
-        if the ball hit the brick, the brick will be disappeared, and the ball will bounce back.
-        if the ball hit the paddle, the ball will bounce back.
-        :param obj: Can not be None. The object touched by the ball.
-        """
-        if obj == self.paddle:
-            if self.__dy > 0:
-                # The ball hides the left or right side of paddle.
-                if self.ball.x + self.ball.width <= self.paddle.x or self.ball.x >= self.paddle.x + self.paddle.width:
-                    self.change_x_direction()
-                else:
-                    self.change_y_direction()
-        else:
-            self.window.remove(obj)
-            self.__remove_bricks_count += 1
-            self.change_y_direction()
+        and handle the ball hit the object.
+        """
+        self.engine.handle_ball_hit_obj()
+        self.update()
 
     def is_ball_leaves_window(self):
         """
         Check if the ball leaves the bottom of the window.
         :return: True if the ball leaves the bottom of the window, False is not.
         """
-        return self.ball.y >= self.window.height
+        return self.engine.is_ball_leaves_window()
 
     def is_game_win(self):
         """
@@ -169,91 +215,77 @@ class BreakoutGraphics:
         The winning condition is that when the user remove all the bricks.
         :return: True if the user win the game, False is not.
         """
-        return self.__remove_bricks_count == self.__brick_rows * self.__brick_cols
+        return self.engine.is_game_win()
 
     def is_ball_on_x_side(self):
         """
         Check if the ball on the right or left side of the window.
         :return: True if the ball on the right or left side of the window, False is not.
         """
-        return self.ball.x <= 0 or self.ball.x + self.ball.width >= self.window.width
+        return self.engine.is_ball_on_x_side()
 
     def is_ball_on_y_side(self):
         """
         Check if the ball on the top of the window.
         :return: True if the ball on the top of the window, False is not.
         """
-        return self.ball.y <= 0
+        return self.engine.is_ball_on_y_side()
 
     def change_x_direction(self):
         """
         Change the x direction of the ball.
         """
-        self.__dx = -self.__dx
+        self.engine.change_x_direction()
 
     def change_y_direction(self):
         """
         Change the y direction of the ball.
         """
-        self.__dy = -self.__dy
+        self.engine.change_y_direction()
 
     def __handle_click(self, event):
         """
         Handle the mouse click.
-        if the ball is not moving, the method will be executed.
-        This method set the random velocity within the reasonable range of the ball.
+        The click is applied before the next tick, if the ball is not moving,
+        the engine will set the random velocity of the ball.
         :param event: mouse click event
         """
-        if not self.__is_ball_moving:
-            self.__is_ball_moving = True
-            self.__dy = INITIAL_Y_SPEED
-            self.__dx = random.randint(1, MAX_X_SPEED)
-            if random.random() > 0.5:
-                self.__dx = -self.__dx
+        self.__is_clicked = True
 
     def __handle_paddle(self, event):
         """
         Handle the moving of the paddle.
-        Let the paddle move horizontally with the mouse position, ensuring it does not move out of the window.
+        The mouse position is applied before the next tick,
+        the paddle moves horizontally with it, ensuring it does not move out of the window.
         :param event: mouse move event
         """
-        self.paddle.x = event.x - self.paddle.width/2
-
-        # If mouse out of the window.
-        if self.paddle.x <= 0:
-            self.paddle.x = 0
-        elif self.paddle.x + self.paddle.width >= self.window.width:
-            self.paddle.x = self.window.width-self.paddle.width
-
-    def __draw_bricks(self, width, height, offset, spacing):
-        """
-        Draw bricks in the window.
-
-        :param width: Width of a brick
-        :param height: Height of a brick
-        :param offset: Vertical offset of the topmost brick from the window top
-        :param spacing: Space between bricks. This space is used for horizontal and vertical spacing
-        """
-        brick = None
-        color_arr = ['#f28179', '#f2f279', '#99f279', '#79d6f2', '#b697f0']
-        for i in range(self.__brick_rows):
-            # Each two rows of bricks use the same color.
-            color = color_arr[int(i / 2)]
-            # Get the y position of current brick.
-            if i == 0:
-                brick_y = offset
-            else:
-                brick_y = brick.y + brick.height + spacing
-
-            for j in range(self.__brick_cols):
-                # Get the x position of current brick.
-                if j == 0:
-                    brick_x = 0
-                else:
-                    brick_x = brick.x + brick.width + spacing
-                # Create a brick, and add it into the window.
-                brick = GRect(width, height, x=brick_x, y=brick_y)
-                brick.filled = True
-                brick.fill_color = color
-                brick.color = color
-                self.window.add(brick)
+        self.__mouse_x = to_mouse_x(event.x)
+
+    def __draw_bricks(self):
+        """
+        Draw the bricks of the engine which are not in the window, they are added to the canvas with the next frame.
+        """
+        from campy.graphics.gobjects import GRect
+        width = self.engine.brick_width
+        height = self.engine.brick_height
+        for index, x, y, color in self.engine.get_brick_layout():
+            if self.__bricks[index] is not None:
+                continue
+            rect = GRect(width, height, x=x, y=y)
+            # The rectangle is not in the window yet, so setting its colors costs no canvas operation.
+            rect.filled = True
+            rect.fill_color = color
+            rect.color = color
+            self.renderer.add(rect, x=x, y=y)
+            self.__bricks[index] = rect
+
+    def __sync_bricks(self):
+        """
+        Remove the rectangles of the empty cells, and draw the bricks which are not in the window.
+        """
+        types = self.engine.brick_grid.types
+        for index, rect in enumerate(self.__bricks):
+            if rect is not None and not types[index]:
+                self.renderer.remove(rect)
+                self.__bricks[index] = None
+        self.__draw_bricks()
@@ -1,7 +1,7 @@
 """
 stanCode Breakout Project
 Adapted from Eric Roberts's Breakout by
-Sonja Johnson-Yu, Kylie Jue, Nick Bowman, 
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
 and Jerry Liao.
 
 This program, based on the brick-breaking game, has added a scoreboard, lives on the window.
@@ -9,26 +9,17 @@ In addition to regular bricks, red bricks have also been added.
 If the ball touch the red bricks, score will be added 5, and the special event will occur.
 If the count of removed bricks is multiples of 3, then add the block paddle in the window,
 or reset the position and horizontal speed of the block paddle.
+
+The rules of the game live in breakoutengine_extension.py,
+this program draws the state of the engine in a graphical window.
 """
-from campy.graphics.gwindow import GWindow
-from campy.graphics.gobjects import GOval, GRect, GLabel
-from campy.graphics.gimage import GImage
-from campy.gui.events.mouse import onmouseclicked, onmousemoved
 import random
-
-BRICK_SPACING = 5      # Space between bricks (in pixels). This space is used for horizontal and vertical spacing
-BRICK_WIDTH = 40       # Width of a brick (in pixels)
-BRICK_HEIGHT = 15      # Height of a brick (in pixels)
-BRICK_ROWS = 10        # Number of rows of bricks
-BRICK_COLS = 10        # Number of columns of bricks
-BRICK_OFFSET = 50      # Vertical offset of the topmost brick from the window top (in pixels)
-BALL_RADIUS = 10       # Radius of the ball (in pixels)
-PADDLE_WIDTH = 75      # Width of the paddle (in pixels)
-PADDLE_HEIGHT = 15     # Height of the paddle (in pixels)
-PADDLE_OFFSET = 50     # Vertical offset of the paddle from the window bottom (in pixels)
-INITIAL_Y_SPEED = 7    # Initial vertical speed for the ball
-MAX_X_SPEED = 5        # Maximum initial horizontal speed for the ball
-BLOCK_PADDLE_MAX_DX = 8  # Maximum horizontal speed of the block paddle
+from dirtyrender import DirtyRenderer
+from inputlog import InputLog, get_variant, to_mouse_x
+from assetcache import assets, HEART_IMAGE, HEART_REMOVED_IMAGE
+from breakoutengine import BRICK_SPACING, BRICK_WIDTH, BRICK_HEIGHT, BRICK_ROWS, BRICK_COLS, BRICK_OFFSET, \
+    BALL_RADIUS, PADDLE_WIDTH, PADDLE_HEIGHT, PADDLE_OFFSET
+from breakoutengine_extension import BreakoutEngineExtension
 
 
 class BreakoutGraphics:
@@ -38,7 +29,8 @@ class BreakoutGraphics:
     def __init__(self, ball_radius=BALL_RADIUS, paddle_width=PADDLE_WIDTH, paddle_height=PADDLE_HEIGHT,
                  paddle_offset=PADDLE_OFFSET, brick_rows=BRICK_ROWS, brick_cols=BRICK_COLS, brick_width=BRICK_WIDTH,
                  brick_height=BRICK_HEIGHT, brick_offset=BRICK_OFFSET, brick_spacing=BRICK_SPACING, title='Breakout',
-                 lives=3):
+                 lives=3, seed=None, engine_class=BreakoutEngineExtension, level=None,
+                 autopilot=None, event_sink=None):
         """
         Initialize the breakout graphics, to create a graphical window, a paddle,
         a ball at the center of the window, and bricks.
@@ -56,138 +48,253 @@ class BreakoutGraphics:
         :param brick_offset: Vertical offset of the topmost brick from the window top (in pixels)
         :param brick_spacing: Space between bricks (in pixels). This space is used for horizontal and vertical spacing
         :param title: The title of the window
-        """
-        self.__is_ball_moving = False
-        self.__remove_bricks_count = 0
-
-        # Create a graphical window, with some extra space
-        window_width = brick_cols * (brick_width + brick_spacing) - brick_spacing
-        window_height = brick_offset + 3 * (brick_rows * (brick_height + brick_spacing) - brick_spacing)
-        self.window = GWindow(width=window_width, height=window_height, title=title)
+        :param lives: Number of attempts
+        :param seed: (int) The seed of the random generator of the game, a random seed if it is None.
+        :param engine_class: The class of the engine, BreakoutEngineExtension or BreakoutEngineMultiBall
+        :param level: (Level) The bricks of a level in levels.py, the uniform bricks if it is None.
+        :param autopilot: (Autopilot) The policy moving the paddle and serving the ball instead of the mouse,
+                          None to play with the mouse.
+        :param event_sink: The sink of the events of the game in gameevents.py, None not to send the events.
+        """
+        # The game owns its random generator, so the seed and the input log reproduce the game.
+        if seed is None:
+            seed = random.randrange(2 ** 63)
+        self.input_log = InputLog(seed, get_variant(engine_class), level)
+        self.__mouse_x = None
+        self.__is_clicked = False
+        self.autopilot = autopilot
+
+        # The rules and the state of the game
+        self.engine = engine_class(ball_radius=ball_radius, paddle_width=paddle_width, paddle_height=paddle_height,
+                                   paddle_offset=paddle_offset, brick_rows=brick_rows, brick_cols=brick_cols,
+                                   brick_width=brick_width, brick_height=brick_height, brick_offset=brick_offset,
+                                   brick_spacing=brick_spacing, lives=lives, rng=random.Random(seed), level=level)
+        # The events of each tick are sent to the sink as the game is played.
+        self.events = None
+        if event_sink is not None:
+            from gameevents import EventEmitter
+            self.events = EventEmitter(event_sink)
+            self.events.begin_game(self.engine, seed)
+
+        # campy is imported when a window is created, so importing this module does not load it.
+        from campy.graphics.gwindow import GWindow
+        from campy.graphics.gobjects import GRect, GLabel
+        from campy.gui.events.mouse import onmouseclicked, onmousemoved
+
+        # Create a graphical window, with the size of the engine
+        self.window = GWindow(width=self.engine.width, height=self.engine.height, title=title)
+        # Only the changes of each frame are sent to the canvas.
+        self.renderer = DirtyRenderer(self.window)
 
         # Create a paddle
         self.paddle = None
-        self.paddle_offset = paddle_offset
-        self.__create_paddle(paddle_width, paddle_height)
+        self.__paddle_rect = None
+        self.__create_paddle()
 
-        # Default initial velocity for the ball
-        self.__dx = 0
-        self.__dy = 0
-
-        # Center a filled ball in the graphical window
-        self.ball = GOval(ball_radius*2, ball_radius*2)
-        self.init_ball()
-        self.ball.filled = True
-        self.window.add(self.ball)
+        # Center a filled ball in the graphical window, there is an oval for each ball of the engine.
+        self.ball = self.__create_ball()
+        self.__balls = [self.ball]
+        self.renderer.add(self.ball, x=self.engine.ball.x, y=self.engine.ball.y)
 
         # Initialize our mouse listeners
         onmouseclicked(self.__handle_click)
         onmousemoved(self.__handle_paddle)
 
-        # Draw bricks
-        self.red_bricks = []
-        self.brick_width = brick_width
-        self.brick_height = brick_height
-        self.brick_offset = brick_offset
-        self.brick_spacing = brick_spacing
-        self.__brick_rows = brick_rows
-        self.__brick_cols = brick_cols
+        # Draw bricks, the rectangles are kept by the indices of their cells.
+        self.__bricks = [None] * len(self.engine.brick_grid)
         self.__draw_bricks()
 
         # Draw the scoreboard
-        self.__score = 0
+        self.__score = self.engine.score
         self.scoreboard = GLabel(f'Score: {self.__score}')
         self.scoreboard.font = 'Helvetica-18-bold'
-        self.window.add(self.scoreboard, x=10, y=self.window.height-5)
+        self.renderer.add(self.scoreboard, x=10, y=self.window.height-5)
 
-        # Create lives
+        # Create lives, both images are decoded once before the game starts.
+        assets.preload(HEART_IMAGE, HEART_REMOVED_IMAGE)
         self.lives_arr = []
         self.__init_lives(lives)
+        self.__lives = lives
 
-        # Create block paddle
-        self.block_paddle = GRect(paddle_width, paddle_height)
+        # Create block paddle, it is added in the window when the engine activates it.
+        self.block_paddle = GRect(self.engine.block_paddle.width, self.engine.block_paddle.height)
         self.block_paddle.filled = True
         self.block_paddle.fill_color = 'green'
         self.block_paddle.color = 'green'
-        self.__block_paddle_dx = 0
+        self.__is_block_paddle_shown = False
+        self.renderer.flush()
+
+    def update(self):
+        """
+        Let the objects in the window follow the state of the engine.
+        """
+        engine = self.engine
+        renderer = self.renderer
+        # Add or remove ovals when the balls are split or lost.
+        balls = engine.balls
+        while len(self.__balls) < len(balls):
+            ball = balls[len(self.__balls)]
+            oval = self.__create_ball()
+            self.__balls.append(oval)
+            renderer.add(oval, x=ball.x, y=ball.y)
+        while len(self.__balls) > len(balls):
+            renderer.remove(self.__balls.pop())
+        for oval, ball in zip(self.__balls, balls):
+            renderer.move_to(oval, ball.x, ball.y)
+
+        # The engine creates a new paddle when the paddle becomes longer or shorter.
+        if engine.paddle is not self.__paddle_rect:
+            renderer.remove(self.paddle)
+            self.__create_paddle()
+        renderer.move_to(self.paddle, engine.paddle.x, engine.paddle.y)
+
+        if engine.is_block_paddle_active:
+            if not self.__is_block_paddle_shown:
+                self.__is_block_paddle_shown = True
+                renderer.add(self.block_paddle, x=engine.block_paddle.x, y=engine.block_paddle.y)
+            renderer.move_to(self.block_paddle, engine.block_paddle.x, engine.block_paddle.y)
+
+        # Remove the bricks removed by the engine.
+        removed_bricks = engine.removed_bricks
+        for brick in removed_bricks:
+            index = brick.row * engine.brick_cols + brick.col
+            renderer.remove(self.__bricks[index])
+            self.__bricks[index] = None
+        removed_bricks.clear()
+
+        if engine.score != self.__score:
+            self.__update_score(engine.score)
+
+        while self.__lives > engine.lives:
+            self.__lives -= 1
+            self.remove_a_live(self.__lives)
+        renderer.flush()
+
+    def step(self):
+        """
+        Apply the mouse inputs since the last tick, or the inputs of the autopilot, record them,
+        and advance the engine by one tick.
+        The window is not drawn, update draws the state.
+        :return: (int) One of PLAYING, LIFE_LOST, GAME_LOST and GAME_WON in breakoutengine.
+        """
+        if self.autopilot is not None:
+            # The autopilot takes the place of the mouse, so its moves are recorded and replayed as mouse moves.
+            self.__mouse_x = to_mouse_x(self.autopilot(self.engine))
+            self.__is_clicked = not self.engine.is_ball_moving
+        self.input_log.record(self.__mouse_x, self.__is_clicked)
+        if self.__mouse_x is not None:
+            self.engine.move_paddle(self.__mouse_x)
+        if self.__is_clicked:
+            self.engine.handle_click()
+        self.__mouse_x = None
+        self.__is_clicked = False
+        state = self.engine.tick()
+        if self.events is not None:
+            self.events.follow(self.engine, len(self.input_log) - 1, state)
+        return state
+
+    def tick(self):
+        """
+        Advance the game by one tick, and draw the new state.
+        :return: (int) One of PLAYING, LIFE_LOST, GAME_LOST and GAME_WON in breakoutengine.
+        """
+        state = self.step()
+        self.update()
+        return state
 
     def init_ball(self):
         """
         Initialize the movement state, position, and velocity of the ball.
         """
-        self.__is_ball_moving = False
-        self.ball.x = (self.window.width - self.ball.width) / 2
-        self.ball.y = (self.window.height - self.ball.height) / 2
-        self.__dx = 0
-        self.__dy = 0
+        self.engine.init_ball()
+        self.update()
+
+    def snapshot(self):
+        """
+        Capture the state of the game, see BreakoutEngine.snapshot.
+        :return: (bytes) The state as a binary blob.
+        """
+        return self.engine.snapshot()
+
+    def restore(self, data):
+        """
+        Restore the state captured by snapshot, and draw it in the window.
+        The inputs are recorded on from the restored state, so the input log no longer replays the whole game.
+        :param data: (bytes) The blob returned by snapshot
+        """
+        engine = self.engine
+        engine.restore(data)
+        if self.events is not None:
+            self.events.sync(engine)
+        self.__mouse_x = None
+        self.__is_clicked = False
+        if self.autopilot is not None:
+            self.autopilot.reset()
+        self.__sync_bricks()
+
+        # The block paddle leaves the window if it was not in the game yet.
+        if self.__is_block_paddle_shown and not engine.is_block_paddle_active:
+            self.renderer.remove(self.block_paddle)
+            self.__is_block_paddle_shown = False
+
+        # Fill the hearts of the lives given back, update empties the hearts of the lives lost.
+        while self.__lives < min(engine.lives, len(self.lives_arr)):
+            heart = assets.get_image(HEART_IMAGE)
+            heart_removed = self.lives_arr[self.__lives]
+            self.renderer.add(heart, x=heart_removed.x, y=heart_removed.y)
+            self.renderer.remove(heart_removed)
+            self.lives_arr[self.__lives] = heart
+            self.__lives += 1
+        self.update()
 
     def get_dx(self):
         """
         The getter of the dx attribute
         :return: x velocity
         """
-        return self.__dx
+        return self.engine.get_dx()
 
     def get_dy(self):
         """
         The getter of the dy attribute
         :return: y velocity
         """
-        return self.__dy
+        return self.engine.get_dy()
 
     def is_block_paddle_need_turn_around(self):
         """
         Check if the block paddle is on the right or left side of the window.
         :return: (Bool) True is the block paddle need to turn around, False is not.
         """
-        return self.block_paddle.x <= 0 or self.block_paddle.x + self.block_paddle.width >= self.window.width
+        return self.engine.is_block_paddle_need_turn_around()
 
     def change_block_paddle_dy(self):
         """
         Change the horizontal speed of the block paddle.
         """
-        self.__block_paddle_dx = -self.__block_paddle_dx
+        self.engine.change_block_paddle_dy()
 
     def get_block_paddle_dx(self):
         """
         The getter of the block_paddle_dx attribute.
         :return: The horizontal speed of the block paddle.
         """
-        return self.__block_paddle_dx
+        return self.engine.get_block_paddle_dx()
 
     def handle_ball_hit_obj(self):
         """
         This method is called every single loop, it will check if the ball touched the object,
-        and call method: __handle_ball_hit to Handle the ball hit the object.
-        """
-        obj_arr = []
-
-        # Get the objects touched by the four corners of the ball.
-        for i in range(2):
-            x = self.ball.x
-            if i == 1:
-                x += self.ball.width
-
-            for j in range(2):
-                y = self.ball.y
-                if j == 1:
-                    y += self.ball.height
-                y = self.ball.y if j == 0 else self.ball.y + self.ball.height
-                obj = self.window.get_object_at(x, y)
-                obj_arr.append(obj)
-
-        # Handle the ball hit the object.
-        for index, obj in enumerate(obj_arr):
-            if obj is not None and not self.__is_scoreboard_or_lives(obj):
-                self.__handle_ball_hit(index, obj)
-                break
+        and handle the ball hit the object.
+        """
+        self.engine.handle_ball_hit_obj()
+        self.update()
 
     def is_ball_leaves_window(self):
         """
         Check if the ball leaves the bottom of the window.
         :return: (Bool) True if the ball leaves the bottom of the window, False is not.
         """
-        return self.ball.y >= self.window.height
+        return self.engine.is_ball_leaves_window()
 
     def is_game_win(self):
         """
@@ -195,28 +302,33 @@ class BreakoutGraphics:
         The winning condition is that when the user remove all the bricks.
         :return: (Bool) True if the user win the game, False is not.
         """
-        return self.__remove_bricks_count == self.__brick_rows * self.__brick_cols
+        return self.engine.is_game_win()
 
     def is_ball_on_x_side(self):
         """
         Check if the ball on the right or left side of the window.
         :return: (Bool) True if the ball on the right or left side of the window, False is not.
         """
-        return self.ball.x <= 0 or self.ball.x + self.ball.width >= self.window.width
+        return self.engine.is_ball_on_x_side()
 
     def is_ball_on_y_side(self):
         """
         Check if the ball on the top of the window.
         :return: (Bool) True if the ball on the top of the window, False is not.
         """
-        return self.ball.y <= 0
+        return self.engine.is_ball_on_y_side()
 
     def show_game_result(self, is_win):
         """
         Show the game result in the window.
         :param is_win: (Bool) True is the user win the game, False is user lose the game.
         """
-        self.window.remove(self.ball)
+        from campy.graphics.gobjects import GRect, GLabel
+        # Every ball is removed, the multi-ball version can still have several balls in the window.
+        for oval in self.__balls:
+            self.renderer.remove(oval)
+        del self.__balls[1:]
+        self.renderer.flush()
 
         bgc = GRect(self.window.width / 2, 100)
         bgc.filled = True
@@ -239,36 +351,34 @@ class BreakoutGraphics:
         """
         Change the x direction of the ball.
         """
-        self.__dx = -self.__dx
+        self.engine.change_x_direction()
 
     def change_y_direction(self):
         """
         Change the y direction of the ball.
         """
-        self.__dy = -self.__dy
+        self.engine.change_y_direction()
 
     def remove_a_live(self, lives):
         """
         Replace the solid heart with a hollow heart in the window.
         :param lives: (int) Current lives.
         """
-        heart_removed = GImage('image/heart_removed.png')
+        heart_removed = assets.get_image(HEART_REMOVED_IMAGE)
         heart = self.lives_arr[lives]
-        self.window.add(heart_removed, x=heart.x, y=heart.y)
-        self.window.remove(heart)
+        self.renderer.add(heart_removed, x=heart.x, y=heart.y)
+        self.renderer.remove(heart)
         self.lives_arr[lives] = heart_removed
 
-    def __create_paddle(self, paddle_width, paddle_height):
+    def __create_paddle(self):
         """
-        Create a paddle in the window.
-        :param paddle_width: Width of the paddle. (in pixel)
-        :param paddle_height: Height of the paddle. (in pixel)
+        Create a paddle in the window, with the geometry of the paddle of the engine.
         """
-        self.paddle = GRect(paddle_width, paddle_height)
+        from campy.graphics.gobjects import GRect
+        self.__paddle_rect = self.engine.paddle
+        self.paddle = GRect(self.__paddle_rect.width, self.__paddle_rect.height)
         self.paddle.filled = True
-        paddle_x = (self.window.width - self.paddle.width) / 2
-        paddle_y = self.window.height - (self.paddle.height + self.paddle_offset)
-        self.window.add(self.paddle, x=paddle_x, y=paddle_y)
+        self.renderer.add(self.paddle, x=self.__paddle_rect.x, y=self.__paddle_rect.y)
 
     def __init_lives(self, lives):
         """
@@ -278,211 +388,73 @@ class BreakoutGraphics:
         spacing = 10
 
         for i in range(lives):
-            heart = GImage('image/heart.png')
-            self.window.add(heart, x=self.window.width-(spacing+heart.width)*(i+1),
-                            y=self.window.height-(spacing+heart.height))
+            heart = assets.get_image(HEART_IMAGE)
+            self.renderer.add(heart, x=self.window.width-(spacing+heart.width)*(i+1),
+                              y=self.window.height-(spacing+heart.height))
             self.lives_arr.append(heart)
 
-    def __is_scoreboard_or_lives(self, obj):
-        """
-        Check object is scoreboard or lives or not.
-        :param obj: GObject
-        :return: (Bool) True is scoreboard or lives, False is not.
-        """
-        if obj == self.scoreboard:
-            return True
-        for heart in self.lives_arr:
-            if obj == heart:
-                return True
-        return False
-
-    def __handle_ball_hit(self, index, obj):
-        """
-        Handle the ball hit the object.
-
-        if the ball hit the paddle, the ball will bounce back.
-
-        if the ball hit the normal brick, the score will be added 1,
-        the brick will be disappeared, and the ball will bounce back.
-
-        if the ball hit the red brick, the score will be added 5, and a special event will occur.
-
-        :param obj: (GObject) Can not be None. The object touched by the ball.
-        """
-        if obj == self.paddle:
-            if self.__dy > 0:
-                self.change_y_direction()
-        elif obj == self.block_paddle:
-            # The ball hit the bottom of the block paddle.
-            if index == 0 or index == 2:
-                if self.__dy < 0:
-                    self.change_y_direction()
-            # The ball hit the top of the block paddle.
-            if index == 1 or index == 3:
-                if self.__dy > 0:
-                    self.change_y_direction()
-        else:
-            if self.__is_red_bricks(obj):
-                self.__update_score(5)
-                self.__process_special_event(obj)
-            else:
-                self.__update_score(1)
-            self.window.remove(obj)
-            self.__remove_bricks_count += 1
-            # If the count of removed bricks is multiples of 3,
-            # then reset the position and horizontal speed of the block paddle.
-            if self.__remove_bricks_count > 0 and self.__remove_bricks_count % 3 == 0:
-                self.__set_block_paddle()
-            self.change_y_direction()
-
     def __update_score(self, score):
         """
-        Updates the score.
-        :param score: (int) The score to add.
-        """
-        self.__score += score
-        self.scoreboard.text = f'Score: {self.__score}'
-
-    def __is_red_bricks(self, obj):
-        """
-        Check the object is red brick.
-        :param obj: GObject
-        :return: (Bool) True if the object is red brick, False is not.
-        """
-        for brick in self.red_bricks:
-            if obj == brick:
-                return True
-        return False
-
-    def __process_special_event(self, obj):
-        """
-        Processes the special event.
-        The paddle becomes longer or shorter, or the velocity of the ball becomes faster.
-        :param obj: (GObject) One of the red bricks.
-        """
-        # Remove current red bricks
-        for brick in self.red_bricks:
-            if obj == brick:
-                self.red_bricks.remove(brick)
-                break
-
-        # Processes the special event.
-        idx = len(self.red_bricks)
-        if idx == -1:
-            return
-        elif idx == 2:
-            # The paddle becomes longer.
-            self.window.remove(self.paddle)
-            self.__create_paddle(self.paddle.width+50, self.paddle.height)
-        elif idx == 1:
-            # The paddle becomes shorter.
-            self.window.remove(self.paddle)
-            self.__create_paddle(self.paddle.width-80, self.paddle.height)
-        elif idx == 0:
-            # The velocity of the ball becomes faster.
-            if self.__dx < 0:
-                self.__dx -= 5
-            else:
-                self.__dx += 5
-            self.__dy -= 5
-
-    def __set_block_paddle(self):
-        """
-        Set the position and horizontal speed of the block paddle.
-        """
-        self.__block_paddle_dx = random.randint(1, BLOCK_PADDLE_MAX_DX)
-        y = random.randint(int(self.window.height/2), self.paddle.y - 10)
-        x = random.randint(0, self.window.width - self.block_paddle.width)
-        self.block_paddle.x = x
-        self.block_paddle.y = y
-        if self.__remove_bricks_count == 3:
-            self.window.add(self.block_paddle)
+        Updates the scoreboard.
+        :param score: (int) The current score.
+        """
+        self.__score = score
+        self.renderer.set_text(self.scoreboard, f'Score: {self.__score}')
 
     def __handle_click(self, event):
         """
         Handle the mouse click.
-        if the ball is not moving, the method will be executed.
-        This method set the random velocity within the reasonable range of the ball.
+        The click is applied before the next tick, if the ball is not moving,
+        the engine will set the random velocity of the ball.
         :param event: mouse click event
         """
-        if not self.__is_ball_moving:
-            self.__is_ball_moving = True
-            self.__dy = INITIAL_Y_SPEED
-            self.__dx = random.randint(2, MAX_X_SPEED)
-            if random.random() > 0.5:
-                self.__dx = -self.__dx
+        self.__is_clicked = True
 
     def __handle_paddle(self, event):
         """
         Handle the moving of the paddle.
-        Let the paddle move horizontally with the mouse position, ensuring it does not move out of the window.
+        The mouse position is applied before the next tick,
+        the paddle moves horizontally with it, ensuring it does not move out of the window.
         :param event: mouse move event
         """
-        self.paddle.x = event.x - self.paddle.width/2
+        self.__mouse_x = to_mouse_x(event.x)
 
-        # If mouse out of the window.
-        if self.paddle.x <= 0:
-            self.paddle.x = 0
-        elif self.paddle.x + self.paddle.width >= self.window.width:
-            self.paddle.x = self.window.width-self.paddle.width
+    def __create_ball(self):
+        """
+        Create a filled oval with the size of the balls of the engine.
+        :return: (GOval) The oval, it is not added in the window yet.
+        """
+        from campy.graphics.gobjects import GOval
+        oval = GOval(self.engine.ball.width, self.engine.ball.height)
+        oval.filled = True
+        return oval
 
     def __draw_bricks(self):
         """
-        Draw bricks in the window.
-        """
-        brick = None
-        color_arr = ['#222222', '#444444', '#666666', '#999999', '#bbbbbb']
-
-        # Get random position of red bricks.
-        random_pair = []
-        for i in range(3):
-            random_row = random.randint(0, self.__brick_rows - 1)
-            random_col = random.randint(0, self.__brick_cols - 1)
-
-            # If there are duplicate items in the list, generate a new one.
-            if i == 1:
-                while (random_row, random_col) == random_pair[0]:
-                    random_row = random.randint(0, self.__brick_rows - 1)
-                    random_col = random.randint(0, self.__brick_cols - 1)
-            elif i == 2:
-                while (random_row, random_col) == random_pair[0] or (random_row, random_col) == random_pair[1]:
-                    random_row = random.randint(0, self.__brick_rows - 1)
-                    random_col = random.randint(0, self.__brick_cols - 1)
-
-            random_pair.append((random_row, random_col))
-
-        # Draw bricks in the window.
-        for i in range(self.__brick_rows):
-            # Each two rows of bricks use the same color.
-            color = color_arr[int(i / 2)]
-            # Get the y position of current brick.
-            if i == 0:
-                brick_y = self.brick_offset
-            else:
-                brick_y = brick.y + brick.height + self.brick_spacing
-
-            for j in range(self.__brick_cols):
-                # Get the x position of current brick.
-                if j == 0:
-                    brick_x = 0
-                else:
-                    brick_x = brick.x + brick.width + self.brick_spacing
-
-                # Create a brick, and add it into the window.
-                brick = GRect(self.brick_width, self.brick_height, x=brick_x, y=brick_y)
-                brick.filled = True
-                if len(random_pair) > 0:
-                    for pair in random_pair:
-                        if i == pair[0] and j == pair[1]:
-                            brick.fill_color = 'red'
-                            brick.color = 'red'
-                            self.red_bricks.append(brick)
-                            random_pair.remove(pair)
-                            break
-                        else:
-                            brick.fill_color = color
-                            brick.color = color
-                else:
-                    brick.fill_color = color
-                    brick.color = color
-                self.window.add(brick)
+        Draw the bricks of the engine which are not in the window, the red bricks are drawn in red.
+        They are added to the canvas with the next frame.
+        """
+        from campy.graphics.gobjects import GRect
+        width = self.engine.brick_width
+        height = self.engine.brick_height
+        for index, x, y, color in self.engine.get_brick_layout():
+            if self.__bricks[index] is not None:
+                continue
+            rect = GRect(width, height, x=x, y=y)
+            # The rectangle is not in the window yet, so setting its colors costs no canvas operation.
+            rect.filled = True
+            rect.fill_color = color
+            rect.color = color
+            self.renderer.add(rect, x=x, y=y)
+            self.__bricks[index] = rect
+
+    def __sync_bricks(self):
+        """
+        Remove the rectangles of the empty cells, and draw the bricks which are not in the window.
+        """
+        types = self.engine.brick_grid.types
+        for index, rect in enumerate(self.__bricks):
+            if rect is not None and not types[index]:
+                self.renderer.remove(rect)
+                self.__bricks[index] = None
+        self.__draw_bricks()
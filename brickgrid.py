@@ -0,0 +1,201 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program provides a compact store and a uniform grid index of the bricks.
+The bricks are laid out in a regular grid, so the cell containing a point can be computed directly,
+and the cost of a query does not grow with the number of bricks.
+Each cell keeps the type of its brick in a byte, EMPTY if there is no brick, and its hit points in another byte,
+so a brick costs two bytes, and the remaining bricks are counted as they are added and removed.
+A grid can be forked, the copy shares the cells with the grid until one of them changes a cell.
+The cells are numbered in row-major order, the index of a cell is row * cols + col.
+"""
+
+# The types of the bricks kept in the cells
+EMPTY = 0       # There is no brick in the cell, or the brick was removed
+NORMAL = 1
+RED = 2         # A red brick of the extension version, it triggers a special event
+
+
+class BrickGrid:
+    """
+    This class keeps the type of the brick in each cell, a removed brick leaves an empty cell.
+    """
+    def __init__(self, rows, cols, brick_width, brick_height, brick_offset, brick_spacing):
+        """
+        :param rows: Number of rows of bricks
+        :param cols: Number of columns of bricks
+        :param brick_width: Width of a brick (in pixels)
+        :param brick_height: Height of a brick (in pixels)
+        :param brick_offset: Vertical offset of the topmost brick from the window top (in pixels)
+        :param brick_spacing: Space between bricks (in pixels)
+        """
+        self.rows = rows
+        self.cols = cols
+        self.brick_width = brick_width
+        self.brick_height = brick_height
+        self.brick_offset = brick_offset
+        # The distance between the upper left corners of two neighbouring bricks.
+        self.pitch_x = brick_width + brick_spacing
+        self.pitch_y = brick_height + brick_spacing
+        # The types of the bricks in row-major order.
+        self.types = bytearray(rows * cols)
+        # The number of hits to break the brick of each cell.
+        self.hit_points = bytearray(rows * cols)
+        self.count = 0          # Number of remaining bricks
+        # True when the cells may be shared with a fork, they are copied before they are changed.
+        self.__shared = False
+
+    def __len__(self):
+        """
+        :return: (int) The number of cells.
+        """
+        return len(self.types)
+
+    def fork(self):
+        """
+        Copy the grid without copying the cells, the cells are copied by the first grid changing them.
+        :return: (BrickGrid) The copy.
+        """
+        clone = object.__new__(BrickGrid)
+        clone.__dict__.update(self.__dict__)
+        self.__shared = clone.__shared = True
+        return clone
+
+    def fill(self, brick_type=NORMAL):
+        """
+        Put a brick of the type in every cell.
+        :param brick_type: (int) The type of the bricks, not EMPTY
+        """
+        self.__own_cells()
+        self.types[:] = bytes([brick_type]) * len(self.types)
+        self.hit_points[:] = b'\x01' * len(self.types)
+        self.count = len(self.types)
+
+    def load(self, types, hit_points):
+        """
+        Put the bricks of a level in the cells.
+        :param types: (bytes) The type of each cell, EMPTY if there is no brick
+        :param hit_points: (bytes) The hit points of each cell
+        """
+        self.__own_cells()
+        self.types[:] = types
+        self.hit_points[:] = hit_points
+        self.count = len(self.types) - self.types.count(EMPTY)
+
+    def add(self, index, brick_type=NORMAL, hit_points=1):
+        """
+        Put a brick in the cell, or change the type of the brick in the cell.
+        :param index: (int) The index of the cell
+        :param brick_type: (int) The type of the brick, not EMPTY
+        :param hit_points: (int) The number of hits to break the brick
+        """
+        self.__own_cells()
+        if self.types[index] == EMPTY:
+            self.count += 1
+        self.types[index] = brick_type
+        self.hit_points[index] = hit_points
+
+    def remove(self, index):
+        """
+        Empty the cell.
+        :param index: (int) The index of the cell
+        """
+        if self.types[index] != EMPTY:
+            self.__own_cells()
+            self.types[index] = EMPTY
+            self.hit_points[index] = 0
+            self.count -= 1
+
+    def hit(self, index):
+        """
+        Decrease the hit points of the brick in the cell, the brick is not removed.
+        :param index: (int) The index of the cell
+        :return: (int) The hit points left.
+        """
+        if self.hit_points[index]:
+            self.__own_cells()
+            self.hit_points[index] -= 1
+        return self.hit_points[index]
+
+    def get_type(self, index):
+        """
+        :param index: (int) The index of the cell
+        :return: (int) The type of the brick in the cell, EMPTY if there is no brick.
+        """
+        return self.types[index]
+
+    def get_x(self, index):
+        """
+        :param index: (int) The index of the cell
+        :return: The x position of the brick of the cell.
+        """
+        return index % self.cols * self.pitch_x
+
+    def get_y(self, index):
+        """
+        :param index: (int) The index of the cell
+        :return: The y position of the brick of the cell.
+        """
+        return self.brick_offset + index // self.cols * self.pitch_y
+
+    def get_index_at(self, x, y):
+        """
+        Get the cell of the brick containing the point, the boundary of the brick is included.
+        :param x: The x position of the point
+        :param y: The y position of the point
+        :return: (int) The index of the cell, None if there is no brick at the point.
+        """
+        y -= self.brick_offset
+        if x < 0 or y < 0:
+            return None
+        # A point beyond the grid is checked against the last row or column,
+        # so the right and bottom boundaries of the last bricks are still inside the bricks.
+        col = min(int(x // self.pitch_x), self.cols - 1)
+        row = min(int(y // self.pitch_y), self.rows - 1)
+        # The point is in the spacing between bricks, or beyond the grid.
+        if x - col * self.pitch_x > self.brick_width or y - row * self.pitch_y > self.brick_height:
+            return None
+        index = row * self.cols + col
+        return index if self.types[index] != EMPTY else None
+
+    def get_indices_in(self, x, y, width, height):
+        """
+        Get the cells of the bricks overlapping the rectangle, the boundaries are included.
+        :param x: The x position of the upper left corner of the rectangle
+        :param y: The y position of the upper left corner of the rectangle
+        :param width: Width of the rectangle
+        :param height: Height of the rectangle
+        :return: (list) The indices of the cells, in row-major order.
+        """
+        y -= self.brick_offset
+        first_col = max(0, int((x - self.brick_width) // self.pitch_x))
+        first_row = max(0, int((y - self.brick_height) // self.pitch_y))
+        last_col = min(self.cols - 1, int((x + width) // self.pitch_x))
+        last_row = min(self.rows - 1, int((y + height) // self.pitch_y))
+
+        types = self.types
+        indices = []
+        for row in range(first_row, last_row + 1):
+            top = row * self.pitch_y
+            if top > y + height or top + self.brick_height < y:
+                continue
+            for col in range(first_col, last_col + 1):
+                left = col * self.pitch_x
+                if left > x + width or left + self.brick_width < x:
+                    continue
+                index = row * self.cols + col
+                if types[index] != EMPTY:
+                    indices.append(index)
+        return indices
+
+    def __own_cells(self):
+        """
+        Copy the cells shared with a fork, so this grid can change them.
+        """
+        if self.__shared:
+            self.types = bytearray(self.types)
+            self.hit_points = bytearray(self.hit_points)
+            self.__shared = False
@@ -0,0 +1,130 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program provides the swept (continuous) collision between the ball and a rectangle.
+Instead of sampling the position of the ball once per frame, it finds the time of impact along the path,
+so a fast ball can not pass through a thin object.
+
+The ball is a circle moving along a segment, which is the same as a point moving against
+the rectangle grown by the radius of the ball, with rounded corners.
+"""
+import math
+
+
+def sweep_circle_rect(cx, cy, radius, vx, vy, x, y, width, height, t_max=1):
+    """
+    Find the first time the moving circle touches the rectangle.
+    :param cx: The x position of the center of the circle
+    :param cy: The y position of the center of the circle
+    :param radius: Radius of the circle
+    :param vx: The horizontal movement of the circle in a unit of time
+    :param vy: The vertical movement of the circle in a unit of time
+    :param x: The x position of the upper left corner of the rectangle
+    :param y: The y position of the upper left corner of the rectangle
+    :param width: Width of the rectangle
+    :param height: Height of the rectangle
+    :param t_max: The end time of the movement
+    :return: (tuple) The time of impact and the normal (nx, ny) of the touched surface,
+             None if the circle does not move into the rectangle before t_max.
+    """
+    left = x - radius
+    right = x + width + radius
+    top = y - radius
+    bottom = y + height + radius
+
+    # The circle already overlaps the rectangle, e.g. the paddle moved onto the ball.
+    if left < cx < right and top < cy < bottom and _overlaps(cx, cy, radius, x, y, width, height):
+        return _push_out(cx, cy, vx, vy, x, y, width, height)
+
+    # Intersect the path with the slabs of the grown rectangle.
+    t_enter = -math.inf
+    t_exit = math.inf
+    nx = ny = 0
+    if vx == 0:
+        if cx < left or cx > right:
+            return None
+    else:
+        t1 = (left - cx) / vx
+        t2 = (right - cx) / vx
+        if t1 > t2:
+            t1, t2 = t2, t1
+        t_enter = t1
+        t_exit = t2
+        nx = -1 if vx > 0 else 1
+    if vy == 0:
+        if cy < top or cy > bottom:
+            return None
+    else:
+        t1 = (top - cy) / vy
+        t2 = (bottom - cy) / vy
+        if t1 > t2:
+            t1, t2 = t2, t1
+        if t1 > t_enter:
+            t_enter = t1
+            nx = 0
+            ny = -1 if vy > 0 else 1
+        t_exit = min(t_exit, t2)
+    if t_enter > t_exit or t_enter > t_max or t_exit < 0:
+        return None
+
+    # The center starts inside the grown rectangle without overlapping the rectangle,
+    # so it is in a corner region, and only the rounded corner can be hit.
+    is_inside = t_enter < 0
+    if is_inside:
+        t_enter = 0
+
+    # The hit point in a corner region is checked against the rounded corner.
+    hit_x = cx + vx * t_enter
+    hit_y = cy + vy * t_enter
+    corner_x = x if hit_x < x else x + width if hit_x > x + width else None
+    corner_y = y if hit_y < y else y + height if hit_y > y + height else None
+    if corner_x is None or corner_y is None:
+        # A circle inside the grown rectangle but out of the corners only touches a side, and moves away.
+        return None if is_inside else (t_enter, nx, ny)
+    return _sweep_circle_point(cx, cy, radius, vx, vy, corner_x, corner_y, t_max)
+
+
+def _sweep_circle_point(cx, cy, radius, vx, vy, px, py, t_max):
+    """
+    Find the first time the moving circle touches the point.
+    :return: (tuple) The time of impact and the normal, None if there is no impact before t_max.
+    """
+    # Solve |c + v*t - p| = radius for t.
+    ox = cx - px
+    oy = cy - py
+    a = vx * vx + vy * vy
+    b = ox * vx + oy * vy
+    c = ox * ox + oy * oy - radius * radius
+    discriminant = b * b - a * c
+    if a == 0 or discriminant < 0:
+        return None
+    t = (-b - math.sqrt(discriminant)) / a
+    if t < 0 or t > t_max:
+        return None
+    return t, (ox + vx * t) / radius, (oy + vy * t) / radius
+
+
+def _overlaps(cx, cy, radius, x, y, width, height):
+    """
+    Check if the circle overlaps the rectangle, touching is not an overlap.
+    :return: (Bool) True if the circle overlaps the rectangle, False is not.
+    """
+    near_x = min(max(cx, x), x + width)
+    near_y = min(max(cy, y), y + height)
+    return (cx - near_x) ** 2 + (cy - near_y) ** 2 < radius * radius
+
+
+def _push_out(cx, cy, vx, vy, x, y, width, height):
+    """
+    Get the surface to bounce from, when the circle already overlaps the rectangle.
+    The surface is the nearest side of the rectangle, the circle bounces only if it moves into the side.
+    :return: (tuple) Time 0 and the normal of the nearest side, None if the circle moves out of the side.
+    """
+    distances = ((cx - x, -1, 0), (x + width - cx, 1, 0), (cy - y, 0, -1), (y + height - cy, 0, 1))
+    _, nx, ny = min(distances)
+    if vx * nx + vy * ny >= 0:
+        return None
+    return 0, nx, ny
@@ -0,0 +1,8 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+The modules of the game are at the top of the project, this file lets pytest import them from the tests.
+"""
@@ -0,0 +1,148 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program provides a render layer which only sends the changes of a frame to the canvas.
+Every setting of x, y or text of a campy object is a canvas operation,
+so the changes are collected during the frame, compared with what the canvas already shows,
+and sent together when the frame is flushed. An object which did not change costs nothing.
+
+The Tk backend of campy also updates the idle tasks of the window after every operation,
+so the operations of a flush skip those updates, and the window is updated once at the end of the flush.
+Adding thousands of bricks in the first frame then costs one update instead of one per brick.
+"""
+
+
+class DirtyRenderer:
+    """
+    This class collects the changes of the objects in a window, and flushes them once per frame.
+    """
+    def __init__(self, window):
+        """
+        :param window: (GWindow) The window to draw.
+        """
+        self.window = window
+        # The Tk window of campy, None if the window does not use the Tk backend.
+        self.__master = get_tk_master(window)
+        # The locations and texts the canvas shows, by the objects.
+        self.__locations = {}
+        self.__texts = {}
+        # The changes of the current frame.
+        self.__pending_ops = []
+        self.__pending_locations = {}
+        self.__pending_texts = {}
+
+        # The counters of the canvas operations
+        self.ops = 0            # Operations of the last flushed frame
+        self.total_ops = 0
+        self.max_ops = 0
+        self.frames = 0
+
+    def add(self, gobj, x=None, y=None):
+        """
+        Add the object in the window when the frame is flushed.
+        :param gobj: (GObject) The object to add.
+        :param x: The x position of the object, the current one if it is None.
+        :param y: The y position of the object, the current one if it is None.
+        """
+        if x is None or y is None:
+            x = gobj.x
+            y = gobj.y
+        self.__pending_ops.append((gobj, x, y))
+        self.__locations[gobj] = (x, y)
+        if hasattr(gobj, 'text'):
+            self.__texts[gobj] = gobj.text
+
+    def remove(self, gobj):
+        """
+        Remove the object from the window when the frame is flushed.
+        :param gobj: (GObject) The object to remove.
+        """
+        self.__pending_ops.append((gobj, None, None))
+        self.__locations.pop(gobj, None)
+        self.__texts.pop(gobj, None)
+        self.__pending_locations.pop(gobj, None)
+        self.__pending_texts.pop(gobj, None)
+
+    def move_to(self, gobj, x, y):
+        """
+        Move the object when the frame is flushed, nothing is sent if the object stays where the canvas shows it.
+        :param gobj: (GObject) The object to move.
+        :param x: The new x position
+        :param y: The new y position
+        """
+        if self.__locations.get(gobj) == (x, y):
+            self.__pending_locations.pop(gobj, None)
+        else:
+            self.__pending_locations[gobj] = (x, y)
+
+    def set_text(self, label, text):
+        """
+        Change the text of the label when the frame is flushed, nothing is sent if the text is the same.
+        :param label: (GLabel) The label to change.
+        :param text: (str) The new text
+        """
+        if self.__texts.get(label) == text:
+            self.__pending_texts.pop(label, None)
+        else:
+            self.__pending_texts[label] = text
+
+    def flush(self):
+        """
+        Send the changes of the frame to the canvas in one batch.
+        :return: (int) The number of canvas operations of the frame.
+        """
+        ops = len(self.__pending_ops) + len(self.__pending_locations) + len(self.__pending_texts)
+        master = self.__master if ops > 1 else None
+        if master is not None:
+            # The instance attribute hides the method of Tk until the end of the flush.
+            master.update_idletasks = _skip_update
+        try:
+            for gobj, x, y in self.__pending_ops:
+                if x is None:
+                    self.window.remove(gobj)
+                else:
+                    self.window.add(gobj, x=x, y=y)
+            for gobj, location in self.__pending_locations.items():
+                # Setting the location moves the object with one operation, while setting x and y takes two.
+                gobj.location = location
+                self.__locations[gobj] = location
+            for label, text in self.__pending_texts.items():
+                label.text = text
+                self.__texts[label] = text
+        finally:
+            if master is not None:
+                del master.update_idletasks
+                master.update_idletasks()
+        self.__pending_ops.clear()
+        self.__pending_locations.clear()
+        self.__pending_texts.clear()
+
+        self.ops = ops
+        self.total_ops += ops
+        self.max_ops = max(self.max_ops, ops)
+        self.frames += 1
+        return ops
+
+    def get_average_ops(self):
+        """
+        The average number of canvas operations per flushed frame.
+        :return: (float) Operations per frame.
+        """
+        return self.total_ops / self.frames if self.frames else 0
+
+
+def get_tk_master(window):
+    """
+    :param window: (GWindow) A campy window
+    :return: The Tk window of the campy window, None if the window does not use the Tk backend.
+    """
+    return getattr(getattr(window, '_tkwin', None), '_master', None)
+
+
+def _skip_update():
+    """
+    Stand in for the idle update of Tk during a flush.
+    """
@@ -0,0 +1,323 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program stores the full state of every frame of many games, for the analysis of the games.
+A store is a directory of columns, each column is a file of fixed-width little endian values, one per frame,
+so the frames of all the games can be read column by column without loading the whole store.
+The frames are buffered and appended to the columns in chunks while the games are played.
+The reader maps the column files into memory, and returns NumPy views of them without copying.
+
+The files of a store:
+    header: magic (4 bytes) b'BKFR', version (uint8), brick rows (uint16), brick columns (uint16)
+    <column>.bin: the values of the column, see COLUMNS. bricks.bin keeps the brick-alive bitmask of every frame,
+                  in the order of np.packbits, (rows * columns + 7) // 8 bytes per frame.
+    games.bin: the index of the games, see GAME_DTYPE, a game is indexed when it ends.
+"""
+import mmap
+import os
+import struct
+import numpy as np
+
+MAGIC = b'BKFR'
+VERSION = 1
+HEADER = struct.Struct('<4sBHH')
+CHUNK_FRAMES = 4096     # Number of frames buffered before they are appended to the column files
+
+# The columns kept for every frame, the block paddle is NaN when it is not in the game.
+COLUMNS = (
+    ('ball_x', '<f4'),
+    ('ball_y', '<f4'),
+    ('dx', '<f4'),
+    ('dy', '<f4'),
+    ('paddle_x', '<f4'),
+    ('paddle_width', '<f4'),
+    ('block_paddle_x', '<f4'),
+    ('block_paddle_y', '<f4'),
+    ('score', '<i4'),
+    ('lives', '<i2'),
+)
+BRICKS = 'bricks'
+GAME_DTYPE = np.dtype([('seed', '<u8'), ('first_frame', '<u8'), ('frames', '<u4')])
+
+
+class FrameWriter:
+    """
+    This class records the frames of games into a store, game by game.
+    """
+    def __init__(self, path, brick_rows, brick_cols, chunk_frames=CHUNK_FRAMES):
+        """
+        Create the store, or open it to append more games with the same bricks.
+        :param path: (str) The directory of the store
+        :param brick_rows: Number of rows of bricks
+        :param brick_cols: Number of columns of bricks
+        :param chunk_frames: (int) Number of frames buffered before they are written.
+        """
+        self.path = path
+        self.brick_rows = brick_rows
+        self.brick_cols = brick_cols
+        self.num_bricks = brick_rows * brick_cols
+        os.makedirs(path, exist_ok=True)
+        header_path = os.path.join(path, 'header')
+        if os.path.exists(header_path):
+            rows, cols = _read_header(path)
+            if (rows, cols) != (brick_rows, brick_cols):
+                raise ValueError('The store keeps games with %d x %d bricks.' % (rows, cols))
+        else:
+            with open(header_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, brick_rows, brick_cols))
+
+        # The chunk buffers, a row per frame.
+        self.chunk_frames = chunk_frames
+        self.__columns = {name: np.zeros(chunk_frames, dtype=dtype) for name, dtype in COLUMNS}
+        self.__bricks = np.zeros((chunk_frames, (self.num_bricks + 7) // 8), dtype=np.uint8)
+        self.__size = 0
+        self.__files = {name: open(os.path.join(path, name + '.bin'), 'ab') for name, _ in COLUMNS}
+        self.__files[BRICKS] = open(os.path.join(path, BRICKS + '.bin'), 'ab')
+        self.__games = open(os.path.join(path, 'games.bin'), 'ab')
+        self.__pending_games = []
+
+        # Frames already in the store, the new frames are appended after them.
+        self.frames = self.__files[BRICKS].tell() // self.__bricks.shape[1] if self.__bricks.shape[1] else 0
+        self.games = self.__games.tell() // GAME_DTYPE.itemsize
+
+        # The game being recorded
+        self.__seed = None
+        self.__first_frame = 0
+        self.__alive = np.ones(self.num_bricks, dtype=bool)
+        self.__mask = np.packbits(self.__alive)
+        self.__remove_bricks_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def begin_game(self, engine, seed):
+        """
+        Start recording a new game, with the bricks of the engine before the first tick.
+        :param engine: (BreakoutEngine) The game being recorded, a level can have empty cells.
+        :param seed: (int) The seed of the game, it is kept in the index.
+        """
+        if self.__seed is not None:
+            self.end_game()
+        self.__seed = seed
+        self.__first_frame = self.frames
+        self.__alive[:] = np.frombuffer(engine.brick_grid.types, dtype=np.uint8) != 0
+        self.__mask = np.packbits(self.__alive)
+        self.__remove_bricks_count = engine.remove_bricks_count
+
+    def record(self, engine):
+        """
+        Record the state of the engine as the next frame of the game.
+        It must be called after every tick, before the renderer clears the removed bricks of the engine.
+        :param engine: (BreakoutEngine) The game being recorded
+        """
+        if engine.remove_bricks_count != self.__remove_bricks_count:
+            self.__update_mask(engine)
+
+        i = self.__size
+        columns = self.__columns
+        columns['ball_x'][i] = engine.ball.x
+        columns['ball_y'][i] = engine.ball.y
+        columns['dx'][i] = engine.dx
+        columns['dy'][i] = engine.dy
+        columns['paddle_x'][i] = engine.paddle.x
+        columns['paddle_width'][i] = engine.paddle.width
+        if getattr(engine, 'is_block_paddle_active', False):
+            columns['block_paddle_x'][i] = engine.block_paddle.x
+            columns['block_paddle_y'][i] = engine.block_paddle.y
+        else:
+            columns['block_paddle_x'][i] = np.nan
+            columns['block_paddle_y'][i] = np.nan
+        columns['score'][i] = getattr(engine, 'score', engine.remove_bricks_count)
+        columns['lives'][i] = engine.lives
+        self.__bricks[i] = self.__mask
+
+        self.__size += 1
+        self.frames += 1
+        if self.__size == self.chunk_frames:
+            self.flush()
+
+    def end_game(self):
+        """
+        Finish the game being recorded, and add it to the index.
+        """
+        if self.__seed is None:
+            return
+        # The game is indexed when its last frames are written, so the index never points after the columns.
+        self.__pending_games.append((self.__seed, self.__first_frame, self.frames - self.__first_frame))
+        self.games += 1
+        self.__seed = None
+        if len(self.__pending_games) == self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        """
+        Append the buffered frames to the column files, and the finished games to the index.
+        """
+        size = self.__size
+        if size:
+            for name, column in self.__columns.items():
+                column[:size].tofile(self.__files[name])
+            self.__bricks[:size].tofile(self.__files[BRICKS])
+            for f in self.__files.values():
+                f.flush()
+            self.__size = 0
+        if self.__pending_games:
+            np.array(self.__pending_games, dtype=GAME_DTYPE).tofile(self.__games)
+            self.__games.flush()
+            self.__pending_games.clear()
+
+    def close(self):
+        """
+        Finish the game being recorded, and close the files.
+        """
+        self.end_game()
+        self.flush()
+        for f in self.__files.values():
+            f.close()
+        self.__games.close()
+
+    def __update_mask(self, engine):
+        """
+        Clear the bits of the bricks removed since the last frame.
+        :param engine: (BreakoutEngine) The game being recorded
+        """
+        count = engine.remove_bricks_count - self.__remove_bricks_count
+        removed_bricks = engine.removed_bricks
+        if 0 < count <= len(removed_bricks):
+            # The new bricks are the last ones, the renderer has not cleared them yet.
+            for brick in removed_bricks[-count:]:
+                self.__alive[brick.row * self.brick_cols + brick.col] = False
+        else:
+            self.__alive[:] = np.frombuffer(engine.brick_grid.types, dtype=np.uint8) != 0
+        self.__mask = np.packbits(self.__alive)
+        self.__remove_bricks_count = engine.remove_bricks_count
+
+
+class FrameReader:
+    """
+    This class maps a store into memory, the columns are NumPy views of the files.
+    """
+    def __init__(self, path):
+        """
+        :param path: (str) The directory of the store
+        """
+        self.path = path
+        self.brick_rows, self.brick_cols = _read_header(path)
+        self.num_bricks = self.brick_rows * self.brick_cols
+        self.__maps = []
+
+        self.columns = {}
+        for name, dtype in COLUMNS:
+            self.columns[name] = self.__map(name + '.bin', np.dtype(dtype))
+        bricks = self.__map(BRICKS + '.bin', np.dtype(np.uint8))
+        self.columns[BRICKS] = bricks.reshape(-1, (self.num_bricks + 7) // 8) if self.num_bricks else bricks
+        self.games = self.__map('games.bin', GAME_DTYPE)
+
+        # A frame is complete only when all its columns are written.
+        self.frames = min(len(column) for column in self.columns.values())
+        for name in self.columns:
+            self.columns[name] = self.columns[name][:self.frames]
+
+    def __len__(self):
+        """
+        :return: (int) The number of frames in the store.
+        """
+        return self.frames
+
+    def __getitem__(self, name):
+        """
+        :param name: (str) The name of a column, or 'bricks'
+        :return: (numpy.ndarray) The values of the column, one per frame.
+        """
+        return self.columns[name]
+
+    def get_frame(self, frame):
+        """
+        Seek to a frame.
+        :param frame: (int) The index of the frame in the store
+        :return: (dict) The values of the frame, by the names of the columns.
+        """
+        return {name: column[frame] for name, column in self.columns.items()}
+
+    def get_game(self, game):
+        """
+        Seek to a game.
+        :param game: (int) The index of the game in the store
+        :return: (dict) The views of the frames of the game, by the names of the columns.
+        """
+        first_frame = int(self.games[game]['first_frame'])
+        end = first_frame + int(self.games[game]['frames'])
+        return {name: column[first_frame:end] for name, column in self.columns.items()}
+
+    def find_game(self, seed):
+        """
+        Find the game of the seed.
+        :param seed: (int) The seed of the game
+        :return: (int) The index of the first game with the seed, None if there is no such game.
+        """
+        indices = np.flatnonzero(self.games['seed'] == seed)
+        return int(indices[0]) if len(indices) else None
+
+    def get_bricks(self, frame):
+        """
+        Get the alive bricks of a frame.
+        :param frame: (int) The index of the frame in the store
+        :return: (numpy.ndarray) (rows, columns) of bool, True if the brick is alive.
+        """
+        bits = np.unpackbits(self.columns[BRICKS][frame], count=self.num_bricks)
+        return bits.reshape(self.brick_rows, self.brick_cols).astype(bool)
+
+    def close(self):
+        """
+        Release the mapped files, the views must not be used afterwards.
+        """
+        self.columns.clear()
+        self.games = None
+        for m in self.__maps:
+            try:
+                m.close()
+            except BufferError:
+                # A view is still used by the caller, the file is released when the view is deleted.
+                pass
+        self.__maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __map(self, name, dtype):
+        """
+        Map a file of the store into memory.
+        :param name: (str) The name of the file
+        :param dtype: (numpy.dtype) The type of the values in the file
+        :return: (numpy.ndarray) The read-only view of the file.
+        """
+        with open(os.path.join(self.path, name), 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # An empty file can not be mapped.
+            if size < dtype.itemsize:
+                return np.zeros(0, dtype=dtype)
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__maps.append(m)
+        return np.frombuffer(m, dtype=dtype, count=size // dtype.itemsize)
+
+
+def _read_header(path):
+    """
+    Read the header of a store.
+    :param path: (str) The directory of the store
+    :return: (tuple) The number of rows and columns of bricks.
+    """
+    with open(os.path.join(path, 'header'), 'rb') as f:
+        magic, version, rows, cols = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Not a frame store of breakout, or an unsupported version.')
+    return rows, cols
@@ -0,0 +1,476 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program records the events of games, a brick removed, a bounce on the paddle or the block paddle,
+a life lost, a special event of a red brick and the end of a game, and aggregates them over many games.
+EventEmitter follows an engine after each tick, and sends typed events to a sink.
+A sink buffers the events and writes them in chunks, as JSON lines or as binary records.
+The readers are generators reading the files chunk by chunk, and EventStats keeps histograms of a fixed size,
+so any number of games is aggregated in constant memory.
+
+The binary format is little endian:
+    magic (4 bytes) b'BKEV', version (uint8), followed by the events,
+    each event is its kind (uint8), the index of its class in EVENT_CLASSES, followed by its fields
+    in the record format of its class.
+A JSON line is an object with the name of the kind in 'event', and the fields of the event.
+
+Aggregate the events of the games:
+    python gameevents.py events1.bin events2.jsonl
+"""
+import json
+import struct
+from collections import namedtuple
+from brickgrid import RED
+from breakoutengine import LIFE_LOST, GAME_LOST, GAME_WON
+from inputlog import get_variant, create_engine, iter_replay
+
+MAGIC = b'BKEV'
+VERSION = 1
+HEADER = struct.Struct('<4sB')
+CHUNK_EVENTS = 4096     # Number of events buffered before they are written
+CHUNK_SIZE = 1 << 16    # Number of bytes read at a time
+TICK_BUCKET = 1000      # Width of the buckets of the histograms over ticks
+SCORE_BUCKET = 10       # Width of the buckets of the histogram of the scores
+
+
+class GameStarted(namedtuple('GameStarted', 'tick seed variant')):
+    """
+    A game starts, the events until the next GameStarted belong to this game.
+    The variant is the engine of the game, as stored in the input logs.
+    """
+    __slots__ = ()
+    kind = 0
+    name = 'game_started'
+    record = struct.Struct('<IQB')
+
+
+class BrickRemoved(namedtuple('BrickRemoved', 'tick row col type')):
+    """
+    A brick is removed, the type is the type of the brick in brickgrid.py.
+    """
+    __slots__ = ()
+    kind = 1
+    name = 'brick_removed'
+    record = struct.Struct('<IHHB')
+
+
+class PaddleHit(namedtuple('PaddleHit', 'tick')):
+    """
+    The ball bounces on the paddle.
+    """
+    __slots__ = ()
+    kind = 2
+    name = 'paddle_hit'
+    record = struct.Struct('<I')
+
+
+class BlockPaddleHit(namedtuple('BlockPaddleHit', 'tick')):
+    """
+    The ball bounces on the block paddle of the extension version.
+    """
+    __slots__ = ()
+    kind = 3
+    name = 'block_paddle_hit'
+    record = struct.Struct('<I')
+
+
+class LifeLost(namedtuple('LifeLost', 'tick lives')):
+    """
+    The ball leaves the bottom of the window, lives is the number of lives left.
+    """
+    __slots__ = ()
+    kind = 4
+    name = 'life_lost'
+    record = struct.Struct('<IH')
+
+
+class SpecialEvent(namedtuple('SpecialEvent', 'tick red_bricks')):
+    """
+    A red brick of the extension version is removed, red_bricks is the number of red bricks left,
+    which tells the event: 2 the paddle becomes longer, 1 shorter, 0 the ball becomes faster.
+    """
+    __slots__ = ()
+    kind = 5
+    name = 'special_event'
+    record = struct.Struct('<IB')
+
+
+class GameEnded(namedtuple('GameEnded', 'tick won score removed_bricks')):
+    """
+    The game is won or lost.
+    """
+    __slots__ = ()
+    kind = 6
+    name = 'game_ended'
+    record = struct.Struct('<I?II')
+
+
+EVENT_CLASSES = (GameStarted, BrickRemoved, PaddleHit, BlockPaddleHit, LifeLost, SpecialEvent, GameEnded)
+EVENT_NAMES = {event_class.name: event_class for event_class in EVENT_CLASSES}
+
+
+class EventEmitter:
+    """
+    This class follows an engine after each tick, and sends the events of the tick to a sink.
+    """
+    def __init__(self, sink):
+        """
+        :param sink: The sink of the events, an object with an emit(event) method, e.g. JsonlSink or BinarySink.
+        """
+        self.sink = sink
+        self.__remove_bricks_count = 0
+        self.__paddle_hits = 0
+        self.__block_paddle_hits = 0
+
+    def begin_game(self, engine, seed, tick=0):
+        """
+        Send the start of a game, the events are counted from the current state of the engine.
+        :param engine: (BreakoutEngine) The game, any variant of the engine.
+        :param seed: (int) The seed of the game
+        :param tick: (int) The number of ticks played before
+        """
+        self.sync(engine)
+        self.sink.emit(GameStarted(tick, seed, get_variant(type(engine))))
+
+    def sync(self, engine):
+        """
+        Count the events from the current state of the engine, e.g. after a snapshot is restored.
+        :param engine: (BreakoutEngine) The game
+        """
+        self.__remove_bricks_count = engine.remove_bricks_count
+        self.__paddle_hits = engine.paddle_hits
+        self.__block_paddle_hits = getattr(engine, 'block_paddle_hits', 0)
+
+    def follow(self, engine, tick, state):
+        """
+        Send the events of the tick.
+        It must be called after every tick, before the renderer clears the removed bricks of the engine.
+        :param engine: (BreakoutEngine) The game
+        :param tick: (int) The number of the tick, from 0.
+        :param state: (int) The state returned by the tick of the engine
+        """
+        emit = self.sink.emit
+        removed = engine.remove_bricks_count - self.__remove_bricks_count
+        if removed > 0:
+            bricks = engine.removed_bricks[-removed:]
+            for brick in bricks:
+                emit(BrickRemoved(tick, brick.row, brick.col, brick.type))
+            if hasattr(engine, 'num_red_bricks'):
+                # The red bricks removed in the tick are counted down to the red bricks left.
+                red_bricks = engine.num_red_bricks + sum(brick.type == RED for brick in bricks)
+                for brick in bricks:
+                    if brick.type == RED:
+                        red_bricks -= 1
+                        emit(SpecialEvent(tick, red_bricks))
+        self.__remove_bricks_count = engine.remove_bricks_count
+
+        for _ in range(engine.paddle_hits - self.__paddle_hits):
+            emit(PaddleHit(tick))
+        self.__paddle_hits = engine.paddle_hits
+        block_paddle_hits = getattr(engine, 'block_paddle_hits', 0)
+        for _ in range(block_paddle_hits - self.__block_paddle_hits):
+            emit(BlockPaddleHit(tick))
+        self.__block_paddle_hits = block_paddle_hits
+
+        if state == LIFE_LOST or state == GAME_LOST:
+            emit(LifeLost(tick, engine.lives))
+        if state == GAME_LOST or state == GAME_WON:
+            emit(GameEnded(tick, state == GAME_WON, getattr(engine, 'score', engine.remove_bricks_count),
+                           engine.remove_bricks_count))
+
+
+class JsonlSink:
+    """
+    This class writes the events as JSON lines, CHUNK_EVENTS lines at a time.
+    """
+    def __init__(self, path, chunk_events=CHUNK_EVENTS):
+        """
+        Create the file, or open it to append more events.
+        :param path: (str) The path of the file
+        :param chunk_events: (int) Number of events buffered before they are written.
+        """
+        self.chunk_events = chunk_events
+        self.__file = open(path, 'a')
+        self.__lines = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def emit(self, event):
+        """
+        :param event: The event, one of EVENT_CLASSES.
+        """
+        fields = event._asdict()
+        fields['event'] = event.name
+        self.__lines.append(json.dumps(fields) + '\n')
+        if len(self.__lines) >= self.chunk_events:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered events.
+        """
+        self.__file.writelines(self.__lines)
+        self.__file.flush()
+        self.__lines.clear()
+
+    def close(self):
+        """
+        Write the buffered events, and close the file.
+        """
+        self.flush()
+        self.__file.close()
+
+
+class BinarySink:
+    """
+    This class writes the events as binary records, CHUNK_EVENTS records at a time.
+    """
+    def __init__(self, path, chunk_events=CHUNK_EVENTS):
+        """
+        Create the file, or open it to append more events.
+        :param path: (str) The path of the file
+        :param chunk_events: (int) Number of events buffered before they are written.
+        """
+        self.chunk_events = chunk_events
+        self.__file = open(path, 'ab')
+        if self.__file.tell() == 0:
+            self.__file.write(HEADER.pack(MAGIC, VERSION))
+        self.__buffer = bytearray()
+        self.__count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def emit(self, event):
+        """
+        :param event: The event, one of EVENT_CLASSES.
+        """
+        self.__buffer.append(event.kind)
+        self.__buffer += event.record.pack(*event)
+        self.__count += 1
+        if self.__count >= self.chunk_events:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered events.
+        """
+        self.__file.write(self.__buffer)
+        self.__file.flush()
+        self.__buffer.clear()
+        self.__count = 0
+
+    def close(self):
+        """
+        Write the buffered events, and close the file.
+        """
+        self.flush()
+        self.__file.close()
+
+
+class EventStats:
+    """
+    This class aggregates the events of any number of games into histograms of a fixed size.
+    """
+    def __init__(self, tick_bucket=TICK_BUCKET, score_bucket=SCORE_BUCKET):
+        """
+        :param tick_bucket: (int) Width of the buckets of the histograms over ticks
+        :param score_bucket: (int) Width of the buckets of the histogram of the scores
+        """
+        self.tick_bucket = tick_bucket
+        self.score_bucket = score_bucket
+        self.games = 0
+        self.won = 0
+        self.events = {event_class.name: 0 for event_class in EVENT_CLASSES}
+        self.removed_bricks = {}        # Number of removals of each (row, col)
+        self.first_bricks = {}          # Number of games whose first removed brick is (row, col)
+        self.special_events = {}        # Number of special events by the red bricks left
+        self.lives_lost = {}            # Number of lives lost by the bucket of their ticks in the game
+        self.paddle_hits_per_life = {}  # Number of lost lives by the bounces on the paddle during the life
+        self.scores = {}                # Number of games by the bucket of their scores
+        self.game_ticks = {}            # Number of games by the bucket of their lengths
+        # The game being aggregated
+        self.__start_tick = 0
+        self.__is_first_brick = True
+        self.__paddle_hits = 0
+
+    def add(self, event):
+        """
+        Add an event to the histograms, the events of a game must be added in order.
+        :param event: The event, one of EVENT_CLASSES.
+        """
+        self.events[event.name] += 1
+        event_class = type(event)
+        if event_class is PaddleHit:
+            self.__paddle_hits += 1
+        elif event_class is BrickRemoved:
+            cell = (event.row, event.col)
+            _count(self.removed_bricks, cell)
+            if self.__is_first_brick:
+                _count(self.first_bricks, cell)
+                self.__is_first_brick = False
+        elif event_class is GameStarted:
+            self.games += 1
+            self.__start_tick = event.tick
+            self.__is_first_brick = True
+            self.__paddle_hits = 0
+        elif event_class is LifeLost:
+            _count(self.lives_lost, (event.tick - self.__start_tick) // self.tick_bucket * self.tick_bucket)
+            _count(self.paddle_hits_per_life, self.__paddle_hits)
+            self.__paddle_hits = 0
+        elif event_class is SpecialEvent:
+            _count(self.special_events, event.red_bricks)
+        elif event_class is GameEnded:
+            self.won += event.won
+            _count(self.scores, event.score // self.score_bucket * self.score_bucket)
+            _count(self.game_ticks, (event.tick - self.__start_tick) // self.tick_bucket * self.tick_bucket)
+
+    def add_all(self, events):
+        """
+        :param events: The events, e.g. a generator of read_events.
+        :return: (EventStats) This object, with the events added.
+        """
+        add = self.add
+        for event in events:
+            add(event)
+        return self
+
+    def summary(self):
+        """
+        :return: (str) The histograms in lines of text, the largest buckets of the bricks first.
+        """
+        lines = ['%d games, %d won' % (self.games, self.won),
+                 'events: ' + ', '.join('%s %d' % item for item in self.events.items())]
+        for title, histogram, limit in (('most removed bricks (row, col)', self.removed_bricks, 10),
+                                        ('first removed bricks (row, col)', self.first_bricks, 10)):
+            top = sorted(histogram.items(), key=lambda item: item[1], reverse=True)[:limit]
+            lines.append(title + ': ' + ', '.join('%s %d' % item for item in top))
+        for title, histogram in (('special events by red bricks left', self.special_events),
+                                 ('lives lost by tick', self.lives_lost),
+                                 ('lost lives by paddle hits', self.paddle_hits_per_life),
+                                 ('games by score', self.scores),
+                                 ('games by ticks', self.game_ticks)):
+            lines.append(title + ': ' + ', '.join('%s %d' % item for item in sorted(histogram.items())))
+        return '\n'.join(lines)
+
+
+def open_sink(path, chunk_events=CHUNK_EVENTS):
+    """
+    :param path: (str) The path of the file, the events are written as JSON lines if it ends with .jsonl.
+    :param chunk_events: (int) Number of events buffered before they are written.
+    :return: (JsonlSink or BinarySink) The sink writing to the file.
+    """
+    if path.endswith('.jsonl'):
+        return JsonlSink(path, chunk_events)
+    return BinarySink(path, chunk_events)
+
+
+def read_events(path, chunk_size=CHUNK_SIZE):
+    """
+    Read the events of a file written by a sink, the format is found by the magic of the binary format.
+    :param path: (str) The path of the file
+    :param chunk_size: (int) Number of bytes read at a time
+    :return: (generator) The events, in the order they were written.
+    """
+    with open(path, 'rb') as f:
+        is_binary = f.read(len(MAGIC)) == MAGIC
+    if is_binary:
+        return read_binary_events(path, chunk_size)
+    return read_jsonl_events(path)
+
+
+def read_jsonl_events(path):
+    """
+    :param path: (str) The path of a file written by JsonlSink
+    :return: (generator) The events, in the order they were written.
+    """
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                fields = json.loads(line)
+                yield EVENT_NAMES[fields.pop('event')](**fields)
+
+
+def read_binary_events(path, chunk_size=CHUNK_SIZE):
+    """
+    :param path: (str) The path of a file written by BinarySink
+    :param chunk_size: (int) Number of bytes read at a time
+    :return: (generator) The events, in the order they were written.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size or HEADER.unpack(header) != (MAGIC, VERSION):
+            raise ValueError('Not an event file of breakout, or an unsupported version.')
+        rest = b''
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            data = rest + chunk
+            offset = 0
+            # A record cut by the end of the chunk is read with the next chunk.
+            while offset < len(data):
+                event_class = EVENT_CLASSES[data[offset]]
+                end = offset + 1 + event_class.record.size
+                if end > len(data):
+                    break
+                yield event_class._make(event_class.record.unpack_from(data, offset + 1))
+                offset = end
+            rest = data[offset:]
+        if rest:
+            raise ValueError('The event file is truncated.')
+
+
+def replay_events(log, sink, **kwargs):
+    """
+    Replay an input log headlessly, and send the events of the game to the sink,
+    so the events of the recorded games can be aggregated afterwards.
+    :param log: (InputLog) The log of the game
+    :param sink: The sink of the events
+    :param kwargs: The other parameters of the engine, the same as the recorded game.
+    """
+    engine = create_engine(log, **kwargs)
+    emitter = EventEmitter(sink)
+    emitter.begin_game(engine, log.seed)
+    for tick, state in iter_replay(log, engine):
+        emitter.follow(engine, tick, state)
+
+
+def _count(histogram, key):
+    """
+    Add one to the bucket of the histogram.
+    :param histogram: (dict) The counts by the buckets
+    :param key: The bucket
+    """
+    histogram[key] = histogram.get(key, 0) + 1
+
+
+def main():
+    """
+    Aggregate the event files, and print the histograms.
+    """
+    # The graphics import this module for the events, so only the command line loads argparse.
+    import argparse
+    parser = argparse.ArgumentParser(description='Aggregate the events of games.')
+    parser.add_argument('files', nargs='+', help='paths of the event files, binary or JSON lines')
+    parser.add_argument('--tick-bucket', type=int, default=TICK_BUCKET, help='width of the buckets of ticks')
+    parser.add_argument('--score-bucket', type=int, default=SCORE_BUCKET, help='width of the buckets of scores')
+    args = parser.parse_args()
+    stats = EventStats(args.tick_bucket, args.score_bucket)
+    for path in args.files:
+        stats.add_all(read_events(path))
+    print(stats.summary())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program provides a fixed-timestep game loop.
+The elapsed time is collected in an accumulator, and the game is ticked at a fixed rate,
+so the speed of the game does not depend on how long the drawing takes.
+The drawing has its own capped rate, and it is skipped when the loop falls behind.
+The waits of the loop are yielded by GameLoop.frames, so asyncloop.py can wait in an asyncio event loop instead.
+"""
+import time
+from breakoutengine import GAME_LOST, GAME_WON
+
+TICK_RATE = 100             # Ticks of the game per second
+RENDER_RATE = 60            # Maximum number of drawings per second
+MAX_TICKS_PER_FRAME = 10    # Maximum ticks between two drawings, the rest of the debt is dropped
+MAX_FRAME_SKIP = 5          # Maximum drawings skipped in a row when the loop falls behind
+MIN_IDLE = 0.0001           # Minimum idle time (in seconds), so the events are still pumped
+
+
+class GameLoop:
+    """
+    This class runs the ticks and the drawings of a game at their own rates.
+    """
+    def __init__(self, tick, render, tick_rate=TICK_RATE, render_rate=RENDER_RATE, fast_forward=False,
+                 idle=time.sleep, clock=time.perf_counter):
+        """
+        :param tick: The function advancing the game by one tick, it returns the state of BreakoutEngine.tick.
+        :param render: The function drawing the current state of the game.
+        :param tick_rate: (int) Ticks of the game per second
+        :param render_rate: (int) Maximum number of drawings per second
+        :param fast_forward: (Bool) True to tick as fast as possible, the drawing is still capped.
+        :param idle: The function waiting for the given seconds, campy's pause can be used to pump the events.
+        :param clock: The function returning the current time (in seconds)
+        """
+        self.tick = tick
+        self.render = render
+        self.tick_rate = tick_rate
+        self.render_rate = render_rate
+        self.fast_forward = fast_forward
+        self.idle = idle
+        self.clock = clock
+
+        # The statistics of the last run
+        self.ticks = 0
+        self.renders = 0
+        self.skipped_renders = 0
+        self.elapsed = 0
+
+    def run(self):
+        """
+        Run the game until it is over.
+        :return: (int) The last state returned by tick, GAME_LOST or GAME_WON.
+        """
+        frames = self.frames()
+        try:
+            while True:
+                self.idle(next(frames))
+        except StopIteration as stop:
+            return stop.value
+
+    def frames(self):
+        """
+        Tick and draw the game, and yield whenever the loop waits, so the caller decides how to wait.
+        :return: (generator) The seconds to wait before the next step,
+                 the last state returned by tick is the value of StopIteration.
+        """
+        tick_time = 1 / self.tick_rate
+        render_time = 1 / self.render_rate
+        self.ticks = 0
+        self.renders = 0
+        self.skipped_renders = 0
+
+        start = last = self.clock()
+        next_render = start
+        accumulator = 0
+        skipped = 0
+        while True:
+            now = self.clock()
+            # The loop is behind when more ticks are due than a frame can pay, the drawing is skipped then.
+            is_behind = False
+            if self.fast_forward:
+                ticks_due = MAX_TICKS_PER_FRAME
+            else:
+                accumulator += now - last
+                ticks_due = int(accumulator / tick_time)
+                # Drop the debt which can not be paid, instead of spiraling behind.
+                if ticks_due > MAX_TICKS_PER_FRAME:
+                    ticks_due = MAX_TICKS_PER_FRAME
+                    accumulator = tick_time * MAX_TICKS_PER_FRAME
+                    is_behind = True
+            last = now
+
+            for _ in range(ticks_due):
+                state = self.tick()
+                self.ticks += 1
+                accumulator -= tick_time
+                if state == GAME_LOST or state == GAME_WON:
+                    self.render()
+                    self.renders += 1
+                    self.elapsed = self.clock() - start
+                    return state
+
+            now = self.clock()
+            if now >= next_render:
+                if is_behind and skipped < MAX_FRAME_SKIP:
+                    skipped += 1
+                    self.skipped_renders += 1
+                else:
+                    self.render()
+                    self.renders += 1
+                    skipped = 0
+                    next_render = max(next_render + render_time, now)
+                    if self.fast_forward:
+                        yield MIN_IDLE
+
+            if self.fast_forward:
+                continue
+            if is_behind:
+                # There is no time to wait, but the loop still yields, so the events are pumped and other tasks run.
+                yield MIN_IDLE
+            else:
+                # Wait until the next tick or the next drawing.
+                now = self.clock()
+                wait = min(tick_time - accumulator - (now - last), next_render - now)
+                yield max(wait, MIN_IDLE)
+
+    def get_tick_rate(self):
+        """
+        The actual tick rate of the last run.
+        :return: (float) Ticks per second.
+        """
+        return self.ticks / self.elapsed if self.elapsed else 0
+
+    def get_render_rate(self):
+        """
+        The actual drawing rate of the last run.
+        :return: (float) Drawings per second.
+        """
+        return self.renders / self.elapsed if self.elapsed else 0
@@ -0,0 +1,218 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program records the inputs of a game in a compact binary log.
+A game owns a random generator created from its seed, so the seed, the level and the inputs of every tick,
+the x position of the mouse and whether the window was clicked, reproduce the exact game.
+Replaying a log is headless, and runs far faster than real time.
+
+The format of a log is little endian:
+    magic (4 bytes) b'BKIL', version (uint8), variant (uint8), seed (uint64), ticks (uint32), clicks (uint32),
+    level size (uint32),
+followed by a zlib stream of the mouse x of every tick (int16), the ticks of the clicks (uint32),
+and the level compiled by levels.py, the level size is 0 for the uniform bricks.
+The version changes whenever the same seed and inputs give a different game, so an old log can not be replayed:
+version 2 places the red bricks of the extension version with rng.sample, version 3 keeps the level.
+"""
+import random
+import struct
+import sys
+import zlib
+from array import array
+from levels import Level
+from breakoutengine import BreakoutEngine
+from breakoutengine_extension import BreakoutEngineExtension
+from breakoutengine_multiball import BreakoutEngineMultiBall
+
+MAGIC = b'BKIL'
+VERSION = 3
+NO_MOVE = -32768        # The mouse x of a tick without any mouse movement
+HEADER = struct.Struct('<4sBBQIII')
+
+# The engines by the variants stored in the log
+BASIC = 0
+EXTENSION = 1
+MULTI_BALL = 2
+ENGINES = {BASIC: BreakoutEngine, EXTENSION: BreakoutEngineExtension, MULTI_BALL: BreakoutEngineMultiBall}
+
+
+class InputLog:
+    """
+    This class keeps the seed of a game and its inputs tick by tick.
+    """
+    def __init__(self, seed, variant=BASIC, level=None):
+        """
+        :param seed: (int) The seed of the random generator of the game
+        :param variant: (int) BASIC, EXTENSION or MULTI_BALL, the engine of the game
+        :param level: (Level) The level of the game in levels.py, None for the uniform bricks.
+        """
+        self.seed = seed
+        self.variant = variant
+        self.level = level
+        self.mouse_x = array('h')       # The mouse x of each tick, NO_MOVE if the mouse did not move
+        self.click_ticks = array('I')   # The ticks before which the window was clicked
+
+    def __len__(self):
+        """
+        :return: (int) The number of recorded ticks.
+        """
+        return len(self.mouse_x)
+
+    def record(self, mouse_x, is_clicked):
+        """
+        Record the inputs of the next tick.
+        :param mouse_x: (int) The x position of the mouse, None if the mouse did not move.
+        :param is_clicked: (Bool) True if the window was clicked before the tick.
+        """
+        if is_clicked:
+            self.click_ticks.append(len(self.mouse_x))
+        self.mouse_x.append(NO_MOVE if mouse_x is None else mouse_x)
+
+    def to_bytes(self):
+        """
+        Encode the log.
+        :return: (bytes) The binary log.
+        """
+        mouse_x = array('h', self.mouse_x)
+        click_ticks = array('I', self.click_ticks)
+        if sys.byteorder == 'big':
+            mouse_x.byteswap()
+            click_ticks.byteswap()
+        level = b'' if self.level is None else self.level.to_bytes()
+        header = HEADER.pack(MAGIC, VERSION, self.variant, self.seed, len(mouse_x), len(click_ticks), len(level))
+        return header + zlib.compress(mouse_x.tobytes() + click_ticks.tobytes() + level)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Decode a log.
+        :param data: (bytes) The binary log
+        :return: (InputLog) The decoded log.
+        """
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError('Not an input log of breakout.')
+        version = data[len(MAGIC)]
+        if version < VERSION:
+            # The game of an old log is not the same game anymore, so it can not be converted.
+            raise ValueError('The input log was recorded by an older version of the game (version %d), '
+                             'it can not be replayed.' % version)
+        if version != VERSION:
+            raise ValueError('The input log was recorded by a newer version of the game (version %d).' % version)
+        magic, version, variant, seed, ticks, clicks, level_size = HEADER.unpack_from(data)
+        payload = zlib.decompress(data[HEADER.size:])
+        log = cls(seed, variant)
+        clicks_start = ticks * log.mouse_x.itemsize
+        level_start = clicks_start + clicks * log.click_ticks.itemsize
+        if len(payload) != level_start + level_size:
+            raise ValueError('The input log is truncated.')
+        log.mouse_x.frombytes(payload[:clicks_start])
+        log.click_ticks.frombytes(payload[clicks_start:level_start])
+        if level_size:
+            log.level = Level.from_bytes(payload[level_start:])
+        if sys.byteorder == 'big':
+            log.mouse_x.byteswap()
+            log.click_ticks.byteswap()
+        return log
+
+    def save(self, path):
+        """
+        Write the log into a file.
+        :param path: (str) The path of the file
+        """
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a log from a file.
+        :param path: (str) The path of the file
+        :return: (InputLog) The log.
+        """
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def get_variant(engine_class):
+    """
+    :param engine_class: The class of the engine of the game
+    :return: (int) The variant stored in the log for the engine.
+    """
+    for variant, engine in ENGINES.items():
+        if engine is engine_class:
+            return variant
+    raise ValueError('The engine can not be recorded: %s' % engine_class.__name__)
+
+
+def to_mouse_x(x):
+    """
+    Convert the x position of a mouse event to the value stored in the log.
+    The game uses the converted value too, so the replay is exact.
+    :param x: The x position of the mouse
+    :return: (int) The x position in the range of the log.
+    """
+    return max(NO_MOVE + 1, min(32767, int(x)))
+
+
+def replay(log, ticks=None, frame_writer=None, **kwargs):
+    """
+    Replay the log headlessly.
+    :param log: (InputLog) The log of the game
+    :param ticks: (int) Number of ticks to replay, all the ticks if it is None.
+    :param frame_writer: (FrameWriter) The store recording every frame of the replay, None not to record.
+    :param kwargs: The other parameters of the engine, the same as the recorded game.
+    :return: (BreakoutEngine) The engine in the state after the replayed ticks.
+    """
+    engine = create_engine(log, **kwargs)
+    if frame_writer is not None:
+        frame_writer.begin_game(engine, log.seed)
+    for _ in iter_replay(log, engine, ticks):
+        if frame_writer is not None:
+            frame_writer.record(engine)
+    if frame_writer is not None:
+        frame_writer.end_game()
+    return engine
+
+
+def create_engine(log, **kwargs):
+    """
+    Create the engine of the log in the state before the first tick.
+    :param log: (InputLog) The log of the game
+    :param kwargs: The other parameters of the engine, the same as the recorded game.
+                   The level is rebuilt from the log, a level given here must be the level of the log.
+    :return: (BreakoutEngine) The engine of the variant of the log, with the random generator and the level of the game.
+    """
+    level = kwargs.pop('level', log.level)
+    if _level_bytes(level) != _level_bytes(log.level):
+        raise ValueError('The level is not the level of the input log, the replay would be a different game.')
+    return ENGINES[log.variant](rng=random.Random(log.seed), level=log.level, **kwargs)
+
+
+def iter_replay(log, engine, ticks=None):
+    """
+    Replay the log on the engine tick by tick, so the engine can be read between the ticks.
+    :param log: (InputLog) The log of the game
+    :param engine: (BreakoutEngine) The engine created by create_engine, before the first tick.
+    :param ticks: (int) Number of ticks to replay, all the ticks if it is None.
+    :return: (generator) The number of each tick and the state returned by the tick, after the tick is played.
+    """
+    clicks = set(log.click_ticks)
+    mouse_x = log.mouse_x
+    for tick in range(len(mouse_x) if ticks is None else ticks):
+        x = mouse_x[tick]
+        if x != NO_MOVE:
+            engine.move_paddle(x)
+        if tick in clicks:
+            engine.handle_click()
+        yield tick, engine.tick()
+
+
+def _level_bytes(level):
+    """
+    :param level: (Level) A level in levels.py, None for the uniform bricks
+    :return: (bytes) The compiled level, None for the uniform bricks.
+    """
+    return None if level is None else level.to_bytes()
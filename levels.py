@@ -0,0 +1,245 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program loads the levels of the game from text files.
+A level is a grid of characters, one character per brick, and a legend giving the type,
+the color and the hit points of each character. For example:
+
+    # The name of the level
+    name: Two colors
+    # <character> = <type> <color> [<hit points>], the type is normal or red.
+    legend:
+    a = normal #f28179
+    b = normal #79d6f2 2
+    r = red red
+    # A '.' is a cell without brick, every row has the same number of cells.
+    bricks:
+    aaaaraaaaa
+    bb......bb
+
+Each level is compiled once into a binary file in CACHE_DIR, named by the hash of the text,
+so the next start reads the compiled cells directly, and an edited level is compiled again.
+A level pack is a directory of level files, a level is read only when it is played.
+
+The format of a compiled level is little endian:
+    magic (4 bytes) b'BKLV', version (uint8), rows (uint16), cols (uint16), colors (uint8),
+followed by the name and the colors, each a uint8 length and UTF-8 text,
+and the types, the color indices and the hit points of the cells, a byte per cell in row-major order.
+"""
+import hashlib
+import os
+import struct
+from brickgrid import EMPTY, NORMAL, RED
+
+MAGIC = b'BKLV'
+VERSION = 1
+HEADER = struct.Struct('<4sBHHB')
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'levels')
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__levelcache__')
+LEVEL_EXTENSION = '.txt'
+EMPTY_CELL = '.'
+TYPES = {'normal': NORMAL, 'red': RED}
+MAX_HIT_POINTS = 255
+MAX_COLORS = 255
+
+
+class Level:
+    """
+    This class keeps the cells of a level, a byte per cell for each of the type, the color and the hit points.
+    """
+    def __init__(self, name, rows, cols, colors, types, color_indices, hit_points):
+        """
+        :param name: (str) The name of the level
+        :param rows: Number of rows of bricks
+        :param cols: Number of columns of bricks
+        :param colors: (list) The colors used by the level
+        :param types: (bytes) The type of each cell, EMPTY if there is no brick
+        :param color_indices: (bytes) The index of the color of each cell in colors
+        :param hit_points: (bytes) The number of hits to break the brick of each cell
+        """
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.colors = colors
+        self.types = types
+        self.color_indices = color_indices
+        self.hit_points = hit_points
+
+    def get_color(self, index):
+        """
+        :param index: (int) The index of the cell, row * cols + col
+        :return: (str) The color of the brick of the cell.
+        """
+        return self.colors[self.color_indices[index]]
+
+    def to_bytes(self):
+        """
+        Compile the level.
+        :return: (bytes) The compiled level.
+        """
+        data = [HEADER.pack(MAGIC, VERSION, self.rows, self.cols, len(self.colors)), _pack_text(self.name)]
+        data.extend(_pack_text(color) for color in self.colors)
+        data.extend((self.types, self.color_indices, self.hit_points))
+        return b''.join(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Read a compiled level.
+        :param data: (bytes) The compiled level
+        :return: (Level) The level.
+        """
+        magic, version, rows, cols, num_colors = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Not a compiled level of breakout, or an unsupported version.')
+        offset = HEADER.size
+        name, offset = _unpack_text(data, offset)
+        colors = []
+        for _ in range(num_colors):
+            color, offset = _unpack_text(data, offset)
+            colors.append(color)
+        cells = rows * cols
+        if len(data) != offset + 3 * cells:
+            raise ValueError('The compiled level is truncated.')
+        types = data[offset:offset + cells]
+        color_indices = data[offset + cells:offset + 2 * cells]
+        hit_points = data[offset + 2 * cells:]
+        return cls(name, rows, cols, colors, types, color_indices, hit_points)
+
+
+def parse_level(text, name='Level'):
+    """
+    Parse the text of a level.
+    :param text: (str) The text of the level
+    :param name: (str) The name of the level if the text does not give one
+    :return: (Level) The level.
+    """
+    legend = {}
+    colors = []
+    rows = []
+    section = None
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('name:'):
+            name = line[len('name:'):].strip()
+        elif line == 'legend:' or line == 'bricks:':
+            section = line[:-1]
+        elif section == 'legend':
+            char, _, value = line.partition('=')
+            fields = value.split()
+            char = char.strip()
+            if len(char) != 1 or char == EMPTY_CELL or not 2 <= len(fields) <= 3 or fields[0] not in TYPES:
+                raise ValueError('Line %d: a legend is <character> = <type> <color> [<hit points>].' % line_number)
+            hit_points = int(fields[2]) if len(fields) == 3 else 1
+            if not 1 <= hit_points <= MAX_HIT_POINTS:
+                raise ValueError('Line %d: hit points must be from 1 to %d.' % (line_number, MAX_HIT_POINTS))
+            if fields[1] not in colors:
+                if len(colors) == MAX_COLORS:
+                    raise ValueError('Line %d: a level has at most %d colors.' % (line_number, MAX_COLORS))
+                colors.append(fields[1])
+            legend[char] = (TYPES[fields[0]], colors.index(fields[1]), hit_points)
+        elif section == 'bricks':
+            if rows and len(line) != len(rows[0]):
+                raise ValueError('Line %d: every row must have %d cells.' % (line_number, len(rows[0])))
+            for char in line:
+                if char != EMPTY_CELL and char not in legend:
+                    raise ValueError('Line %d: %r is not in the legend.' % (line_number, char))
+            rows.append(line)
+        else:
+            raise ValueError('Line %d: expected name:, legend: or bricks:.' % line_number)
+    if not rows:
+        raise ValueError('The level has no bricks.')
+
+    empty = (EMPTY, 0, 0)
+    cells = [legend.get(char, empty) for row in rows for char in row]
+    return Level(name, len(rows), len(rows[0]), colors, bytes(cell[0] for cell in cells),
+                 bytes(cell[1] for cell in cells), bytes(cell[2] for cell in cells))
+
+
+def load_level(path, cache_dir=CACHE_DIR):
+    """
+    Load a level file, the compiled level is used if the text did not change since it was compiled.
+    :param path: (str) The path of the level file
+    :param cache_dir: (str) The directory of the compiled levels, None to always parse the text.
+    :return: (Level) The level.
+    """
+    with open(path, 'rb') as f:
+        text = f.read()
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, hashlib.sha1(text).hexdigest() + '.bin')
+        try:
+            with open(cache_path, 'rb') as f:
+                return Level.from_bytes(f.read())
+        except (OSError, ValueError, struct.error):
+            # Not compiled yet, or the compiled file is broken, so the text is parsed again.
+            pass
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    level = parse_level(text.decode('utf-8'), name)
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first, so another game never reads a half-written level.
+        temp_path = '%s.%d.tmp' % (cache_path, os.getpid())
+        with open(temp_path, 'wb') as f:
+            f.write(level.to_bytes())
+        os.replace(temp_path, cache_path)
+    return level
+
+
+class LevelPack:
+    """
+    This class lists the levels in a directory, a level is loaded when it is played.
+    """
+    def __init__(self, path=LEVEL_DIR, cache_dir=CACHE_DIR):
+        """
+        :param path: (str) The directory of the level files, they are played in the order of their names.
+        :param cache_dir: (str) The directory of the compiled levels, None to always parse the text.
+        """
+        self.path = path
+        self.cache_dir = cache_dir
+        self.files = sorted(name for name in os.listdir(path) if name.endswith(LEVEL_EXTENSION))
+        self.__levels = {}
+
+    def __len__(self):
+        """
+        :return: (int) The number of levels.
+        """
+        return len(self.files)
+
+    def get_level(self, index):
+        """
+        :param index: (int) The index of the level in the pack
+        :return: (Level) The level, it is loaded on first use.
+        """
+        level = self.__levels.get(index)
+        if level is None:
+            level = load_level(os.path.join(self.path, self.files[index]), self.cache_dir)
+            self.__levels[index] = level
+        return level
+
+
+def _pack_text(text):
+    """
+    :param text: (str) The text, it is cut to 255 bytes in UTF-8
+    :return: (bytes) The length of the text and the text.
+    """
+    # The text is cut between two characters, a character cut in half would not be decoded.
+    data = text.encode('utf-8')[:255].decode('utf-8', 'ignore').encode('utf-8')
+    return bytes([len(data)]) + data
+
+
+def _unpack_text(data, offset):
+    """
+    :param data: (bytes) The compiled level
+    :param offset: (int) The position of the length of the text
+    :return: (tuple) The text, and the position after the text.
+    """
+    length = data[offset]
+    end = offset + 1 + length
+    return bytes(data[offset + 1:end]).decode('utf-8'), end
@@ -0,0 +1,338 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program provides a planner, which simulates many futures of the game before a decision,
+to aim the ball at the bricks, and the red bricks above all, for a higher score.
+The paddle only bounces the ball, so the decisions of the planner are where the paddle waits
+while the ball comes down: under the ball, or aside to let the ball pass a frame and bounce it a frame later,
+which sends the ball somewhere else. A decision is an offset of the paddle from where the autopilot puts it.
+
+The planner runs a beam search over the decisions, a decision per frame while the ball can reach the paddle.
+Each candidate of the beam is a fork of the game (BreakoutEngine.fork), which shares the bricks with the game
+until the ball hits a brick, so the candidates copy almost nothing. The candidates reaching the same ball
+and score are merged, and the best candidates are kept by the score of a rollout with the autopilot after them,
+less a penalty for each lost life. The beam grows deeper until the ball leaves the paddle or the time budget
+of the decision is spent, and the planner follows the best candidate while the game goes as it was simulated.
+The ball can fall into a loop which never reaches the last bricks, and the autopilot would follow it forever.
+The planner remembers the state of the ball at its decisions since the last removed brick,
+and when a state comes again, the first decision of the search leaves out the autopilot, to break the loop.
+
+The benchmark plays the same seeded games with the planner and with the autopilot:
+    python planner.py --games 5 --budget 0.05
+"""
+import argparse
+import time
+from autopilot import Autopilot, predict_crossing
+from breakoutengine import PLAYING, GAME_LOST, GAME_WON
+
+ACTIONS = (0, -0.5, 0.5, -1, 1)     # Offsets of the paddle from the autopilot (in paddle widths), 0 is preferred
+BEAM_WIDTH = 8                      # Number of candidates kept at each depth of the search
+MAX_DEPTH = 12                      # Maximum number of decisions in a row searched by the planner
+ROLLOUT_FRAMES = 150                # Frames played by the autopilot after a candidate to rank it
+TIME_BUDGET = 0.05                  # Time of the search for a decision (in seconds)
+LIFE_PENALTY = 100                  # The score a lost life is worth in the ranking of the candidates
+GAMES = 5                           # Games played by each pilot in the benchmark
+
+
+class Planner:
+    """
+    A policy for rollout.py and BreakoutGraphics, which searches the decisions scoring the most.
+    The planner plays the engine it is called with, and forks it to search, the game itself is not changed.
+    """
+    def __init__(self, actions=ACTIONS, beam_width=BEAM_WIDTH, max_depth=MAX_DEPTH, rollout_frames=ROLLOUT_FRAMES,
+                 budget=TIME_BUDGET, clock=time.perf_counter):
+        """
+        :param actions: The offsets of the paddle from the autopilot (in paddle widths), the first one wins a tie.
+        :param beam_width: (int) Number of candidates kept at each depth of the search
+        :param max_depth: (int) Maximum number of decisions in a row searched by the planner
+        :param rollout_frames: (int) Frames played by the autopilot after a candidate to rank it
+        :param budget: (float) Time of the search for a decision (in seconds)
+        :param clock: The function returning the current time (in seconds)
+        """
+        self.actions = actions
+        self.beam_width = beam_width
+        self.max_depth = max_depth
+        self.rollout_frames = rollout_frames
+        self.budget = budget
+        self.clock = clock
+        self.__autopilot = Autopilot()
+        # The decisions of the best candidate, with the state of the ball each of them was simulated from.
+        self.__plan = []
+        # The states of the ball at the decisions since the last removed brick, to find a loop of the ball.
+        self.__visited = set()
+        self.__visited_bricks = 0
+        self.loops = 0              # Number of loops of the ball broken by the planner
+
+        # The statistics of the searches
+        self.searches = 0
+        self.simulations = 0        # Number of candidates simulated, with their rollouts
+        self.frames = 0             # Number of frames simulated
+        self.search_time = 0        # Time spent searching (in seconds)
+
+    def __call__(self, engine):
+        """
+        :param engine: (BreakoutEngine) The game to play.
+        :return: (float) The x position of the mouse.
+        """
+        is_reachable = _is_paddle_reachable(engine)
+        key = _get_key(engine)
+        is_looping = is_reachable and self.__visit(engine, key)
+        if is_looping:
+            self.loops += 1
+            offset = self.plan(engine, is_looping=True)
+        elif self.__plan and self.__plan[0][0] == key:
+            offset = self.__plan.pop(0)[1]
+        elif is_reachable:
+            offset = self.plan(engine)
+        else:
+            self.__plan.clear()
+            return self.__autopilot(engine)
+        # The paddle is placed as in the simulation, so the game goes as it was simulated.
+        return predict_crossing(engine) + offset * engine.paddle.width
+
+    def reset(self):
+        """
+        Forget the plan and the crossing of the autopilot, e.g. after a snapshot is restored.
+        """
+        self.__plan.clear()
+        self.__autopilot.reset()
+        self.__visited.clear()
+
+    def plan(self, engine, is_looping=False):
+        """
+        Search the decisions from the current state of the game, and keep the best of them as the plan.
+        :param engine: (BreakoutEngine) The game to play, it is not changed.
+        :param is_looping: (Bool) True if the ball is in a loop, the first decision is not the first action then.
+        :return: (float) The offset of the paddle for the current frame (in paddle widths).
+        """
+        start = self.clock()
+        deadline = start + self.budget
+        base_score = _get_score(engine)
+        base_lives = engine.lives
+
+        # A candidate is the fork of the game, and the decisions leading to it from the current state.
+        beam = [(engine.fork(), [])]
+        ranked = []
+        best = None
+        first_actions = self.actions
+        if is_looping:
+            # The candidates often tie when the ball loops, so each loop starts from another action.
+            others = self.actions[1:]
+            turn = self.loops % len(others)
+            first_actions = others[turn:] + others[:turn]
+        for depth in range(self.max_depth):
+            children = self.__expand(beam, first_actions if depth == 0 else self.actions)
+            if children is None:
+                # No candidate can reach the paddle anymore, so the decisions are over.
+                break
+            beam = children
+            ranked = []
+            if len(beam) > self.beam_width:
+                ranked = self.__rank(beam, base_score, base_lives, deadline)
+                beam = ranked[:self.beam_width]
+                if ranked:
+                    best = ranked[0]
+                if self.clock() >= deadline:
+                    break
+        # The last candidates are ranked, unless they were ranked to keep the best of them.
+        if beam and not ranked:
+            ranked = self.__rank(beam, base_score, base_lives, deadline)
+            if ranked:
+                best = ranked[0]
+
+        self.searches += 1
+        self.search_time += self.clock() - start
+        if best is None or not best[1]:
+            # The search ran out of time before any rollout, or there was no decision to make.
+            self.__plan.clear()
+            return self.actions[0]
+        decisions = best[1]
+        self.__plan = decisions[1:]
+        return decisions[0][1]
+
+    def get_simulation_rate(self):
+        """
+        The number of candidates simulated per second of search, with their rollouts.
+        :return: (float) Simulations per second.
+        """
+        return self.simulations / self.search_time if self.search_time else 0
+
+    def get_frame_rate(self):
+        """
+        The number of frames simulated per second of search.
+        :return: (float) Frames per second.
+        """
+        return self.frames / self.search_time if self.search_time else 0
+
+    def __visit(self, engine, key):
+        """
+        Remember the state of the ball at a decision, the states are forgotten when a brick is removed.
+        :param engine: (BreakoutEngine) The game to play
+        :param key: (tuple) The state of the ball and the score, see _get_key.
+        :return: (Bool) True if the state was visited since the last removed brick, the ball is in a loop.
+        """
+        if engine.remove_bricks_count != self.__visited_bricks:
+            self.__visited.clear()
+            self.__visited_bricks = engine.remove_bricks_count
+        if key in self.__visited:
+            return True
+        self.__visited.add(key)
+        return False
+
+    def __expand(self, beam, actions):
+        """
+        Fork every candidate for each decision, and simulate the decision for a frame.
+        :param beam: (list) The candidates
+        :param actions: The offsets of the paddle tried by the candidates which can reach the paddle
+        :return: (list) The new candidates, the candidates reaching the same state are merged,
+                 None if no candidate can reach the paddle.
+        """
+        children = []
+        seen = set()
+        branched = False
+        for state, decisions in beam:
+            if _is_paddle_reachable(state):
+                branched = True
+                offsets = actions
+            else:
+                offsets = self.actions[:1]
+            for offset in offsets:
+                child = state.fork()
+                key = _get_key(child)
+                result = _play_frame(child, offset)
+                self.frames += 1
+                if result != PLAYING and result != GAME_WON:
+                    # A candidate losing a life is left out.
+                    continue
+                merged = _get_key(child)
+                if merged in seen:
+                    continue
+                seen.add(merged)
+                children.append((child, decisions + [(key, offset)]))
+        return children if branched else None
+
+    def __rank(self, candidates, base_score, base_lives, deadline):
+        """
+        Play a rollout with the autopilot after each candidate, and sort the candidates by their value.
+        :param candidates: (list) The candidates
+        :param base_score: (int) The score of the game when the search started
+        :param base_lives: (int) The lives of the game when the search started
+        :param deadline: (float) The candidates are not ranked after this time.
+        :return: (list) The candidates ranked, the best first, the candidates left after the deadline are dropped.
+        """
+        values = []
+        for index, (state, _) in enumerate(candidates):
+            if self.clock() >= deadline:
+                break
+            rollout = state.fork()
+            self.frames += _play_rollout(rollout, self.rollout_frames)
+            self.simulations += 1
+            value = _get_score(rollout) - base_score - LIFE_PENALTY * (base_lives - rollout.lives)
+            # The earlier candidate wins a tie, it prefers the first action.
+            values.append((value, -index))
+        ranks = sorted(range(len(values)), key=values.__getitem__, reverse=True)
+        return [candidates[index] for index in ranks]
+
+
+def _play_frame(engine, offset):
+    """
+    Play a frame of the game with the paddle at the offset from the autopilot, as rollout.play_game does.
+    :param engine: (BreakoutEngine) The game to play
+    :param offset: (float) The offset of the paddle (in paddle widths)
+    :return: (int) The state returned by tick.
+    """
+    engine.handle_click()
+    engine.move_paddle(predict_crossing(engine) + offset * engine.paddle.width)
+    return engine.tick()
+
+
+def _play_rollout(engine, frames):
+    """
+    Play the game with the autopilot for a number of frames, or until the game is over.
+    :param engine: (BreakoutEngine) The game to play
+    :param frames: (int) Maximum number of frames
+    :return: (int) Number of frames played.
+    """
+    autopilot = Autopilot()
+    for frame in range(frames):
+        engine.handle_click()
+        engine.move_paddle(autopilot(engine))
+        result = engine.tick()
+        if result == GAME_LOST or result == GAME_WON:
+            return frame + 1
+    return frames
+
+
+def _is_paddle_reachable(engine):
+    """
+    :param engine: (BreakoutEngine) The game
+    :return: (Bool) True if the ball comes down and can still touch the paddle in the next frame.
+    """
+    ball = engine.ball
+    paddle = engine.paddle
+    return (engine.is_ball_moving and engine.dy > 0 and ball.y + ball.height + engine.dy >= paddle.y
+            and ball.y <= paddle.y + paddle.height)
+
+
+def _get_key(engine):
+    """
+    :param engine: (BreakoutEngine) The game
+    :return: (tuple) The state of the ball and the score, the paddle is moved again before the next tick.
+    """
+    ball = engine.ball
+    return ball.x, ball.y, engine.dx, engine.dy, engine.remove_bricks_count, engine.lives
+
+
+def _get_score(engine):
+    """
+    :param engine: (BreakoutEngine) The game
+    :return: (int) The score of the extension version, or the removed bricks of the basic version.
+    """
+    return getattr(engine, 'score', engine.remove_bricks_count)
+
+
+def main():
+    """
+    Play the same seeded games with the planner and the autopilot,
+    and compare their scores and the simulations per second of the planner.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the planner against the autopilot.')
+    parser.add_argument('--games', type=int, default=GAMES, help='games played by each pilot')
+    parser.add_argument('--budget', type=float, default=TIME_BUDGET, help='time of the search for a decision')
+    parser.add_argument('--beam-width', type=int, default=BEAM_WIDTH, help='candidates kept at each depth')
+    parser.add_argument('--swept', action='store_true', help='use the swept collision')
+    args = parser.parse_args()
+    # The games are played by rollout.py, it is imported here so the game does not load it with the planner.
+    from rollout import play_game
+
+    for name in ('autopilot', 'planner'):
+        score = 0
+        frames = 0
+        lives_used = 0
+        won = 0
+        start = time.perf_counter()
+        planner = None
+        for seed in range(args.games):
+            if name == 'planner':
+                planner = Planner(beam_width=args.beam_width, budget=args.budget)
+                pilot = planner
+            else:
+                pilot = Autopilot()
+            result = play_game(seed, policy=pilot, swept=args.swept)
+            score += result['score']
+            frames += result['frames']
+            lives_used += result['lives_used']
+            won += result['won']
+        print('%-10s mean score %6.1f  %7.0f frames a game  %d/%d games won  %d lives lost  %.1f s' % (
+            name, score / args.games, frames / args.games, won, args.games, lives_used,
+            time.perf_counter() - start))
+        if planner is not None:
+            print('%-10s %d searches and %d loops broken in the last game, %.0f simulations/s, %.0f frames/s' % (
+                '', planner.searches, planner.loops, planner.get_simulation_rate(), planner.get_frame_rate()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program times the phases of the animation loop, to find which part of a frame is slow.
+The functions of the phases are wrapped only when the profiler is used, so the game costs nothing more without it.
+Each phase keeps its durations in a fixed-size histogram, and the summary shows p50, p95 and p99 of each phase.
+The calls can also be saved as a Chrome trace, which can be opened in chrome://tracing or Perfetto.
+"""
+import json
+import time
+from array import array
+
+BUCKETS_PER_OCTAVE = 8      # Buckets per power of two of the durations, so a bucket is at most 12.5% wide
+OCTAVES = 40                # The largest bucket starts at 2**40 ns, about 18 minutes
+MAX_TRACE_EVENTS = 1000000  # The trace keeps the first calls only, so its memory is capped
+
+
+class Histogram:
+    """
+    This class counts durations in log-linear buckets, its memory does not grow with the number of durations.
+    """
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * BUCKETS_PER_OCTAVE * (OCTAVES + 1)))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, ns):
+        """
+        Count a duration.
+        :param ns: (int) The duration (in nanoseconds)
+        """
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+        if ns < BUCKETS_PER_OCTAVE:
+            index = ns
+        else:
+            # The leading bit selects the octave, the next 3 bits select the bucket in the octave.
+            shift = ns.bit_length() - 4
+            index = (shift + 1) * BUCKETS_PER_OCTAVE + ((ns >> shift) & 7)
+        self.counts[min(index, len(self.counts) - 1)] += 1
+
+    def percentile(self, p):
+        """
+        :param p: The percentile, from 0 to 100
+        :return: (int) The upper bound of the bucket holding the percentile (in nanoseconds), 0 if it is empty.
+        """
+        if self.count == 0:
+            return 0
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if index < BUCKETS_PER_OCTAVE:
+                    return index
+                shift = index // BUCKETS_PER_OCTAVE - 1
+                return min(((index % BUCKETS_PER_OCTAVE + 9) << shift) - 1, self.max)
+        return self.max
+
+    def get_mean(self):
+        """
+        :return: (float) The mean duration (in nanoseconds).
+        """
+        return self.total / self.count if self.count else 0
+
+
+class PhaseProfiler:
+    """
+    This class wraps the functions of the phases, and times every call of them.
+    """
+    def __init__(self, trace=False, clock=time.perf_counter_ns):
+        """
+        :param trace: (Bool) True to keep every call for a Chrome trace.
+        :param clock: The function returning the current time (in nanoseconds)
+        """
+        self.clock = clock
+        self.histograms = {}
+        self.trace = trace
+        self.events = []
+        self.start = clock()
+
+    def wrap(self, phase, func):
+        """
+        Time the calls of the function as a phase.
+        :param phase: (str) The name of the phase
+        :param func: The function to time
+        :return: The function doing the same as func, and timing it.
+        """
+        histogram = self.histograms.setdefault(phase, Histogram())
+        clock = self.clock
+        events = self.events if self.trace else None
+
+        def timed(*args, **kwargs):
+            begin = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                ns = clock() - begin
+                histogram.add(ns)
+                if events is not None and len(events) < MAX_TRACE_EVENTS:
+                    events.append((phase, begin, ns))
+        return timed
+
+    def instrument(self, obj, name, phase=None):
+        """
+        Replace a method of the object with the timed one, only this object is affected.
+        :param obj: The object owning the method
+        :param name: (str) The name of the method
+        :param phase: (str) The name of the phase, the name of the method if it is None.
+        """
+        setattr(obj, name, self.wrap(phase or name, getattr(obj, name)))
+
+    def instrument_game(self, graphics, idle):
+        """
+        Time the phases of a game drawn by BreakoutGraphics.
+        The movement of the ball is the part of the tick outside handle_ball_hit_obj and move_objects.
+        :param graphics: (BreakoutGraphics) The game, basic or extension version.
+        :param idle: The function waiting between frames, it pumps the events of the window.
+        :return: (tuple) The timed tick, render and idle functions for GameLoop.
+        """
+        engine = graphics.engine
+        self.instrument(engine, 'tick')
+        self.instrument(engine, 'handle_ball_hit_obj')
+        # The block paddle is moved here in the extension version.
+        self.instrument(engine, '_move_objects', 'move_objects')
+        return self.wrap('step', graphics.step), self.wrap('draw', graphics.update), self.wrap('pause', idle)
+
+    def summary(self):
+        """
+        :return: (str) A line per phase, with the number of calls and the durations in microseconds.
+        """
+        lines = ['%-20s %9s %9s %9s %9s %9s %9s' % ('phase', 'calls', 'mean', 'p50', 'p95', 'p99', 'max')]
+        for phase, h in self.histograms.items():
+            lines.append('%-20s %9d %9.1f %9.1f %9.1f %9.1f %9.1f' % (
+                phase, h.count, h.get_mean() / 1000, h.percentile(50) / 1000, h.percentile(95) / 1000,
+                h.percentile(99) / 1000, h.max / 1000))
+        return '\n'.join(lines)
+
+    def save_trace(self, path):
+        """
+        Write the timed calls as a Chrome trace in JSON.
+        :param path: (str) The path of the file
+        """
+        trace_events = [{'name': phase, 'ph': 'X', 'ts': (begin - self.start) / 1000, 'dur': ns / 1000,
+                         'pid': 0, 'tid': 0} for phase, begin, ns in self.events]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f)
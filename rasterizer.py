@@ -0,0 +1,552 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program draws the state of an engine into a NumPy array of pixels without any window,
+for the agents learning from the pixels, or to export the games as videos.
+The bricks, the scoreboard and the hearts are drawn into a background once,
+and only the cells of the removed bricks, or the scoreboard and the hearts when they change, are drawn again.
+In each frame, the sprites (the paddle, the balls and the block paddle) are erased by copying the background
+into the boxes they leave, and drawn again in the boxes they enter, so a sprite which does not move costs nothing.
+The frame can be drawn in RGB or in grayscale, and downsampled by drawing the window a number of times smaller,
+each pixel of the frame takes the color at its center, so a downsampled frame costs less to draw.
+FrameStack keeps the last frames in a ring buffer, and gives them in order without copying.
+
+The benchmark draws a game played by the autopilot, and prints the frames drawn per second:
+    python rasterizer.py --gray --downsample 2 --stack 4
+"""
+import argparse
+import math
+import random
+import struct
+import time
+import zlib
+import numpy as np
+from assetcache import assets, HEART_IMAGE, HEART_REMOVED_IMAGE
+from breakoutengine import GAME_LOST, GAME_WON
+from breakoutengine_extension import BreakoutEngineExtension
+
+BACKGROUND = '#ffffff'       # Color of the window
+BASIC_COLOR = '#999999'      # Color of the ball and the paddle of the basic version
+EXTENSION_COLOR = '#000000'  # Color of the ball and the paddle of the extension version
+BLOCK_PADDLE_COLOR = 'green'
+LUMA = (77, 150, 29)         # Weights of red, green and blue in gray, they add up to 256
+HUD_SPACING = 10             # Space around the scoreboard and the hearts (in pixels), as in BreakoutGraphics
+FONT_SCALE = 3               # Size of a pixel of the font of the scoreboard (in pixels)
+DOWNSAMPLE = 1               # The window is drawn this number of times smaller in each direction
+STACK_FRAMES = 4             # Number of frames kept by FrameStack
+BENCHMARK_FRAMES = 20000     # Frames drawn by the benchmark
+
+NAMED_COLORS = {
+    'white': '#ffffff', 'black': '#000000', 'red': '#ff0000', 'green': '#00ff00', 'blue': '#0000ff',
+    'yellow': '#ffff00', 'gray': '#808080', 'grey': '#808080', 'orange': '#ffa500', 'purple': '#800080',
+}
+
+# The font of the scoreboard, 3 x 5 pixels per character.
+FONT = {
+    '0': ('111', '101', '101', '101', '111'), '1': ('010', '110', '010', '010', '111'),
+    '2': ('111', '001', '111', '100', '111'), '3': ('111', '001', '111', '001', '111'),
+    '4': ('101', '101', '111', '001', '001'), '5': ('111', '100', '111', '001', '111'),
+    '6': ('111', '100', '111', '101', '111'), '7': ('111', '001', '010', '010', '010'),
+    '8': ('111', '101', '111', '101', '111'), '9': ('111', '101', '111', '001', '111'),
+    'S': ('111', '100', '111', '001', '111'), 'C': ('111', '100', '100', '100', '111'),
+    'O': ('111', '101', '101', '101', '111'), 'R': ('110', '101', '110', '101', '101'),
+    'E': ('111', '100', '111', '100', '111'), ':': ('000', '010', '000', '010', '000'),
+    ' ': ('000', '000', '000', '000', '000'),
+}
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_CHUNK = struct.Struct('>I4s')
+PNG_HEADER = struct.Struct('>IIBBBBB')
+
+
+class Rasterizer:
+    """
+    This class draws the state of an engine into a preallocated array, only the changes of each frame are drawn.
+    """
+    def __init__(self, engine, gray=False, downsample=DOWNSAMPLE):
+        """
+        :param engine: (BreakoutEngine) The game to draw, any variant of the engine.
+        :param gray: (Bool) True to draw in grayscale, False in RGB.
+        :param downsample: (int) The window is drawn this number of times smaller in each direction.
+        """
+        self.gray = gray
+        self.downsample = downsample
+        self.scale = 1 / downsample
+        self.channels = 1 if gray else 3
+        self.engine = None
+        self.frame = None           # The pixels, height x width x channels
+        self.observation = None     # The pixels, height x width in grayscale, or the frame in RGB
+        self.changed_box = None     # The box (x0, y0, x1, y1) covering the last drawing, None if nothing was drawn
+        self.__background = None
+        self.__solids = {}
+        self.__colors = {}
+        self.reset(engine)
+
+    def reset(self, engine):
+        """
+        Follow a new game, the whole frame is drawn again. The arrays are reused if the window has the same size.
+        :param engine: (BreakoutEngine) The game to draw
+        """
+        self.engine = engine
+        scale = self.scale
+        shape = (int(engine.height * scale), int(engine.width * scale), self.channels)
+        if self.frame is None or self.frame.shape != shape:
+            self.frame = np.empty(shape, dtype=np.uint8)
+            self.__background = np.empty(shape, dtype=np.uint8)
+            self.__solids.clear()
+            self.observation = self.frame[:, :, 0] if self.gray else self.frame
+
+        is_extension = hasattr(engine, 'block_paddle')
+        self.__sprite_color = EXTENSION_COLOR if is_extension else BASIC_COLOR
+        self.__ball_masks = {}
+
+        # Draw the bricks into the background.
+        background = self.__background
+        background[:] = self.get_color(BACKGROUND)
+        grid = engine.brick_grid
+        for index, x, y, color in engine.get_brick_layout():
+            x0, y0, x1, y1 = _get_box(x, y, grid.brick_width, grid.brick_height, scale)
+            background[y0:y1, x0:x1] = self.get_color(color)
+        self.__types = bytearray(grid.types)
+
+        # The scoreboard and the hearts of the extension version.
+        self.__score = None
+        self.__score_box = None
+        self.__lives = None
+        self.__hearts = []
+        if is_extension:
+            solid = self.__get_image(HEART_IMAGE)
+            hollow = self.__get_image(HEART_REMOVED_IMAGE)
+            height, width = read_png_size(assets.resolve(HEART_IMAGE))
+            # A heart for every life of the game, the lives lost before a restore are drawn as hollow hearts.
+            for i in range(engine.initial_lives):
+                x = engine.width - (HUD_SPACING + width) * (i + 1)
+                y = engine.height - (HUD_SPACING + height)
+                self.__hearts.append((_get_box(x, y, width, height, scale), solid, hollow))
+            self.__draw_hud()
+
+        self.frame[:] = background
+        self.__sprites = self.__get_sprites()
+        self.changed_box = (0, 0, shape[1], shape[0])
+        self.__draw_box(self.changed_box)
+
+    def draw(self):
+        """
+        Draw the current state of the engine, only the boxes changed since the last drawing are drawn.
+        :return: (numpy.ndarray) The observation, it is the same array in every frame.
+        """
+        engine = self.engine
+        boxes = []
+        types = engine.brick_grid.types
+        if types != self.__types:
+            boxes.extend(self.__draw_bricks(types))
+        if self.__hearts and (engine.score != self.__score or engine.lives != self.__lives):
+            boxes.extend(self.__draw_hud())
+
+        sprites = self.__get_sprites()
+        last_sprites = self.__sprites
+        if sprites != last_sprites:
+            if len(sprites) == len(last_sprites):
+                # A sprite moving a little is drawn again in a box covering where it leaves and where it enters.
+                for last, sprite in zip(last_sprites, sprites):
+                    if last != sprite:
+                        boxes.extend(_cover(last[0], sprite[0]))
+            else:
+                # A ball is split or lost, or the block paddle joins the game.
+                boxes.extend(sprite[0] for sprite in set(last_sprites) ^ set(sprites))
+            self.__sprites = sprites
+
+        height, width = self.frame.shape[:2]
+        changed_box = None
+        for x0, y0, x1, y1 in boxes:
+            # Clip the box to the frame, a sprite can be partly out of the window.
+            if x0 < 0:
+                x0 = 0
+            if y0 < 0:
+                y0 = 0
+            if x1 > width:
+                x1 = width
+            if y1 > height:
+                y1 = height
+            if x0 < x1 and y0 < y1:
+                box = (x0, y0, x1, y1)
+                self.__draw_box(box)
+                changed_box = box if changed_box is None else _unite(changed_box, box)
+        self.changed_box = changed_box
+        return self.observation
+
+    def get_color(self, color):
+        """
+        Get the pixel value of a color.
+        :param color: (str) A color of campy, '#rrggbb' or a name in NAMED_COLORS
+        :return: (numpy.ndarray) The value of a pixel, RGB or gray.
+        """
+        value = self.__colors.get(color)
+        if value is None:
+            hex_color = NAMED_COLORS.get(color.lower(), color)
+            if len(hex_color) != 7 or hex_color[0] != '#':
+                raise ValueError('Unknown color: %s' % color)
+            rgb = [int(hex_color[i:i + 2], 16) for i in (1, 3, 5)]
+            if self.gray:
+                rgb = [sum(c * w for c, w in zip(rgb, LUMA)) >> 8]
+            value = np.array(rgb, dtype=np.uint8)
+            self.__colors[color] = value
+        return value
+
+    def __get_sprites(self):
+        """
+        Get the boxes of the sprites in the order they are drawn, as the windows of BreakoutGraphics stack them.
+        :return: (list) A (box, color, is_ball) tuple per sprite, the box is (x0, y0, x1, y1) in pixels.
+        """
+        engine = self.engine
+        scale = self.scale
+        color = self.__sprite_color
+        paddle = engine.paddle
+        sprites = [(_get_box(paddle.x, paddle.y, paddle.width, paddle.height, scale), color, False)]
+        for ball in engine.balls:
+            sprites.append((_get_box(ball.x, ball.y, ball.width, ball.height, scale), color, True))
+        if getattr(engine, 'is_block_paddle_active', False):
+            block_paddle = engine.block_paddle
+            sprites.append((_get_box(block_paddle.x, block_paddle.y, block_paddle.width, block_paddle.height, scale),
+                            BLOCK_PADDLE_COLOR, False))
+        return sprites
+
+    def __draw_box(self, box):
+        """
+        Erase the box with the background, and draw the parts of the sprites inside the box.
+        :param box: The box (x0, y0, x1, y1), it is inside the frame.
+        """
+        x0, y0, x1, y1 = box
+        frame = self.frame
+        frame[y0:y1, x0:x1] = self.__background[y0:y1, x0:x1]
+        for (sx0, sy0, sx1, sy1), color, is_ball in self.__sprites:
+            ix0 = x0 if x0 > sx0 else sx0
+            iy0 = y0 if y0 > sy0 else sy0
+            ix1 = x1 if x1 < sx1 else sx1
+            iy1 = y1 if y1 < sy1 else sy1
+            if ix0 >= ix1 or iy0 >= iy1:
+                continue
+            # Copying from a frame filled with the color is faster than filling with the color.
+            solid = self.__get_solid(color)
+            if is_ball:
+                mask = self.__get_ball_mask(sx1 - sx0, sy1 - sy0)
+                np.copyto(frame[iy0:iy1, ix0:ix1], solid[iy0:iy1, ix0:ix1],
+                          where=mask[iy0 - sy0:iy1 - sy0, ix0 - sx0:ix1 - sx0])
+            else:
+                frame[iy0:iy1, ix0:ix1] = solid[iy0:iy1, ix0:ix1]
+
+    def __draw_bricks(self, types):
+        """
+        Draw the cells changed since the last drawing into the background.
+        :param types: (bytearray) The types of the cells of the engine
+        :return: (list) The boxes of the changed cells.
+        """
+        engine = self.engine
+        grid = engine.brick_grid
+        changed = np.flatnonzero(np.frombuffer(types, dtype=np.uint8) != np.frombuffer(self.__types, dtype=np.uint8))
+        boxes = []
+        for index in changed.tolist():
+            box = _get_box(grid.get_x(index), grid.get_y(index), grid.brick_width, grid.brick_height, self.scale)
+            brick = engine.get_brick(index)
+            x0, y0, x1, y1 = box
+            self.__background[y0:y1, x0:x1] = self.get_color(BACKGROUND if brick is None else brick.color)
+            boxes.append(box)
+        self.__types[:] = types
+        return boxes
+
+    def __draw_hud(self):
+        """
+        Draw the scoreboard and the hearts into the background, the score is written as 'SCORE: <score>'.
+        :return: (list) The boxes of the scoreboard and the hearts.
+        """
+        engine = self.engine
+        background = self.__background
+        scale = self.scale
+        boxes = []
+        if engine.score != self.__score:
+            self.__score = engine.score
+            if self.__score_box is not None:
+                # Erase the last score, it may be longer than the new one.
+                x0, y0, x1, y1 = self.__score_box
+                background[y0:y1, x0:x1] = self.get_color(BACKGROUND)
+                boxes.append(self.__score_box)
+            text = 'SCORE: %d' % engine.score
+            color = self.get_color(EXTENSION_COLOR)
+            x = HUD_SPACING
+            y = engine.height - HUD_SPACING - 5 * FONT_SCALE
+            for char in text:
+                for row, bits in enumerate(FONT.get(char, FONT[' '])):
+                    for col, bit in enumerate(bits):
+                        if bit == '1':
+                            x0, y0, x1, y1 = _get_box(x + col * FONT_SCALE, y + row * FONT_SCALE,
+                                                      FONT_SCALE, FONT_SCALE, scale)
+                            background[y0:y1, x0:x1] = color
+                x += 4 * FONT_SCALE
+            self.__score_box = _get_box(HUD_SPACING, y, x - HUD_SPACING, 5 * FONT_SCALE, scale)
+            boxes.append(self.__score_box)
+        if engine.lives != self.__lives:
+            self.__lives = engine.lives
+            for i, (box, solid, hollow) in enumerate(self.__hearts):
+                x0, y0, x1, y1 = box
+                image = solid if i < engine.lives else hollow
+                background[y0:y1, x0:x1] = image[:y1 - y0, :x1 - x0]
+                boxes.append(box)
+        return boxes
+
+    def __get_solid(self, color):
+        """
+        Get a frame filled with the color, it is created on first use.
+        :param color: (str) The color
+        :return: (numpy.ndarray) The frame.
+        """
+        solid = self.__solids.get(color)
+        if solid is None:
+            solid = np.empty_like(self.frame)
+            solid[:] = self.get_color(color)
+            self.__solids[color] = solid
+        return solid
+
+    def __get_ball_mask(self, width, height):
+        """
+        Get the pixels covered by an oval, the pixels whose centers are inside the oval.
+        :param width: (int) Width of the box of the oval
+        :param height: (int) Height of the box of the oval
+        :return: (numpy.ndarray) The mask, height x width x 1.
+        """
+        mask = self.__ball_masks.get((width, height))
+        if mask is None:
+            y, x = np.ogrid[:height, :width]
+            mask = ((x + 0.5 - width / 2) / (width / 2)) ** 2 + ((y + 0.5 - height / 2) / (height / 2)) ** 2 <= 1
+            mask = mask[:, :, np.newaxis]
+            self.__ball_masks[(width, height)] = mask
+        return mask
+
+    def __get_image(self, path):
+        """
+        Read a PNG image, the transparent pixels are blended with the background.
+        The image is downsampled as the frame, each pixel takes the color at its center.
+        :param path: (str) The path of the image, resolved as the asset cache does.
+        :return: (numpy.ndarray) The pixels of the image, height x width x channels.
+        """
+        rgba = read_png(assets.resolve(path)).astype(np.uint32)
+        k = self.downsample
+        rgba = rgba[k // 2::k, k // 2::k]
+        alpha = rgba[:, :, 3:]
+        background = self.get_color(BACKGROUND).astype(np.uint32)
+        if self.gray:
+            rgb = (rgba[:, :, :3] * np.array(LUMA, dtype=np.uint32)).sum(axis=2, keepdims=True) >> 8
+        else:
+            rgb = rgba[:, :, :3]
+        return ((rgb * alpha + background * (255 - alpha)) // 255).astype(np.uint8)
+
+
+class FrameStack:
+    """
+    This class keeps the last observations of a rasterizer, the oldest first.
+    Each observation is written twice in a ring of 2 * frames slots,
+    so the last frames are always a contiguous slice of the ring, and no frame is copied to stack them.
+    """
+    def __init__(self, rasterizer, frames=STACK_FRAMES):
+        """
+        :param rasterizer: (Rasterizer) The rasterizer drawing the observations
+        :param frames: (int) Number of frames kept
+        """
+        self.rasterizer = rasterizer
+        self.frames = frames
+        self.__ring = np.empty((2 * frames,) + rasterizer.observation.shape, dtype=np.uint8)
+        self.__next = 0
+        self.reset()
+
+    def reset(self):
+        """
+        Fill the stack with the current observation, e.g. when a new game starts.
+        :return: (numpy.ndarray) The stacked frames, frames x height x width (x channels).
+        """
+        observation = self.rasterizer.observation
+        if self.__ring.shape[1:] != observation.shape:
+            self.__ring = np.empty((2 * self.frames,) + observation.shape, dtype=np.uint8)
+        self.__ring[:] = observation
+        self.__next = 0
+        return self.__ring[self.frames:]
+
+    def push(self):
+        """
+        Add the current observation of the rasterizer, the oldest frame is dropped.
+        :return: (numpy.ndarray) The stacked frames, a view which is valid until the next push.
+        """
+        ring = self.__ring
+        frames = self.frames
+        slot = self.__next
+        observation = self.rasterizer.observation
+        ring[slot] = observation
+        ring[slot + frames] = observation
+        self.__next = (slot + 1) % frames
+        return ring[slot + 1:slot + 1 + frames]
+
+
+def read_png(path):
+    """
+    Decode a PNG file of 8-bit RGB or RGBA pixels, which is not interlaced, as the images of the game.
+    :param path: (str) The path of the image
+    :return: (numpy.ndarray) The pixels, height x width x 4 (RGBA).
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:8] != PNG_SIGNATURE:
+        raise ValueError('Not a PNG file: %s' % path)
+    offset = 8
+    header = None
+    compressed = []
+    while offset < len(data):
+        length, kind = PNG_CHUNK.unpack_from(data, offset)
+        body = data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+        if kind == b'IHDR':
+            header = PNG_HEADER.unpack(body)
+        elif kind == b'IDAT':
+            compressed.append(body)
+        elif kind == b'IEND':
+            break
+    width, height, depth, color_type, _, _, interlace = header
+    if depth != 8 or color_type not in (2, 6) or interlace:
+        raise ValueError('Only 8-bit RGB or RGBA PNG files which are not interlaced are supported: %s' % path)
+    channels = 4 if color_type == 6 else 3
+    raw = zlib.decompress(b''.join(compressed))
+
+    # Undo the filter of each row, the filters predict a byte from the bytes on its left and above.
+    stride = width * channels
+    pixels = bytearray(height * stride)
+    previous = bytearray(stride)
+    for row in range(height):
+        start = row * (stride + 1)
+        kind = raw[start]
+        line = bytearray(raw[start + 1:start + 1 + stride])
+        for i in range(stride):
+            left = line[i - channels] if i >= channels else 0
+            up = previous[i]
+            if kind == 1:
+                line[i] = (line[i] + left) & 0xff
+            elif kind == 2:
+                line[i] = (line[i] + up) & 0xff
+            elif kind == 3:
+                line[i] = (line[i] + (left + up) // 2) & 0xff
+            elif kind == 4:
+                up_left = previous[i - channels] if i >= channels else 0
+                line[i] = (line[i] + _paeth(left, up, up_left)) & 0xff
+        pixels[row * stride:(row + 1) * stride] = line
+        previous = line
+
+    image = np.frombuffer(bytes(pixels), dtype=np.uint8).reshape(height, width, channels)
+    if channels == 3:
+        image = np.concatenate([image, np.full((height, width, 1), 255, dtype=np.uint8)], axis=2)
+    return image
+
+
+def _paeth(left, up, up_left):
+    """
+    :return: The neighbour closest to left + up - up_left, the Paeth predictor of PNG.
+    """
+    estimate = left + up - up_left
+    distance_left = abs(estimate - left)
+    distance_up = abs(estimate - up)
+    distance_up_left = abs(estimate - up_left)
+    if distance_left <= distance_up and distance_left <= distance_up_left:
+        return left
+    if distance_up <= distance_up_left:
+        return up
+    return up_left
+
+
+def read_png_size(path):
+    """
+    :param path: (str) The path of a PNG image
+    :return: (tuple) The height and the width of the image.
+    """
+    with open(path, 'rb') as f:
+        data = f.read(8 + PNG_CHUNK.size + PNG_HEADER.size)
+    width, height = PNG_HEADER.unpack_from(data, 8 + PNG_CHUNK.size)[:2]
+    return height, width
+
+
+def _get_box(x, y, width, height, scale):
+    """
+    Get the pixels covered by a rectangle, the pixels whose centers are inside the rectangle.
+    :param x: The x position of the rectangle
+    :param y: The y position of the rectangle
+    :param width: Width of the rectangle
+    :param height: Height of the rectangle
+    :param scale: The size of a pixel of the window in the frame
+    :return: (tuple) The box (x0, y0, x1, y1) in the pixels of the frame, not clipped to the frame.
+    """
+    x0 = math.floor(x * scale + 0.5)
+    y0 = math.floor(y * scale + 0.5)
+    return x0, y0, math.floor((x + width) * scale + 0.5), math.floor((y + height) * scale + 0.5)
+
+
+def _cover(box, other):
+    """
+    :param box: The box (x0, y0, x1, y1)
+    :param other: Another box
+    :return: (tuple) A box covering both boxes if they overlap, or both boxes if they do not.
+    """
+    if box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]:
+        return _unite(box, other),
+    return box, other
+
+
+def _unite(box, other):
+    """
+    :param box: The box (x0, y0, x1, y1)
+    :param other: Another box
+    :return: (tuple) The smallest box covering both boxes.
+    """
+    return min(box[0], other[0]), min(box[1], other[1]), max(box[2], other[2]), max(box[3], other[3])
+
+
+def main():
+    """
+    Play a game with the autopilot, and measure the time of drawing each frame, without the time of the game.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the rasterizer.')
+    parser.add_argument('--gray', action='store_true', help='draw in grayscale')
+    parser.add_argument('--downsample', type=int, default=DOWNSAMPLE, help='draw the window this times smaller')
+    parser.add_argument('--stack', type=int, default=0, help='number of frames stacked, 0 not to stack')
+    parser.add_argument('--frames', type=int, default=BENCHMARK_FRAMES, help='number of frames drawn')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the games')
+    args = parser.parse_args()
+    # The autopilot only plays the benchmark, so drawing the frames does not load it.
+    from autopilot import Autopilot
+
+    seed = args.seed
+    engine = BreakoutEngineExtension(rng=random.Random(seed))
+    rasterizer = Rasterizer(engine, gray=args.gray, downsample=args.downsample)
+    frame_stack = FrameStack(rasterizer, args.stack) if args.stack else None
+    autopilot = Autopilot()
+    elapsed = 0
+    for _ in range(args.frames):
+        engine.handle_click()
+        engine.move_paddle(autopilot(engine))
+        state = engine.tick()
+        engine.removed_bricks.clear()
+        start = time.perf_counter()
+        rasterizer.draw()
+        if frame_stack is not None:
+            frame_stack.push()
+        elapsed += time.perf_counter() - start
+        if state == GAME_LOST or state == GAME_WON:
+            seed += 1
+            engine = BreakoutEngineExtension(rng=random.Random(seed))
+            rasterizer.reset(engine)
+            autopilot.reset()
+            if frame_stack is not None:
+                frame_stack.reset()
+    print('%s %s, %d frames drawn, %.0f frames/s' % (
+        'x'.join(str(n) for n in rasterizer.observation.shape), 'gray' if args.gray else 'RGB',
+        args.frames, args.frames / elapsed))
+
+
+if __name__ == '__main__':
+    main()
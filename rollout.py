@@ -0,0 +1,137 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program plays seeded games of breakout headlessly in a pool of worker processes.
+A policy is a function, which gets the engine and returns the x position of the mouse.
+It must be defined at the top level of a module, so it can be sent to the workers.
+The results are streamed back as the games finish.
+"""
+import argparse
+import functools
+import multiprocessing
+import random
+from breakoutengine import NUM_LIVES, GAME_LOST, GAME_WON, BRICK_ROWS, BRICK_COLS
+from breakoutengine_extension import BreakoutEngineExtension
+
+MAX_FRAMES = 100000     # A game is stopped after this number of frames, in case the ball never hits a brick again
+CHUNK_SIZE = 16         # Number of games sent to a worker at a time
+
+
+def follow_ball(engine):
+    """
+    A policy which keeps the center of the paddle under the center of the ball.
+    :param engine: (BreakoutEngine) The game to play.
+    :return: (float) The x position of the mouse.
+    """
+    return engine.ball.x + engine.ball.width / 2
+
+
+def play_game(seed, policy=follow_ball, engine_class=BreakoutEngineExtension, max_frames=MAX_FRAMES,
+              lives=NUM_LIVES, frame_writer=None, **kwargs):
+    """
+    Play a game until it is over, the ball is served as soon as it waits for a click.
+    :param seed: The seed of the random generator of the game
+    :param policy: The function getting the engine, and returning the x position of the mouse.
+    :param engine_class: The class of the engine
+    :param max_frames: (int) The game is stopped after this number of frames.
+    :param lives: (int) Number of attempts
+    :param frame_writer: (FrameWriter) The store recording every frame of the game, None not to record.
+    :param kwargs: The other parameters of the engine
+    :return: (dict) The result of the game.
+    """
+    engine = engine_class(rng=random.Random(seed), lives=lives, **kwargs)
+    if frame_writer is not None:
+        frame_writer.begin_game(engine, seed)
+    state = None
+    frames = 0
+    while frames < max_frames:
+        engine.handle_click()
+        engine.move_paddle(policy(engine))
+        state = engine.tick()
+        frames += 1
+        if frame_writer is not None:
+            frame_writer.record(engine)
+        if state == GAME_LOST or state == GAME_WON:
+            break
+    engine.removed_bricks.clear()
+    if frame_writer is not None:
+        frame_writer.end_game()
+
+    return {
+        'seed': seed,
+        'score': getattr(engine, 'score', engine.remove_bricks_count),
+        'removed_bricks': engine.remove_bricks_count,
+        'lives_used': lives - engine.lives,
+        'frames': frames,
+        'won': state == GAME_WON,
+    }
+
+
+def run_games(seeds, policy=follow_ball, workers=None, chunk_size=CHUNK_SIZE, **kwargs):
+    """
+    Play the seeded games in a pool of worker processes.
+    :param seeds: The seeds of the games, one game per seed.
+    :param policy: The function getting the engine, and returning the x position of the mouse.
+    :param workers: (int) Number of worker processes, the number of CPUs if it is None.
+    :param chunk_size: (int) Number of games sent to a worker at a time.
+    :param kwargs: The other parameters of play_game
+    :return: (generator) The results of the games, in the order they finish.
+    """
+    play = functools.partial(play_game, policy=policy, **kwargs)
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap_unordered(play, seeds, chunk_size)
+
+
+def run_tournament(policies, seeds, workers=None, chunk_size=CHUNK_SIZE, **kwargs):
+    """
+    Let every policy play the same seeded games, and sum up their results.
+    :param policies: (dict) The policies, by their names.
+    :param seeds: The seeds of the games played by every policy.
+    :param workers: (int) Number of worker processes, the number of CPUs if it is None.
+    :param chunk_size: (int) Number of games sent to a worker at a time.
+    :param kwargs: The other parameters of play_game
+    :return: (dict) The summary of each policy, by their names.
+    """
+    seeds = list(seeds)
+    summary = {}
+    for name, policy in policies.items():
+        total = {'games': 0, 'score': 0, 'removed_bricks': 0, 'lives_used': 0, 'frames': 0, 'won': 0}
+        for result in run_games(seeds, policy, workers, chunk_size, **kwargs):
+            total['games'] += 1
+            for key in ('score', 'removed_bricks', 'lives_used', 'frames', 'won'):
+                total[key] += result[key]
+        total['mean_score'] = total['score'] / total['games'] if total['games'] else 0
+        summary[name] = total
+    return summary
+
+
+def main():
+    """
+    Play seeded games with the follow_ball policy, and print each result as it finishes.
+    """
+    parser = argparse.ArgumentParser(description='Play seeded games of breakout headlessly.')
+    parser.add_argument('--games', type=int, default=100, help='number of games')
+    parser.add_argument('--first-seed', type=int, default=0, help='seed of the first game')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='games sent to a worker at a time')
+    parser.add_argument('--frames', default=None,
+                        help='directory of a frame store recording every frame, the games are played in this process')
+    args = parser.parse_args()
+
+    seeds = range(args.first_seed, args.first_seed + args.games)
+    if args.frames is not None:
+        # A store is written by one process, so the games are not sent to the workers.
+        from framestore import FrameWriter
+        with FrameWriter(args.frames, BRICK_ROWS, BRICK_COLS) as writer:
+            for seed in seeds:
+                print(play_game(seed, frame_writer=writer))
+        return
+    for result in run_games(seeds, workers=args.workers, chunk_size=args.chunk_size):
+        print(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,402 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program streams a live game to spectators over TCP or a Unix socket.
+The server publishes the state of the engine after every tick, in the asyncio event loop of asyncloop.py.
+A spectator gets a keyframe with the whole state when it joins and every KEYFRAME_INTERVAL ticks,
+and in between a delta with only what changed: the balls, the paddle, the block paddle, the score,
+the lives and the indices of the removed bricks. A tick where nothing moved sends nothing.
+A spectator which reads too slowly is never waited for: while its socket buffer is full, the ticks are
+coalesced, its removed bricks are kept, and it gets one delta to the current state when the buffer drains.
+
+The messages are little endian, each is a uint32 length followed by the body:
+    type (uint8), tick (uint32), flags (uint8), and the changed fields in the order of the flags:
+    BALLS: count (uint16) and x, y (float32) of each ball, PADDLE: x (float32), PADDLE_WIDTH: width (float32),
+    BLOCK_PADDLE: x, y (float32, NaN when it is not in the game), SCORE: uint32, LIVES: uint8,
+    BRICKS: count (uint32) and the index of each removed brick (uint32).
+A keyframe has every flag but BRICKS, followed by the paddle y (float32), the rows and columns (uint16),
+and the type of every cell of the brick grid compressed by zlib, with its length (uint32) first.
+"""
+import asyncio
+import math
+import struct
+import zlib
+
+HOST = '127.0.0.1'
+PORT = 8765
+KEYFRAME_INTERVAL = 100     # Ticks between two keyframes, a keyframe per second at 100 ticks per second
+MAX_BUFFER = 4096           # Bytes waiting in the socket of a spectator before its ticks are coalesced
+MAX_COALESCED_BRICKS = 1024 # Removed bricks kept for a slow spectator, it gets a keyframe instead after that
+
+KEYFRAME = 0
+DELTA = 1
+
+# The flags of the changed fields
+BALLS = 1
+PADDLE = 2
+PADDLE_WIDTH = 4
+BLOCK_PADDLE = 8
+SCORE = 16
+LIVES = 32
+BRICKS = 64
+ALL_FIELDS = BALLS | PADDLE | PADDLE_WIDTH | BLOCK_PADDLE | SCORE | LIVES
+
+LENGTH = struct.Struct('<I')
+HEADER = struct.Struct('<BIB')
+GRID = struct.Struct('<fHHI')
+FLOAT = struct.Struct('<f')
+FLOAT_PAIR = struct.Struct('<ff')
+COUNT = struct.Struct('<H')
+SCORE_FIELD = struct.Struct('<I')
+LIVES_FIELD = struct.Struct('<B')
+INDEX_COUNT = struct.Struct('<I')
+NO_BLOCK_PADDLE = (math.nan, math.nan)
+
+
+class SpectatorServer:
+    """
+    This class publishes the state of an engine to the connected spectators.
+    """
+    def __init__(self, engine, keyframe_interval=KEYFRAME_INTERVAL, max_buffer=MAX_BUFFER):
+        """
+        :param engine: (BreakoutEngine) The game to stream, basic, extension or multi-ball version.
+        :param keyframe_interval: (int) Ticks between two keyframes
+        :param max_buffer: (int) Bytes waiting in the socket of a spectator before its ticks are coalesced
+        """
+        self.engine = engine
+        self.keyframe_interval = keyframe_interval
+        self.max_buffer = max_buffer
+        self.spectators = []
+        self.ticks = 0
+        self.address = None
+
+        # The bricks the spectators know, to find the removed ones.
+        self.__types = bytearray(engine.brick_grid.types)
+        self.__remove_bricks_count = engine.remove_bricks_count
+        self.__state = self.__get_state()
+
+        # The counters of the stream
+        self.bytes_sent = 0
+        self.messages_sent = 0
+        self.coalesced_ticks = 0
+
+    def publishing(self, tick):
+        """
+        :param tick: The function advancing the game by one tick
+        :return: The function advancing the game by one tick, and publishing the new state.
+        """
+        def tick_and_publish():
+            state = tick()
+            self.publish()
+            return state
+        return tick_and_publish
+
+    def publish(self):
+        """
+        Send the state of the engine after a tick to the spectators.
+        It must be called after every tick, before the renderer clears the removed bricks of the engine.
+        """
+        self.ticks += 1
+        removed = self.__get_removed_bricks()
+        previous = self.__state
+        state = self.__state = self.__get_state()
+        if not self.spectators:
+            return
+        if self.ticks % self.keyframe_interval == 0:
+            for spectator in self.spectators:
+                spectator.needs_keyframe = True
+
+        keyframe = None
+        delta = None
+        for spectator in list(self.spectators):
+            if spectator.writer.is_closing():
+                self.spectators.remove(spectator)
+                continue
+            if not spectator.needs_keyframe:
+                if len(spectator.removed) + len(removed) > MAX_COALESCED_BRICKS:
+                    spectator.needs_keyframe = True
+                    spectator.removed.clear()
+                else:
+                    spectator.removed.extend(removed)
+            if spectator.writer.transport.get_write_buffer_size() > self.max_buffer:
+                self.coalesced_ticks += 1
+                continue
+
+            if spectator.needs_keyframe:
+                if keyframe is None:
+                    keyframe = self.__encode_keyframe(state)
+                message = keyframe
+                spectator.needs_keyframe = False
+            elif spectator.state is previous and len(spectator.removed) == len(removed):
+                # The spectator got every tick so far, so it gets the same delta as the others.
+                if delta is None:
+                    delta = _encode_delta(self.ticks, previous, state, removed)
+                message = delta
+            else:
+                message = _encode_delta(self.ticks, spectator.state, state, spectator.removed)
+            spectator.state = state
+            spectator.removed.clear()
+            if message is not None:
+                spectator.writer.write(message)
+                self.bytes_sent += len(message)
+                self.messages_sent += 1
+
+    async def serve(self, host=HOST, port=PORT, path=None):
+        """
+        Accept spectators until the task is cancelled, run it alongside the game with AsyncGameLoop.run_async.
+        :param host: (str) The address to listen on
+        :param port: (int) The port to listen on, 0 to let the system choose one
+        :param path: (str) The path of a Unix socket to listen on instead of TCP, None to use TCP.
+        """
+        if path is not None:
+            server = await asyncio.start_unix_server(self.__accept, path)
+        else:
+            server = await asyncio.start_server(self.__accept, host, port)
+        self.address = server.sockets[0].getsockname()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for spectator in self.spectators:
+                spectator.writer.close()
+            self.spectators.clear()
+
+    async def __accept(self, reader, writer):
+        """
+        Add a spectator, it gets a keyframe on the next tick, and it is removed when it disconnects.
+        """
+        spectator = _Spectator(writer)
+        self.spectators.append(spectator)
+        try:
+            # The spectators send nothing, so reading only waits for the end of the connection.
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            if spectator in self.spectators:
+                self.spectators.remove(spectator)
+            writer.close()
+
+    def __get_removed_bricks(self):
+        """
+        Find the bricks removed since the last tick.
+        :return: (list) The indices of the removed bricks.
+        """
+        engine = self.engine
+        count = engine.remove_bricks_count - self.__remove_bricks_count
+        if count == 0:
+            return []
+        self.__remove_bricks_count = engine.remove_bricks_count
+        types = self.__types
+        if count < 0:
+            # A snapshot was restored, and the bricks removed since then came back.
+            # A delta can only remove bricks, so every spectator gets a keyframe instead.
+            types[:] = engine.brick_grid.types
+            for spectator in self.spectators:
+                spectator.needs_keyframe = True
+                spectator.removed.clear()
+            return []
+        cols = engine.brick_cols
+        removed_bricks = engine.removed_bricks
+        if 0 < count <= len(removed_bricks):
+            # The new bricks are the last ones, the renderer has not cleared them yet.
+            removed = [brick.row * cols + brick.col for brick in removed_bricks[-count:]]
+        else:
+            grid_types = engine.brick_grid.types
+            removed = [index for index in range(len(types)) if types[index] and not grid_types[index]]
+        for index in removed:
+            types[index] = 0
+        return removed
+
+    def __get_state(self):
+        """
+        :return: (tuple) The positions, the score and the lives a spectator shows.
+        """
+        engine = self.engine
+        balls = getattr(engine, 'balls', (engine.ball,))
+        positions = tuple(value for ball in balls for value in (ball.x, ball.y))
+        if getattr(engine, 'is_block_paddle_active', False):
+            block_paddle = (engine.block_paddle.x, engine.block_paddle.y)
+        else:
+            block_paddle = NO_BLOCK_PADDLE
+        return (positions, engine.paddle.x, engine.paddle.width, block_paddle,
+                getattr(engine, 'score', engine.remove_bricks_count), engine.lives)
+
+    def __encode_keyframe(self, state):
+        """
+        :param state: (tuple) The current state
+        :return: (bytes) The keyframe of the current state.
+        """
+        engine = self.engine
+        body = [HEADER.pack(KEYFRAME, self.ticks, ALL_FIELDS)]
+        _encode_fields(body, ALL_FIELDS, state, ())
+        bricks = zlib.compress(bytes(engine.brick_grid.types))
+        body.append(GRID.pack(engine.paddle.y, engine.brick_rows, engine.brick_cols, len(bricks)))
+        body.append(bricks)
+        return _frame(body)
+
+
+class _Spectator:
+    """
+    A connected spectator, with the state it was sent last and the bricks removed since then.
+    """
+    def __init__(self, writer):
+        self.writer = writer
+        self.state = None
+        self.removed = []
+        self.needs_keyframe = True
+
+
+class SpectatorView:
+    """
+    This class rebuilds the state of the game from the messages of a server.
+    """
+    def __init__(self):
+        self.tick = 0
+        self.balls = []
+        self.paddle_x = 0
+        self.paddle_y = 0
+        self.paddle_width = 0
+        self.block_paddle = None
+        self.score = 0
+        self.lives = 0
+        self.brick_rows = 0
+        self.brick_cols = 0
+        self.bricks = bytearray()
+        self.has_keyframe = False
+
+    def apply(self, body):
+        """
+        Apply a message to the view, the deltas before the first keyframe are ignored.
+        :param body: (bytes) The message without its length
+        """
+        kind, self.tick, flags = HEADER.unpack_from(body)
+        if kind == DELTA and not self.has_keyframe:
+            return
+        offset = HEADER.size
+        if flags & BALLS:
+            count, = COUNT.unpack_from(body, offset)
+            offset += COUNT.size
+            values = struct.unpack_from('<%df' % (2 * count), body, offset)
+            offset += 8 * count
+            self.balls = list(zip(values[::2], values[1::2]))
+        if flags & PADDLE:
+            self.paddle_x, = FLOAT.unpack_from(body, offset)
+            offset += FLOAT.size
+        if flags & PADDLE_WIDTH:
+            self.paddle_width, = FLOAT.unpack_from(body, offset)
+            offset += FLOAT.size
+        if flags & BLOCK_PADDLE:
+            x, y = FLOAT_PAIR.unpack_from(body, offset)
+            offset += FLOAT_PAIR.size
+            self.block_paddle = None if math.isnan(x) else (x, y)
+        if flags & SCORE:
+            self.score, = SCORE_FIELD.unpack_from(body, offset)
+            offset += SCORE_FIELD.size
+        if flags & LIVES:
+            self.lives, = LIVES_FIELD.unpack_from(body, offset)
+            offset += LIVES_FIELD.size
+        if flags & BRICKS:
+            count, = INDEX_COUNT.unpack_from(body, offset)
+            offset += INDEX_COUNT.size
+            for index in struct.unpack_from('<%dI' % count, body, offset):
+                self.bricks[index] = 0
+            offset += 4 * count
+        if kind == KEYFRAME:
+            self.paddle_y, self.brick_rows, self.brick_cols, length = GRID.unpack_from(body, offset)
+            offset += GRID.size
+            self.bricks = bytearray(zlib.decompress(body[offset:offset + length]))
+            self.has_keyframe = True
+
+    def get_remaining_bricks(self):
+        """
+        :return: (int) The number of bricks the view shows.
+        """
+        return len(self.bricks) - self.bricks.count(0)
+
+
+async def watch(host=HOST, port=PORT, path=None, view=None):
+    """
+    Connect to a server, and follow the game until the server closes the connection.
+    :param host: (str) The address of the server
+    :param port: (int) The port of the server
+    :param path: (str) The path of the Unix socket of the server, None to use TCP.
+    :param view: (SpectatorView) The view to update, a new one if it is None.
+    :return: (async generator) The view after each message.
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    view = view or SpectatorView()
+    try:
+        while True:
+            try:
+                length, = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+                body = await reader.readexactly(length)
+            except asyncio.IncompleteReadError:
+                return
+            view.apply(body)
+            yield view
+    finally:
+        writer.close()
+
+
+def _encode_delta(tick, old, new, removed):
+    """
+    :param tick: (int) The tick of the new state
+    :param old: (tuple) The state the spectator shows
+    :param new: (tuple) The current state
+    :param removed: (list) The indices of the bricks removed since the old state
+    :return: (bytes) The delta from the old state to the new one, None if nothing changed.
+    """
+    flags = BRICKS if removed else 0
+    for flag, old_value, new_value in zip((BALLS, PADDLE, PADDLE_WIDTH, BLOCK_PADDLE, SCORE, LIVES), old, new):
+        # NaN is not equal to itself, but an inactive block paddle is always the same NO_BLOCK_PADDLE tuple.
+        if old_value != new_value:
+            flags |= flag
+    if not flags:
+        return None
+    body = [HEADER.pack(DELTA, tick, flags)]
+    _encode_fields(body, flags, new, removed)
+    return _frame(body)
+
+
+def _encode_fields(body, flags, state, removed):
+    """
+    Append the fields of the flags to the body.
+    :param body: (list) The parts of the message
+    :param flags: (int) The fields to encode
+    :param state: (tuple) The current state
+    :param removed: (list) The indices of the removed bricks
+    """
+    positions, paddle_x, paddle_width, block_paddle, score, lives = state
+    if flags & BALLS:
+        body.append(COUNT.pack(len(positions) // 2))
+        body.append(struct.pack('<%df' % len(positions), *positions))
+    if flags & PADDLE:
+        body.append(FLOAT.pack(paddle_x))
+    if flags & PADDLE_WIDTH:
+        body.append(FLOAT.pack(paddle_width))
+    if flags & BLOCK_PADDLE:
+        body.append(FLOAT_PAIR.pack(*block_paddle))
+    if flags & SCORE:
+        body.append(SCORE_FIELD.pack(score))
+    if flags & LIVES:
+        body.append(LIVES_FIELD.pack(lives))
+    if flags & BRICKS:
+        body.append(INDEX_COUNT.pack(len(removed)))
+        body.append(struct.pack('<%dI' % len(removed), *removed))
+
+
+def _frame(body):
+    """
+    :param body: (list) The parts of the message
+    :return: (bytes) The message with its length.
+    """
+    data = b''.join(body)
+    return LENGTH.pack(len(data)) + data
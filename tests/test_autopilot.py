@@ -0,0 +1,43 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+Tests of the crossing predicted by the autopilot, against the frame-by-frame lookahead.
+"""
+import random
+import unittest
+from autopilot import predict_crossing, lookahead_crossing
+from breakoutengine import BreakoutEngine
+
+
+class PredictCrossingTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = BreakoutEngine(rng=random.Random(0))
+
+    def place_ball(self, x, y, dx, dy):
+        ball = self.engine.ball
+        ball.x = x
+        ball.y = y
+        self.engine.dx = dx
+        self.engine.dy = dy
+
+    def test_random_states_match_the_lookahead(self):
+        rng = random.Random(1)
+        engine = self.engine
+        span = engine.width - engine.ball.width
+        for _ in range(2000):
+            # Some balls start above the top, as a ball sliding along the top does.
+            self.place_ball(rng.uniform(0, span), rng.uniform(-12, engine.paddle.y - engine.ball.height - 1),
+                            rng.choice((-1, 1)) * rng.randint(1, 12), rng.choice((-1, 1)) * rng.randint(1, 10))
+            self.assertAlmostEqual(predict_crossing(engine), lookahead_crossing(engine))
+
+    def test_side_wall_and_top_in_the_same_frame(self):
+        # The ball passes the left wall and the top in the next frame, it bounces on the wall first.
+        self.place_ball(2.5, 3, -4, -6)
+        self.assertAlmostEqual(predict_crossing(self.engine), lookahead_crossing(self.engine))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+Tests of the batch of games, stepped against a single engine per game.
+"""
+import random
+import unittest
+import numpy as np
+from breakoutbatch import BreakoutBatch
+from breakoutengine import BreakoutEngine, LIFE_LOST, GAME_LOST, GAME_WON
+
+NUM_GAMES = 8
+
+
+class BreakoutBatchTest(unittest.TestCase):
+    def serve(self, batch, engines, game, seed):
+        """
+        Serve the ball of the engine, and give its velocity to the game of the batch,
+        the batch draws the velocities from another generator.
+        """
+        engine = engines[game]
+        if engine is None:
+            engine = engines[game] = BreakoutEngine(rng=random.Random(seed))
+        engine.handle_click()
+        batch.dx[game] = engine.dx
+        batch.dy[game] = engine.dy
+
+    def assert_same_games(self, batch, engines):
+        for game, engine in enumerate(engines):
+            self.assertEqual((batch.ball_x[game], batch.ball_y[game]), (engine.ball.x, engine.ball.y))
+            self.assertEqual((batch.dx[game], batch.dy[game]), (engine.dx, engine.dy))
+            self.assertEqual(batch.paddle_x[game], engine.paddle.x)
+            self.assertEqual(batch.lives[game], engine.lives)
+            self.assertEqual(batch.remove_bricks_count[game], engine.remove_bricks_count)
+            alive = np.frombuffer(bytes(engine.brick_grid.types), dtype=np.uint8).reshape(batch.bricks[game].shape)
+            self.assertTrue(np.array_equal(batch.bricks[game], alive != 0))
+
+    def test_batch_steps_as_the_engines(self):
+        batch = BreakoutBatch(NUM_GAMES, seed=0)
+        engines = [None] * NUM_GAMES
+        for game in range(NUM_GAMES):
+            self.serve(batch, engines, game, game)
+        self.assert_same_games(batch, engines)
+        # Each game follows its ball from another part of the paddle, so some games lose their balls.
+        offsets = np.linspace(-60, 60, NUM_GAMES)
+        served = 0
+        for _ in range(2000):
+            mouse_x = batch.ball_x + batch.ball_size / 2 + offsets
+            removed, dones = batch.step(mouse_x)
+            for game, engine in enumerate(engines):
+                engine.move_paddle(mouse_x[game])
+                count = engine.remove_bricks_count
+                state = engine.tick()
+                self.assertEqual(removed[game], engine.remove_bricks_count - count)
+                self.assertEqual(dones[game], state == GAME_LOST or state == GAME_WON)
+                if state == LIFE_LOST:
+                    self.serve(batch, engines, game, None)
+                    served += 1
+                elif dones[game]:
+                    engines[game] = None
+                    self.serve(batch, engines, game, NUM_GAMES + served)
+                    served += 1
+            self.assert_same_games(batch, engines)
+        self.assertGreater(served, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
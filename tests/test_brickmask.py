@@ -0,0 +1,52 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+Tests of the brick-alive bitmasks of the environment and the frame store, with a level having empty cells.
+"""
+import os
+import random
+import tempfile
+import unittest
+import numpy as np
+from breakoutenv import BreakoutEnv
+from breakoutengine_extension import BreakoutEngineExtension
+from framestore import FrameWriter, FrameReader
+from levels import LEVEL_DIR, load_level
+
+
+class BrickMaskTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        # The fortress has 97 bricks in 108 cells.
+        self.level = load_level(os.path.join(LEVEL_DIR, '02_fortress.txt'), cache_dir=self.cache_dir.name)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_env_marks_only_the_bricks_of_the_level(self):
+        env = BreakoutEnv(level=self.level)
+        observation = env.reset(seed=1)
+        alive = np.unpackbits(observation['bricks'])
+        self.assertEqual(alive.sum(), 97)
+        self.assertEqual(alive[:108].tolist(), [int(t != 0) for t in env.engine.brick_grid.types])
+        self.assertFalse(alive[108:].any())
+
+    def test_frame_store_marks_only_the_bricks_of_the_level(self):
+        engine = BreakoutEngineExtension(rng=random.Random(1), level=self.level)
+        with tempfile.TemporaryDirectory() as path:
+            with FrameWriter(path, self.level.rows, self.level.cols) as writer:
+                writer.begin_game(engine, 1)
+                engine.handle_click()
+                engine.tick()
+                writer.record(engine)
+            with FrameReader(path) as reader:
+                alive = reader.get_bricks(0)
+                self.assertEqual(alive.sum(), 97)
+                self.assertEqual(alive.ravel().tolist(), [t != 0 for t in engine.brick_grid.types])
+
+
+if __name__ == '__main__':
+    unittest.main()
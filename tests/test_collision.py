@@ -0,0 +1,95 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+Tests of the swept collision, by itself and along the path of the ball in the engine.
+"""
+import math
+import random
+import unittest
+from breakoutengine import BreakoutEngine, PLAYING
+from collision import sweep_circle_rect
+
+
+def place_ball(engine, cx, cy, dx, dy):
+    """
+    Move the center of the ball to (cx, cy), with the velocity (dx, dy).
+    """
+    radius = engine.ball.width / 2
+    engine.ball.x = cx - radius
+    engine.ball.y = cy - radius
+    engine.dx = dx
+    engine.dy = dy
+
+
+class SweepCircleRectTest(unittest.TestCase):
+    def test_fast_circle_hits_thin_rect(self):
+        # The circle is far above the rectangle at the start and far below it at the end.
+        hit = sweep_circle_rect(5, 0, 1, 0, 20, 0, 8, 10, 2)
+        self.assertEqual(hit, (0.35, 0, -1))
+
+    def test_corner_hit(self):
+        t, nx, ny = sweep_circle_rect(5, 5, 2, 10, 10, 10, 10, 10, 10)
+        self.assertAlmostEqual(t, (5 - math.sqrt(2)) / 10)
+        self.assertAlmostEqual(nx, -math.sqrt(0.5))
+        self.assertAlmostEqual(ny, -math.sqrt(0.5))
+
+    def test_path_by_the_rounded_corner_misses(self):
+        # The path crosses the corner of the grown rectangle, but stays out of its rounded corner.
+        self.assertIsNone(sweep_circle_rect(4.2, 12.2, 2, 10, -10, 10, 10, 10, 10))
+
+    def test_hit_after_t_max_is_ignored(self):
+        self.assertIsNone(sweep_circle_rect(5, 0, 1, 0, 20, 0, 8, 10, 2, t_max=0.3))
+
+
+class SweepBallTest(unittest.TestCase):
+    def create_engine(self, swept, keep):
+        """
+        :param swept: (Bool) True for the swept collision
+        :param keep: (int) The index of the brick hit by the ball
+        :return: (BreakoutEngine) A game with the brick, and the top right brick so the game is not won.
+        """
+        engine = BreakoutEngine(rng=random.Random(0), swept=swept)
+        grid = engine.brick_grid
+        for index in range(len(grid.types)):
+            if index not in (keep, 9) and grid.types[index]:
+                grid.remove(index)
+        return engine
+
+    def test_fast_ball_does_not_tunnel(self):
+        # The brick of the last row and the fifth column, its bottom is at y = 245.
+        index = 9 * 10 + 4
+        for swept in (False, True):
+            engine = self.create_engine(swept, index)
+            # The ball is below the brick, and above it one frame later.
+            place_ball(engine, 200, 270, 0, -60)
+            self.assertEqual(engine.tick(), PLAYING)
+            if swept:
+                self.assertEqual(engine.brick_grid.types[index], 0)
+                self.assertEqual(engine.dy, 60)
+                # The ball touches the brick after a quarter of the frame, and moves back down in the rest of it.
+                self.assertEqual(engine.ball.y, 245 + 45)
+            else:
+                # Without the sweep the ball passes through the brick.
+                self.assertNotEqual(engine.brick_grid.types[index], 0)
+                self.assertEqual(engine.dy, -60)
+
+    def test_wall_and_brick_tie(self):
+        # The brick of the last row and the first column touches the left wall, its bottom is at y = 245.
+        index = 9 * 10
+        engine = self.create_engine(True, index)
+        radius = engine.ball.width / 2
+        # In half a frame the ball touches the left wall and the bottom of the brick at the same time.
+        place_ball(engine, radius + 2, 245 + radius + 2, -4, -4)
+        self.assertEqual(engine.tick(), PLAYING)
+        # The ball bounces from both, and the frame ends where it started.
+        self.assertEqual((engine.dx, engine.dy), (4, 4))
+        self.assertEqual(engine.brick_grid.types[index], 0)
+        self.assertEqual(engine.remove_bricks_count, 1)
+        self.assertEqual((engine.ball.x, engine.ball.y), (2, 247))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+Tests of the order of the canvas operations sent by a flush, with a window which logs the operations.
+"""
+import unittest
+from dirtyrender import DirtyRenderer
+
+
+class FakeMaster:
+    """
+    The Tk window, the idle tasks are updated after every operation as in the Tk backend of campy.
+    """
+    def __init__(self, log):
+        self.log = log
+
+    def update_idletasks(self):
+        self.log.append('update')
+
+
+class FakeTkWindow:
+    def __init__(self, master):
+        self._master = master
+
+
+class FakeWindow:
+    def __init__(self):
+        self.log = []
+        self._tkwin = FakeTkWindow(FakeMaster(self.log))
+        self.objs = []
+
+    def update(self):
+        self._tkwin._master.update_idletasks()
+
+    def add(self, gobj, x, y):
+        gobj.x = x
+        gobj.y = y
+        self.objs.append(gobj)
+        self.log.append(('add', gobj.name))
+        self.update()
+
+    def remove(self, gobj):
+        self.objs.remove(gobj)
+        self.log.append(('remove', gobj.name))
+        self.update()
+
+
+class FakeLabel:
+    def __init__(self, window, name, text=''):
+        self.window = window
+        self.name = name
+        self.x = 0
+        self.y = 0
+        self.text = text
+
+    @property
+    def location(self):
+        return self.x, self.y
+
+    @location.setter
+    def location(self, location):
+        self.x, self.y = location
+        self.window.log.append(('move', self.name))
+        self.window.update()
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name == 'text' and hasattr(self, 'window'):
+            self.window.log.append(('text', self.name))
+            self.window.update()
+
+
+class DirtyRendererTest(unittest.TestCase):
+    def setUp(self):
+        self.window = FakeWindow()
+        self.renderer = DirtyRenderer(self.window)
+
+    def flush(self):
+        """
+        :return: (list) The operations sent by the flush.
+        """
+        self.window.log.clear()
+        self.renderer.flush()
+        return list(self.window.log)
+
+    def test_adds_and_removes_keep_their_order(self):
+        ball = FakeLabel(self.window, 'ball')
+        brick = FakeLabel(self.window, 'brick')
+        self.renderer.add(ball, 10, 10)
+        self.renderer.add(brick, 0, 0)
+        self.renderer.remove(ball)
+        self.renderer.add(ball, 20, 20)
+        # The idle tasks are updated once, at the end of the flush.
+        self.assertEqual(self.flush(), [('add', 'ball'), ('add', 'brick'), ('remove', 'ball'), ('add', 'ball'),
+                                        'update'])
+        self.assertEqual(self.window.objs, [brick, ball])
+        self.assertEqual(ball.location, (20, 20))
+
+    def test_moves_and_texts_follow_the_adds(self):
+        label = FakeLabel(self.window, 'score')
+        self.renderer.move_to(label, 5, 5)
+        self.renderer.set_text(label, 'SCORE: 1')
+        self.renderer.add(label, 0, 0)
+        self.assertEqual(self.flush(), [('add', 'score'), ('move', 'score'), ('text', 'score'), 'update'])
+        self.assertEqual((label.location, label.text), ((5, 5), 'SCORE: 1'))
+
+    def test_removed_object_is_not_moved(self):
+        ball = FakeLabel(self.window, 'ball')
+        self.renderer.add(ball, 0, 0)
+        self.flush()
+        self.renderer.move_to(ball, 5, 5)
+        self.renderer.remove(ball)
+        # A single operation is sent as it is, with its own update.
+        self.assertEqual(self.flush(), [('remove', 'ball'), 'update'])
+
+    def test_unchanged_objects_send_nothing(self):
+        label = FakeLabel(self.window, 'score')
+        self.renderer.add(label, 0, 0)
+        self.renderer.set_text(label, 'SCORE: 0')
+        self.flush()
+        self.renderer.move_to(label, 3, 3)
+        self.renderer.move_to(label, 0, 0)
+        self.renderer.set_text(label, 'SCORE: 0')
+        self.assertEqual(self.flush(), [])
+        self.assertEqual(self.renderer.ops, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+Tests of the fixed-timestep loop, driven by a fake clock instead of the real time.
+"""
+import unittest
+from breakoutengine import PLAYING, GAME_LOST
+from gameloop import GameLoop, MAX_FRAME_SKIP, MAX_TICKS_PER_FRAME
+
+
+class FakeGame:
+    """
+    A game whose ticks and drawings take a fixed time of a fake clock, it is lost after a number of ticks.
+    """
+    def __init__(self, tick_cost, render_cost, ticks):
+        """
+        :param tick_cost: (float) Seconds taken by a tick
+        :param render_cost: (float) Seconds taken by a drawing
+        :param ticks: (int) Number of ticks until the game is lost
+        """
+        self.now = 0
+        self.tick_cost = tick_cost
+        self.render_cost = render_cost
+        self.ticks_left = ticks
+        self.idles = 0
+
+    def clock(self):
+        return self.now
+
+    def idle(self, seconds):
+        self.now += seconds
+        self.idles += 1
+
+    def tick(self):
+        self.now += self.tick_cost
+        self.ticks_left -= 1
+        return GAME_LOST if self.ticks_left == 0 else PLAYING
+
+    def render(self):
+        self.now += self.render_cost
+
+
+def run_loop(tick_cost, render_cost=0.001, ticks=2000, tick_rate=100, render_rate=60):
+    """
+    :return: (tuple) The loop and the game after the game is over.
+    """
+    game = FakeGame(tick_cost, render_cost, ticks)
+    loop = GameLoop(game.tick, game.render, tick_rate=tick_rate, render_rate=render_rate, idle=game.idle,
+                    clock=game.clock)
+    loop.run()
+    return loop, game
+
+
+class GameLoopTest(unittest.TestCase):
+    def test_slow_ticks_skip_renders(self):
+        # Each tick takes twice the tick time, so the loop can never catch up.
+        loop, game = run_loop(tick_cost=0.02)
+        self.assertGreater(loop.skipped_renders, 0)
+        self.assertGreater(loop.renders, 0)
+        # A drawing is still made after MAX_FRAME_SKIP skipped ones.
+        self.assertLessEqual(loop.skipped_renders, MAX_FRAME_SKIP * loop.renders)
+        self.assertEqual(loop.ticks, 2000)
+
+    def test_loop_behind_still_idles(self):
+        # Every tick costs more than the tick time, so the loop is always behind,
+        # but it still waits between frames, where the window pumps its events.
+        loop, game = run_loop(tick_cost=0.015)
+        self.assertEqual(loop.ticks, 2000)
+        self.assertGreaterEqual(game.idles, loop.ticks // MAX_TICKS_PER_FRAME - 1)
+
+    def test_fast_ticks_do_not_skip_renders(self):
+        loop, game = run_loop(tick_cost=0.0001)
+        self.assertEqual(loop.skipped_renders, 0)
+        self.assertEqual(loop.ticks, 2000)
+        # The game keeps the tick rate, and the drawings are capped at the render rate.
+        self.assertAlmostEqual(loop.get_tick_rate(), 100, delta=2)
+        self.assertLessEqual(loop.get_render_rate(), 61)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+Tests of the binary input logs, and of the replays of the logs.
+"""
+import os
+import tempfile
+import unittest
+from inputlog import InputLog, HEADER, VERSION, EXTENSION, replay
+from levels import LEVEL_DIR, load_level
+
+
+def record_log(variant=EXTENSION, level=None):
+    """
+    :param variant: (int) The engine of the game
+    :param level: (Level) The level of the game, None for the uniform bricks.
+    :return: (InputLog) A short game, the ball is served and the mouse moves a few times.
+    """
+    log = InputLog(7, variant, level)
+    for tick in range(300):
+        log.record(40 + tick % 200 if tick % 5 == 0 else None, tick == 0)
+    return log
+
+
+class InputLogTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        # The fortress has 97 bricks in 108 cells.
+        self.level = load_level(os.path.join(LEVEL_DIR, '02_fortress.txt'), cache_dir=self.cache_dir.name)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_round_trip(self):
+        log = record_log()
+        decoded = InputLog.from_bytes(log.to_bytes())
+        self.assertEqual((decoded.seed, decoded.variant), (log.seed, log.variant))
+        self.assertEqual(decoded.mouse_x, log.mouse_x)
+        self.assertEqual(decoded.click_ticks, log.click_ticks)
+        self.assertEqual(replay(decoded).snapshot(), replay(log).snapshot())
+
+    def test_level_is_replayed(self):
+        log = record_log(level=self.level)
+        decoded = InputLog.from_bytes(log.to_bytes())
+        self.assertEqual(decoded.level.to_bytes(), self.level.to_bytes())
+        engine = replay(decoded)
+        self.assertEqual(engine.snapshot(), replay(log).snapshot())
+        self.assertEqual((engine.brick_rows, engine.brick_cols), (self.level.rows, self.level.cols))
+        self.assertEqual(replay(decoded, ticks=0).brick_grid.count, 97)
+
+    def test_other_level_is_refused(self):
+        with self.assertRaisesRegex(ValueError, 'level'):
+            replay(record_log(level=self.level), level=None)
+        with self.assertRaisesRegex(ValueError, 'level'):
+            replay(record_log(), level=self.level)
+
+    def test_older_version_is_rejected(self):
+        data = bytearray(record_log().to_bytes())
+        data[4] = VERSION - 1
+        with self.assertRaisesRegex(ValueError, 'older version'):
+            InputLog.from_bytes(bytes(data))
+
+    def test_other_file_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, 'Not an input log'):
+            InputLog.from_bytes(b'GIF89a' + bytes(HEADER.size))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+Tests of the levels, parsed from the text files and compiled to bytes.
+"""
+import unittest
+from levels import Level, parse_level
+
+LEVEL_TEXT = '''name: %s
+legend:
+a = normal #f28179
+bricks:
+aa
+'''
+
+
+class LevelTest(unittest.TestCase):
+    def test_round_trip(self):
+        level = parse_level(LEVEL_TEXT % 'Two bricks')
+        decoded = Level.from_bytes(level.to_bytes())
+        self.assertEqual(decoded.name, 'Two bricks')
+        self.assertEqual(decoded.colors, level.colors)
+        self.assertEqual(decoded.to_bytes(), level.to_bytes())
+
+    def test_long_name_is_cut_between_characters(self):
+        # 3 bytes per character in UTF-8 after the first byte, the 85th of them would end at the 256th byte.
+        level = parse_level(LEVEL_TEXT % ('L' + '磚' * 100))
+        decoded = Level.from_bytes(level.to_bytes())
+        self.assertEqual(decoded.name, 'L' + '磚' * 84)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+Tests of the planner, the searches are timed by the simulated frames instead of the real time.
+"""
+import random
+import unittest
+from autopilot import Autopilot, predict_crossing
+from breakoutengine_extension import BreakoutEngineExtension
+from planner import Planner, _is_paddle_reachable
+
+
+def reach_paddle(seed):
+    """
+    :param seed: (int) The seed of the game
+    :return: (BreakoutEngineExtension) A game played by the autopilot until the ball can reach the paddle.
+    """
+    engine = BreakoutEngineExtension(rng=random.Random(seed))
+    autopilot = Autopilot()
+    while not _is_paddle_reachable(engine):
+        engine.handle_click()
+        engine.move_paddle(autopilot(engine))
+        engine.tick()
+    return engine
+
+
+class PlannerTest(unittest.TestCase):
+    def setUp(self):
+        # 20000 simulated frames per second of the budget.
+        self.planner = Planner(budget=0.02, clock=lambda: self.planner.frames / 20000)
+
+    def test_same_ball_is_a_loop(self):
+        engine = reach_paddle(1)
+        self.planner(engine.fork())
+        self.assertEqual(self.planner.loops, 0)
+        self.planner(engine.fork())
+        self.assertEqual(self.planner.loops, 1)
+
+    def test_removed_brick_forgets_the_states(self):
+        engine = reach_paddle(1)
+        self.planner(engine.fork())
+        engine.remove_bricks_count += 1
+        self.planner(engine.fork())
+        self.assertEqual(self.planner.loops, 0)
+
+    def test_loop_leaves_out_the_autopilot(self):
+        engine = reach_paddle(1)
+        self.planner(engine.fork())
+        x = self.planner(engine.fork())
+        # The paddle is moved aside from the crossing of the autopilot, by one of the other actions.
+        self.assertNotEqual(x, predict_crossing(engine.fork()))
+
+
+if __name__ == '__main__':
+    unittest.main()
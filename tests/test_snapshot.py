@@ -0,0 +1,85 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+Tests of the snapshots and the forks of every variant of the engine.
+"""
+import random
+import unittest
+from breakoutengine import BreakoutEngine, ForkedRandom, GAME_LOST, GAME_WON
+from breakoutengine_extension import BreakoutEngineExtension
+from breakoutengine_multiball import BreakoutEngineMultiBall
+
+ENGINES = (BreakoutEngine, BreakoutEngineExtension, BreakoutEngineMultiBall)
+
+
+def play(engine, start, ticks):
+    """
+    Play the game with a mouse following the ball, from the left, the center or the right of the paddle by turns.
+    :param engine: (BreakoutEngine) The game to play
+    :param start: (int) The number of ticks played before, the turns follow the number of the tick
+    :param ticks: (int) The number of ticks to play
+    :return: (list) The state returned by each tick, and the snapshot after it.
+    """
+    states = []
+    for tick in range(start, start + ticks):
+        engine.handle_click()
+        engine.move_paddle(engine.ball.x + engine.ball.width / 2 + (tick // 50 % 3 - 1) * 20)
+        state = engine.tick()
+        states.append((state, engine.snapshot()))
+        if state == GAME_LOST or state == GAME_WON:
+            break
+    return states
+
+
+class SnapshotTest(unittest.TestCase):
+    def test_restore_then_tick(self):
+        for engine_class in ENGINES:
+            with self.subTest(engine=engine_class.__name__):
+                engine = engine_class(rng=random.Random(1))
+                play(engine, 0, 200)
+                snapshot = engine.snapshot()
+                expected = play(engine, 200, 300)
+                # The same game restores its own past, and another game takes the state of the first one.
+                engine.restore(snapshot)
+                self.assertEqual(play(engine, 200, 300), expected)
+                other = engine_class(rng=random.Random(2))
+                other.restore(snapshot)
+                self.assertEqual(play(other, 200, 300), expected)
+
+    def test_other_variant_is_refused(self):
+        snapshot = BreakoutEngineExtension(rng=random.Random(1)).snapshot()
+        with self.assertRaisesRegex(ValueError, 'variant'):
+            BreakoutEngine(rng=random.Random(1)).restore(snapshot)
+
+
+class ForkTest(unittest.TestCase):
+    def test_fork_plays_as_the_game(self):
+        for engine_class in ENGINES:
+            with self.subTest(engine=engine_class.__name__):
+                engine = engine_class(rng=random.Random(1))
+                play(engine, 0, 200)
+                fork = engine.fork()
+                self.assertIsInstance(fork.rng, ForkedRandom)
+                self.assertEqual(play(fork, 200, 300), play(engine, 200, 300))
+
+    def test_fork_does_not_draw_from_the_game(self):
+        for engine_class in ENGINES:
+            with self.subTest(engine=engine_class.__name__):
+                engine = engine_class(rng=random.Random(1))
+                play(engine, 0, 200)
+                snapshot = engine.snapshot()
+                state = engine.rng.getstate()
+                fork = engine.fork()
+                # The fork loses the ball and serves it again, so it draws from its own generator.
+                fork.init_ball()
+                play(fork, 200, 300)
+                self.assertTrue(fork.rng.getstate() != state)
+                self.assertEqual(engine.rng.getstate(), state)
+                self.assertEqual(engine.snapshot(), snapshot)
+
+
+if __name__ == '__main__':
+    unittest.main()
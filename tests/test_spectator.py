@@ -0,0 +1,102 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+Tests of the stream of the spectator server, the messages are decoded by SpectatorView without any socket.
+"""
+import random
+import unittest
+from autopilot import Autopilot
+from breakoutengine_extension import BreakoutEngineExtension
+from spectator import SpectatorServer, SpectatorView, LENGTH, _Spectator
+
+
+class FakeTransport:
+    def get_write_buffer_size(self):
+        return 0
+
+
+class FakeWriter:
+    """
+    A writer which decodes the messages it gets into a view, as watch does.
+    """
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.view = SpectatorView()
+        self.messages = 0
+
+    def is_closing(self):
+        return False
+
+    def write(self, data):
+        offset = 0
+        while offset < len(data):
+            length, = LENGTH.unpack_from(data, offset)
+            offset += LENGTH.size
+            self.view.apply(data[offset:offset + length])
+            offset += length
+            self.messages += 1
+
+
+class SpectatorTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = BreakoutEngineExtension(rng=random.Random(3))
+        self.server = SpectatorServer(self.engine)
+        self.writer = FakeWriter()
+        # A spectator joins as __accept adds it.
+        self.server.spectators.append(_Spectator(self.writer))
+        self.autopilot = Autopilot()
+
+    def play(self, ticks):
+        """
+        Play the game with the autopilot, and publish every tick as the game does.
+        """
+        engine = self.engine
+        for _ in range(ticks):
+            engine.handle_click()
+            engine.move_paddle(self.autopilot(engine))
+            engine.tick()
+            self.server.publish()
+            # The renderer clears the removed bricks after the server read them.
+            engine.removed_bricks.clear()
+
+    def assert_view_matches(self):
+        engine = self.engine
+        view = self.writer.view
+        self.assertEqual(view.bricks, engine.brick_grid.types)
+        self.assertEqual(view.score, engine.score)
+        self.assertEqual(view.lives, engine.lives)
+        self.assertAlmostEqual(view.paddle_x, engine.paddle.x, places=3)
+        self.assertAlmostEqual(view.balls[0][0], engine.ball.x, places=3)
+        self.assertAlmostEqual(view.balls[0][1], engine.ball.y, places=3)
+
+    def test_keyframe_then_deltas(self):
+        # Only the first message is a keyframe.
+        self.server.keyframe_interval = 10 ** 9
+        self.play(1)
+        self.assertTrue(self.writer.view.has_keyframe)
+        self.assert_view_matches()
+        for _ in range(500):
+            self.play(1)
+            self.assert_view_matches()
+        self.assertGreater(self.engine.remove_bricks_count, 0)
+        # The ball moves in every tick, so every tick sends a message.
+        self.assertEqual(self.writer.messages, self.server.ticks)
+
+    def test_restored_bricks_come_back(self):
+        self.play(10)
+        snapshot = self.engine.snapshot()
+        while self.engine.remove_bricks_count < 5:
+            self.play(1)
+        self.engine.restore(snapshot)
+        self.autopilot.reset()
+        # The next tick is not a keyframe of the interval, but the spectator still gets the bricks back.
+        self.play(1)
+        self.assertNotEqual(self.server.ticks % self.server.keyframe_interval, 0)
+        self.assert_view_matches()
+
+
+if __name__ == '__main__':
+    unittest.main()
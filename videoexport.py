@@ -0,0 +1,422 @@
+"""
+stanCode Breakout Project
+Adapted from Eric Roberts's Breakout by
+Sonja Johnson-Yu, Kylie Jue, Nick Bowman,
+and Jerry Liao.
+
+This program exports the input logs of inputlog.py as animated GIFs or raw videos, without any window.
+Each log is replayed headlessly, and the frames are drawn by rasterizer.py every few ticks.
+The frames are written to the file as they are drawn, so only a frame and the frame before it are kept in memory,
+however long the game is. The logs are exported in a pool of worker processes, a log per worker at a time.
+
+A GIF frame only keeps the smallest box covering the pixels changed since the frame before it,
+and the unchanged pixels inside the box are transparent, so they cost almost nothing after the compression.
+A frame without any changed pixel is not written, the frame before it is shown longer instead.
+Each GIF frame has its own color table, as the game uses a few colors at a time.
+
+A raw video is the pixels of every frame in a row, RGB (rgb24) or gray (gray8), at a constant frame rate,
+the frames without any change are not drawn again. It can be encoded by ffmpeg, e.g. for 445 x 635 at 50 frames/s:
+    ffmpeg -f rawvideo -pixel_format rgb24 -video_size 445x635 -framerate 50 -i game.rgb game.mp4
+
+Export the logs into a folder:
+    python videoexport.py game1.log game2.log --output-dir videos --downsample 2 --step 2
+"""
+import argparse
+import functools
+import multiprocessing
+import os
+import struct
+import time
+import numpy as np
+from gameloop import TICK_RATE
+from inputlog import InputLog, create_engine, iter_replay
+from rasterizer import Rasterizer
+
+GIF = 'gif'
+RAW = 'raw'
+DOWNSAMPLE = 2              # The window is drawn this number of times smaller in each direction
+STEP = 2                    # Ticks between two frames, a frame is kept every 2 ticks (50 frames/s)
+MAX_GIF_FRAME_RATE = 50     # Browsers slow down the GIF frames shorter than 2 hundredths of a second
+MAX_GIF_DELAY = 65535       # Longest time of a GIF frame (in hundredths of a second)
+
+GIF_SCREEN = struct.Struct('<6sHHBBB')
+GIF_LOOP = b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00'
+GIF_CONTROL = struct.Struct('<BBBBHBB')
+GIF_IMAGE = struct.Struct('<BHHHHB')
+GIF_TRAILER = b'\x3b'
+MAX_CODE = 4096             # Codes of the GIF compression (LZW) are at most 12 bits
+
+
+class GifWriter:
+    """
+    This class writes the frames of an animated GIF to a file, only the changed pixels of each frame are written.
+    """
+    def __init__(self, path, width, height, frame_rate):
+        """
+        :param path: (str) The path of the GIF
+        :param width: (int) Width of the frames (in pixels)
+        :param height: (int) Height of the frames (in pixels)
+        :param frame_rate: (float) Frames per second, MAX_GIF_FRAME_RATE at most.
+        """
+        if frame_rate > MAX_GIF_FRAME_RATE:
+            raise ValueError('The frame rate of a GIF is at most %d frames/s' % MAX_GIF_FRAME_RATE)
+        self.frame_rate = frame_rate
+        self.frames = 0             # Number of frames added
+        self.written_frames = 0     # Number of frames written, the unchanged frames are not written
+        self.__file = open(path, 'wb')
+        self.__file.write(GIF_SCREEN.pack(b'GIF89a', width, height, 0, 0, 0))
+        self.__file.write(GIF_LOOP)
+        # The pixels shown after the last written frame.
+        self.__previous = None
+        # The last written frame waits for its time, which is known when a changed frame comes.
+        self.__pending = None
+        self.__pending_start = 0
+
+    def add(self, frame, box=None):
+        """
+        Add the next frame, it is written if any of its pixels changed.
+        :param frame: (numpy.ndarray) The pixels, height x width x channels (1 or 3), uint8
+        :param box: The box (x0, y0, x1, y1) covering the pixels changed since the last frame,
+                    None if no pixel changed. The whole frame is written the first time.
+        :return: (Bool) True if the frame was written, False if it was unchanged.
+        """
+        if self.__previous is None:
+            self.__previous = frame.copy()
+            height, width = frame.shape[:2]
+            image = self.__encode(frame, 0, 0, np.ones((height, width), dtype=bool))
+        elif box is None:
+            image = None
+        else:
+            x0, y0, x1, y1 = box
+            region = frame[y0:y1, x0:x1]
+            changed = (region != self.__previous[y0:y1, x0:x1]).any(axis=2)
+            rows = np.flatnonzero(changed.any(axis=1))
+            if len(rows) == 0:
+                image = None
+            else:
+                # Shrink the box to the changed pixels.
+                cols = np.flatnonzero(changed.any(axis=0))
+                top, bottom = rows[0], rows[-1] + 1
+                left, right = cols[0], cols[-1] + 1
+                self.__previous[y0 + top:y0 + bottom, x0 + left:x0 + right] = region[top:bottom, left:right]
+                image = self.__encode(region[top:bottom, left:right], x0 + left, y0 + top,
+                                      changed[top:bottom, left:right])
+
+        if image is not None:
+            self.__flush()
+            self.__pending = image
+            self.__pending_start = self.frames
+            self.written_frames += 1
+        self.frames += 1
+        return image is not None
+
+    def close(self):
+        """
+        Write the last frame and the end of the GIF, and close the file.
+        """
+        self.__flush()
+        self.__file.write(GIF_TRAILER)
+        self.__file.close()
+
+    def __flush(self):
+        """
+        Write the pending frame, with the time until the current frame.
+        """
+        if self.__pending is None:
+            return
+        image, transparent = self.__pending
+        delay = (round(self.frames * 100 / self.frame_rate) -
+                 round(self.__pending_start * 100 / self.frame_rate))
+        # Disposal 1 keeps the frame on the screen, so the next frame only draws its changed pixels.
+        flags = 1 << 2 | (transparent is not None)
+        self.__file.write(GIF_CONTROL.pack(0x21, 0xf9, 4, flags, min(delay, MAX_GIF_DELAY), transparent or 0, 0))
+        self.__file.write(image)
+        self.__pending = None
+
+    def __encode(self, pixels, x, y, changed):
+        """
+        Encode a part of the frame as a GIF image with its color table, the unchanged pixels are transparent.
+        :param pixels: (numpy.ndarray) The pixels of the part, height x width x channels
+        :param x: (int) The x position of the part in the frame
+        :param y: (int) The y position of the part in the frame
+        :param changed: (numpy.ndarray) True for the changed pixels of the part, height x width
+        :return: (tuple) The image, and the transparent index, None if every pixel changed.
+        """
+        height, width, channels = pixels.shape
+        if channels == 3:
+            values = (pixels[:, :, 0].astype(np.uint32) << 16 | pixels[:, :, 1].astype(np.uint32) << 8 |
+                      pixels[:, :, 2])
+            # 3 bits of red and green, and 1 bit of blue, if the part has too many colors.
+            reduced_mask = 0xe0e080
+        else:
+            values = pixels[:, :, 0]
+            reduced_mask = 0xfe
+        is_transparent = not changed.all()
+        colors, indices = np.unique(values[changed], return_inverse=True)
+        if len(colors) + is_transparent > 256:
+            colors, indices = np.unique(values[changed] & reduced_mask, return_inverse=True)
+        transparent = len(colors) if is_transparent else None
+
+        image = np.full((height, width), transparent or 0, dtype=np.uint8)
+        image[changed] = indices.ravel()
+        bits = max(1, (len(colors) + is_transparent - 1).bit_length())
+        if channels == 3:
+            table = np.stack([colors >> 16, colors >> 8 & 0xff, colors & 0xff], axis=1)
+        else:
+            table = np.repeat(colors[:, None], 3, axis=1)
+        table = np.resize(table.astype(np.uint8), (1 << bits, 3))
+        code_size = max(2, bits)
+        return (GIF_IMAGE.pack(0x2c, x, y, width, height, 0x80 | bits - 1) + table.tobytes() +
+                bytes([code_size]) + _to_blocks(_compress(image.tobytes(), code_size))), transparent
+
+
+class RawVideoWriter:
+    """
+    This class writes the pixels of every frame to a file, at a constant frame rate.
+    """
+    def __init__(self, path, width, height, frame_rate):
+        """
+        :param path: (str) The path of the video
+        :param width: (int) Width of the frames (in pixels)
+        :param height: (int) Height of the frames (in pixels)
+        :param frame_rate: (float) Frames per second, it is not stored in the file.
+        """
+        self.frame_rate = frame_rate
+        self.frames = 0             # Number of frames added
+        self.written_frames = 0     # Number of changed frames, the frames are all written
+        self.__file = open(path, 'wb')
+
+    def add(self, frame, box=None):
+        """
+        Write the next frame.
+        :param frame: (numpy.ndarray) The pixels, height x width x channels (1 or 3), uint8, C-contiguous.
+        :param box: The box covering the pixels changed since the last frame, None if no pixel changed.
+        :return: (Bool) True if the frame changed.
+        """
+        self.__file.write(frame.data)
+        if box is not None or self.frames == 0:
+            self.written_frames += 1
+        self.frames += 1
+        return box is not None
+
+    def close(self):
+        """
+        Close the file.
+        """
+        self.__file.close()
+
+
+WRITERS = {GIF: GifWriter, RAW: RawVideoWriter}
+
+
+def export_replay(path, output_dir=None, video_format=GIF, gray=False, downsample=DOWNSAMPLE, step=STEP,
+                  first_tick=0, last_tick=None, **kwargs):
+    """
+    Replay an input log headlessly, and write its frames to a GIF or a raw video as they are drawn.
+    :param path: (str) The path of the input log
+    :param output_dir: (str) The folder of the video, the folder of the log if it is None.
+                       The video has the name of the log, with the extension .gif, .rgb or .gray.
+    :param video_format: (str) GIF or RAW
+    :param gray: (Bool) True to draw in grayscale, False in RGB.
+    :param downsample: (int) The window is drawn this number of times smaller in each direction.
+    :param step: (int) Ticks between two frames
+    :param first_tick: (int) The first tick of the video, the game before it is replayed without drawing.
+    :param last_tick: (int) The tick ending the video, the end of the log if it is None.
+    :param kwargs: The other parameters of the engine, the same as the recorded game.
+    :return: (dict) The paths, the number of ticks replayed and of frames written, the size of the video
+             and the time of the export.
+    """
+    start = time.perf_counter()
+    log = InputLog.load(path)
+    ticks = len(log) if last_tick is None else min(last_tick, len(log))
+    engine = create_engine(log, **kwargs)
+    rasterizer = Rasterizer(engine, gray=gray, downsample=downsample)
+    height, width = rasterizer.frame.shape[:2]
+
+    if video_format == RAW:
+        extension = '.gray' if gray else '.rgb'
+    else:
+        extension = '.' + video_format
+    name = os.path.splitext(os.path.basename(path))[0] + extension
+    output = os.path.join(output_dir if output_dir is not None else os.path.dirname(path), name)
+    writer = WRITERS[video_format](output, width, height, TICK_RATE / step)
+    try:
+        if first_tick == 0:
+            writer.add(rasterizer.frame, rasterizer.changed_box)
+        # A frame shows the game after a tick, the ticks are numbered from 0.
+        for tick, _ in iter_replay(log, engine, ticks):
+            engine.removed_bricks.clear()
+            if tick + 1 >= first_tick and (tick + 1 - first_tick) % step == 0:
+                rasterizer.draw()
+                writer.add(rasterizer.frame, rasterizer.changed_box)
+    finally:
+        writer.close()
+
+    return {
+        'path': path,
+        'output': output,
+        'width': width,
+        'height': height,
+        'ticks': ticks,
+        'frames': writer.frames,
+        'written_frames': writer.written_frames,
+        'size': os.path.getsize(output),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def export_replays(paths, workers=None, **kwargs):
+    """
+    Export the input logs in a pool of worker processes.
+    :param paths: The paths of the input logs
+    :param workers: (int) Number of worker processes, the number of CPUs if it is None.
+    :param kwargs: The other parameters of export_replay
+    :return: (generator) The results of export_replay, in the order the exports finish.
+    """
+    export = functools.partial(export_replay, **kwargs)
+    with multiprocessing.Pool(workers) as pool:
+        # A log is a long job, so the logs are sent to the workers one by one.
+        yield from pool.imap_unordered(export, paths, 1)
+
+
+def _compress(data, code_size):
+    """
+    Compress the color indices of an image with the variable-length LZW of GIF.
+    A run of the same index is matched by the codes of the runs in the table without looking up every index,
+    the transparent pixels of a frame are long runs.
+    :param data: (bytes) The color indices, each less than 2 ** code_size
+    :param code_size: (int) The minimum code size, 2 to 8
+    :return: (bytearray) The codes packed from the least significant bit.
+    """
+    clear_code = 1 << code_size
+    first_code = clear_code + 2
+    out = bytearray()
+    codes = {}
+    # The codes of the runs of each index in the table, of 2, 3, 4 ... indices.
+    runs = {}
+    next_code = first_code
+    width = code_size + 1       # Number of bits of a code
+    bits = clear_code           # The bits not written yet, starting with the clear code
+    bit_count = width
+
+    def write(code, key):
+        """
+        Write the code of the longest match, and add the match and the next index to the table.
+        :param code: (int) The code of the match
+        :param key: (int) The code of the match and the next index, code << 8 | index
+        """
+        nonlocal bits, bit_count, next_code, width
+        bits |= code << bit_count
+        bit_count += width
+        while bit_count >= 8:
+            out.append(bits & 0xff)
+            bits >>= 8
+            bit_count -= 8
+        if next_code < MAX_CODE:
+            codes[key] = next_code
+            index = key & 0xff
+            run = runs.setdefault(index, [])
+            if code == (run[-1] if run else index):
+                run.append(next_code)
+            next_code += 1
+            if next_code > 1 << width:
+                width += 1
+        else:
+            # The table is full, it is started over.
+            bits |= clear_code << bit_count
+            bit_count += width
+            codes.clear()
+            runs.clear()
+            next_code = first_code
+            width = code_size + 1
+
+    values = np.frombuffer(data, dtype=np.uint8)
+    starts = np.flatnonzero(values[1:] != values[:-1]) + 1
+    lengths = np.diff(starts, prepend=0, append=len(values))
+    prefix = None
+    for index, length in zip(values[np.concatenate(([0], starts))].tolist(), lengths.tolist()):
+        while length:
+            if prefix == index:
+                # The prefix is the index alone, followed by a run of length indices.
+                run = runs.get(index)
+                if run and length <= len(run):
+                    prefix = run[length - 1]
+                    break
+                # The run is longer than the runs in the table, the longest one is written.
+                if run:
+                    code = run[-1]
+                    length -= len(run) + 1
+                else:
+                    code = index
+                    length -= 1
+                write(code, code << 8 | index)
+                continue
+            length -= 1
+            if prefix is None:
+                prefix = index
+                continue
+            key = prefix << 8 | index
+            code = codes.get(key)
+            if code is None:
+                write(prefix, key)
+                prefix = index
+            else:
+                prefix = code
+    bits |= prefix << bit_count
+    bit_count += width
+    # The end of the image
+    bits |= (clear_code + 1) << bit_count
+    bit_count += width
+    while bit_count > 0:
+        out.append(bits & 0xff)
+        bits >>= 8
+        bit_count -= 8
+    return out
+
+
+def _to_blocks(data):
+    """
+    :param data: (bytes) The compressed image
+    :return: (bytes) The data in blocks of at most 255 bytes, each after its length, and an empty block.
+    """
+    blocks = bytearray()
+    for i in range(0, len(data), 255):
+        block = data[i:i + 255]
+        blocks.append(len(block))
+        blocks += block
+    blocks.append(0)
+    return bytes(blocks)
+
+
+def main():
+    """
+    Export the input logs, and print the frames and the size of each video.
+    """
+    parser = argparse.ArgumentParser(description='Export input logs as GIFs or raw videos.')
+    parser.add_argument('logs', nargs='+', help='paths of the input logs')
+    parser.add_argument('--output-dir', default=None, help='folder of the videos, the folder of each log by default')
+    parser.add_argument('--format', choices=(GIF, RAW), default=GIF, help='format of the videos')
+    parser.add_argument('--gray', action='store_true', help='draw in grayscale')
+    parser.add_argument('--downsample', type=int, default=DOWNSAMPLE, help='draw the window this times smaller')
+    parser.add_argument('--step', type=int, default=STEP, help='ticks between two frames')
+    parser.add_argument('--first-tick', type=int, default=0, help='first tick of the videos')
+    parser.add_argument('--last-tick', type=int, default=None, help='tick ending the videos')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    args = parser.parse_args()
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    ticks = 0
+    for result in export_replays(args.logs, args.workers, output_dir=args.output_dir, video_format=args.format,
+                                 gray=args.gray, downsample=args.downsample, step=args.step,
+                                 first_tick=args.first_tick, last_tick=args.last_tick):
+        ticks += result['ticks']
+        print('%s: %dx%d, %d frames, %d written, %.1f KB, %.1f s' % (
+            result['output'], result['width'], result['height'], result['frames'], result['written_frames'],
+            result['size'] / 1024, result['seconds']))
+    print('%d logs, %d ticks, %.1f s' % (len(args.logs), ticks, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()